@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""
+bench_guacagui.py
+
+Headless benchmarks for the Guacagui browser in `guacagui_clipboard.py`.
+
+The suite starts a small local HTTP server that stands in for the
+Guacamole web application, points Guacagui at it through a temporary
+configuration file (``GUACAGUI_CONFIG``) and a throw-away profile
+directory (``XDG_CACHE_HOME``), and runs `BrowserMainWindow` under
+``QT_QPA_PLATFORM=offscreen`` in child processes.  It measures:
+
+- ``cold_start_ms``: process start to the first tab's ``loadFinished``
+  (median over ``--runs`` fresh processes, each with an empty cache).
+- ``import_ms``: time spent importing the browser module.
+- ``new_tab_spare_ms`` / ``new_tab_cold_ms``: ``tab_open_doubleclick``
+  until the new tab has painted a loaded page, with and without a spare tab.
+- ``popup_ms``: ``window.open()`` from a page (``createWindow``) until
+  the new tab has loaded.
+- ``rss_total_mb`` / ``rss_per_tab_mb``: resident memory of the browser
+  and all of its helper processes after opening ``--tabs`` tabs.
+
+With ``--keys N`` the key injection backends of ``KeyInjector`` are
+timed as well: each available backend injects Ctrl+Alt+Shift ``N``
+times and ``key_<backend>_ms`` is the median latency until it reported
+completion.  The ``xtest`` and ``process`` backends need an X display
+and type into whatever window has the focus there, so this is opt-in.
+
+Results are written as JSON.  With ``--thresholds`` each metric is
+checked against an absolute ``max`` and, with ``--baseline``, against a
+previous result file allowing ``--tolerance`` relative growth; the exit
+status is 1 if any check fails.
+
+Usage:
+
+    python3 bench_guacagui.py --tabs 20 --output bench.json \\
+        --thresholds bench_thresholds.json --baseline previous.json
+
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Taken before anything else so that child processes can report cold start.
+PROCESS_STARTED = time.perf_counter()
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Minimal stand-in for the Guacamole web client: a page with a script,
+# a stylesheet and some markup, plus a page that popups open.
+STUB_PAGES = {
+    "/guacamole/": (
+        "text/html",
+        "<!DOCTYPE html><html><head><title>Guacamole</title>"
+        '<link rel="stylesheet" href="app.css"><script src="app.js"></script>'
+        "</head><body><div id=\"content\">Guacamole stand-in</div></body></html>",
+    ),
+    "/guacamole/app.css": ("text/css", "body { font-family: sans-serif; }\n" * 200),
+    "/guacamole/app.js": ("application/javascript", "var guacStub = [];\n" * 2000),
+    "/guacamole/popup": (
+        "text/html",
+        "<!DOCTYPE html><html><head><title>Popup</title></head><body>popup</body></html>",
+    ),
+}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Serve STUB_PAGES with caching headers like a static web app would."""
+
+    def do_GET(self) -> None:  # noqa: N802 - http.server naming
+        path = self.path.split("?", 1)[0]
+        page = STUB_PAGES.get(path)
+        if page is None:
+            self.send_error(404)
+            return
+        content_type, body = page
+        data = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", content_type + "; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("Cache-Control", "max-age=3600")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, _format, *_args) -> None:
+        pass
+
+
+def start_stub_server() -> ThreadingHTTPServer:
+    """Start the stub server on a free localhost port in a daemon thread."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def tree_rss(root_pid: int) -> int:
+    """Return the summed RSS in bytes of *root_pid* and all of its descendants."""
+    children: dict = {}
+    rss: dict = {}
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "r", encoding="ascii", errors="replace") as f:
+                data = f.read()
+            with open(f"/proc/{entry}/statm", "r", encoding="ascii") as f:
+                rss[int(entry)] = int(f.read().split()[1]) * page_size
+        except (OSError, IndexError, ValueError):
+            continue
+        ppid = int(data[data.rindex(")") + 2:].split()[1])
+        children.setdefault(ppid, []).append(int(entry))
+    total = 0
+    pending = [root_pid]
+    while pending:
+        pid = pending.pop()
+        total += rss.get(pid, 0)
+        pending.extend(children.get(pid, []))
+    return total
+
+
+# --------------------------------------------------------------------------
+# Child process side: runs the GUI and prints one JSON line with results
+# --------------------------------------------------------------------------
+
+
+def wait_until(app, predicate, timeout: float) -> bool:
+    """Process Qt events until *predicate* is true or *timeout* seconds pass."""
+    from PyQt5.QtCore import QEventLoop
+
+    deadline = time.perf_counter() + timeout
+    while not predicate():
+        if time.perf_counter() > deadline:
+            return False
+        app.processEvents(QEventLoop.AllEvents | QEventLoop.WaitForMoreEvents, 20)
+    return True
+
+
+def child_main(mode: str, tabs: int, timeout: float) -> dict:
+    """Run one measurement *mode* ("startup", "tabs" or "keys") inside this process."""
+    import_started = time.perf_counter()
+    sys.path.insert(0, HERE)
+    import guacagui_clipboard as guac
+    from PyQt5.QtWidgets import QApplication
+
+    import_ms = (time.perf_counter() - import_started) * 1000.0
+    guac.register_asset_scheme()
+    app = QApplication([sys.argv[0]])
+    window = guac.BrowserMainWindow()
+
+    def first_loaded() -> bool:
+        browser = window.current_browser()
+        return isinstance(browser, guac.BrowserTab) and browser.loaded
+
+    if not wait_until(app, first_loaded, timeout):
+        raise SystemExit("first tab did not finish loading")
+    result = {
+        "import_ms": import_ms,
+        "cold_start_ms": (time.perf_counter() - PROCESS_STARTED) * 1000.0,
+    }
+    if mode == "tabs":
+        result.update(measure_tabs(app, guac, window, tabs, timeout))
+    elif mode == "keys":
+        result = measure_key_injection(app, guac, window, tabs, timeout)
+    window.close()
+    return result
+
+
+def measure_tabs(app, guac, window, count: int, timeout: float) -> dict:
+    """Measure new-tab and popup latency and the memory used by *count* tabs."""
+    spares = window.spares
+
+    def spare_ready() -> bool:
+        return spares.spare is not None and spares.spare.loaded
+
+    def open_tab() -> float:
+        before = len(spares.latencies)
+        window.tab_open_doubleclick(-1)
+        if not wait_until(app, lambda: len(spares.latencies) > before, timeout):
+            raise SystemExit("new tab did not finish loading")
+        return spares.latencies[-1][0]
+
+    # New tabs with a warm spare, waiting for the spare to be refilled each time
+    spare_ms = []
+    for _ in range(3):
+        wait_until(app, spare_ready, timeout)
+        spare_ms.append(open_tab())
+
+    # New tabs without a spare: take it away before each request
+    cold_ms = []
+    for _ in range(3):
+        wait_until(app, spare_ready, timeout)
+        spares.spare.deleteLater()
+        spares.spare = None
+        cold_ms.append(open_tab())
+
+    # Popups through window.open() and createWindow
+    popup_ms = []
+    popup_url = guac.config_snapshot().home_url + "popup"
+    for _ in range(3):
+        wait_until(app, spare_ready, timeout)
+        count_before = window.tabs.count()
+        started = time.perf_counter()
+        window.current_browser().page().runJavaScript(f"window.open({json.dumps(popup_url)});")
+
+        def popup_loaded() -> bool:
+            browser = window.current_browser()
+            return (
+                window.tabs.count() > count_before
+                and browser.loaded
+                and browser.url().toString() == popup_url
+            )
+
+        if not wait_until(app, popup_loaded, timeout):
+            raise SystemExit("popup did not finish loading")
+        popup_ms.append((time.perf_counter() - started) * 1000.0)
+
+    # Memory after opening *count* more tabs
+    wait_until(app, spare_ready, timeout)
+    rss_before = tree_rss(os.getpid())
+    opened = []
+    for _ in range(count):
+        tab = spares.take()
+        window.add_browser_tab(tab, "Bench")
+        opened.append(tab)
+    if not wait_until(app, lambda: all(tab.loaded for tab in opened), timeout * max(1, count)):
+        raise SystemExit("tabs did not finish loading")
+    rss_after = tree_rss(os.getpid())
+    return {
+        "new_tab_spare_ms": statistics.median(spare_ms),
+        "new_tab_cold_ms": statistics.median(cold_ms),
+        "popup_ms": statistics.median(popup_ms),
+        "rss_total_mb": rss_after / (1024 * 1024),
+        "rss_per_tab_mb": (rss_after - rss_before) / (1024 * 1024) / max(1, count),
+        "tabs": window.tabs.count(),
+    }
+
+
+def measure_key_injection(app, guac, window, count: int, timeout: float) -> dict:
+    """Time *count* Ctrl+Alt+Shift injections through each available backend."""
+    injector = window.key_injector
+    view = window.current_browser()
+    result = {}
+    for name, backend in injector.backends.items():
+        if not backend.available():
+            continue
+        samples = []
+        for _ in range(count):
+            used = []
+            started = time.perf_counter()
+            injector.send(view, ("ctrl", "alt", "shift"), used.append, order=[name])
+            if not wait_until(app, lambda: bool(used), timeout):
+                raise SystemExit(f"key backend {name} did not complete")
+            if used[0] != name:
+                break
+            samples.append((time.perf_counter() - started) * 1000.0)
+        if samples:
+            result[f"key_{name}_ms"] = statistics.median(samples)
+    return result
+
+
+# --------------------------------------------------------------------------
+# Parent process side: prepares the environment and aggregates results
+# --------------------------------------------------------------------------
+
+
+def run_child(mode: str, env: dict, tabs: int, timeout: float) -> dict:
+    """Run this script in *mode* as a child process and return its JSON result."""
+    command = [
+        sys.executable, os.path.abspath(__file__),
+        "--child", mode, "--tabs", str(tabs), "--timeout", str(timeout),
+    ]
+    proc = subprocess.run(
+        command, env=env, capture_output=True, text=True, timeout=timeout * (tabs + 10)
+    )
+    lines = [line for line in proc.stdout.splitlines() if line.startswith("{")]
+    if proc.returncode != 0 or not lines:
+        raise RuntimeError(f"benchmark child '{mode}' failed:\n{proc.stderr.strip()}")
+    return json.loads(lines[-1])
+
+
+def child_env(base_url: str, workdir: str, run: int, no_sandbox: bool) -> dict:
+    """Return the environment for a child using its own config and empty cache."""
+    config = os.path.join(workdir, "config.json")
+    with open(config, "w", encoding="utf-8") as f:
+        json.dump({"home_url": base_url, "macros": [{"name": "1", "text": "bench"}]}, f)
+    env = dict(os.environ)
+    env["QT_QPA_PLATFORM"] = "offscreen"
+    env["GUACAGUI_CONFIG"] = config
+    env["XDG_CACHE_HOME"] = os.path.join(workdir, f"cache-{run}")
+    if no_sandbox:
+        env["QTWEBENGINE_DISABLE_SANDBOX"] = "1"
+    return env
+
+
+def check_results(metrics: dict, thresholds: dict, baseline: dict | None, tolerance: float) -> list:
+    """Return a list of human-readable regressions (empty if all checks pass)."""
+    failures = []
+    for name, limits in thresholds.items():
+        value = metrics.get(name)
+        if value is None:
+            continue
+        maximum = limits.get("max") if isinstance(limits, dict) else None
+        if maximum is not None and value > maximum:
+            failures.append(f"{name}: {value:.1f} exceeds limit {maximum:.1f}")
+    if baseline:
+        for name, previous in baseline.items():
+            value = metrics.get(name)
+            if not isinstance(previous, (int, float)) or value is None or previous <= 0:
+                continue
+            if value > previous * (1.0 + tolerance):
+                failures.append(
+                    f"{name}: {value:.1f} is more than {tolerance:.0%} above baseline {previous:.1f}"
+                )
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Headless Guacagui benchmarks")
+    parser.add_argument("--tabs", type=int, default=10, help="number of tabs for the memory test")
+    parser.add_argument("--runs", type=int, default=3, help="cold start repetitions")
+    parser.add_argument("--timeout", type=float, default=30.0, help="seconds to wait for each load")
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--thresholds", help="JSON file with per-metric {\"max\": value} limits")
+    parser.add_argument("--baseline", help="previous results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed growth over the baseline")
+    parser.add_argument("--no-sandbox", action="store_true", help="disable the Chromium sandbox")
+    parser.add_argument(
+        "--keys", type=int, default=0, metavar="N", help="time N injections per key injection backend"
+    )
+    parser.add_argument("--child", choices=("startup", "tabs", "keys"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(child_main(args.child, args.tabs, args.timeout)))
+        return
+
+    server = start_stub_server()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/guacamole/"
+    with tempfile.TemporaryDirectory(prefix="guacagui-bench-") as workdir:
+        startups = [
+            run_child("startup", child_env(base_url, workdir, run, args.no_sandbox), 0, args.timeout)
+            for run in range(max(1, args.runs))
+        ]
+        tabs = run_child(
+            "tabs", child_env(base_url, workdir, args.runs, args.no_sandbox), args.tabs, args.timeout
+        )
+        keys = {}
+        if args.keys > 0:
+            env = child_env(base_url, workdir, args.runs + 1, args.no_sandbox)
+            # XTest and xdotool need the real display
+            env.pop("QT_QPA_PLATFORM")
+            keys = run_child("keys", env, args.keys, args.timeout)
+    server.shutdown()
+
+    metrics = {
+        "cold_start_ms": statistics.median(r["cold_start_ms"] for r in startups),
+        "import_ms": statistics.median(r["import_ms"] for r in startups),
+    }
+    metrics.update({k: v for k, v in tabs.items() if k not in ("cold_start_ms", "import_ms")})
+    metrics.update(keys)
+    results = {
+        "metrics": metrics,
+        "runs": {"startup": startups, "tabs": tabs, "keys": keys},
+        "environment": {
+            "python": sys.version.split()[0],
+            "platform": sys.platform,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+    }
+
+    thresholds = {}
+    if args.thresholds:
+        with open(args.thresholds, "r", encoding="utf-8") as f:
+            thresholds = json.load(f)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f).get("metrics", {})
+    failures = check_results(metrics, thresholds, baseline, args.tolerance)
+    results["regressions"] = failures
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+    for failure in failures:
+        print("REGRESSION: " + failure, file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
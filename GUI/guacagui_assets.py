@@ -0,0 +1,399 @@
+"""
+guacagui_assets.py
+
+Offline copies of the Guacamole web client's static files:
+:class:`AssetCache` keeps the scripts, stylesheets, images and JSON files
+of the configured Guacamole server on disk and serves them to the tabs
+under the ``guacagui-asset`` URL scheme.
+
+"""
+
+import hashlib
+import json
+import os
+import re
+from functools import partial
+from typing import TYPE_CHECKING
+
+from PyQt5.QtCore import QBuffer, QIODevice, QObject, QTimer, QUrl, QUrlQuery, pyqtSlot
+from PyQt5.QtWebEngineWidgets import QWebEngineProfile, QWebEngineScript
+from PyQt5.QtWebEngineCore import (
+    QWebEngineUrlRequestInterceptor,
+    QWebEngineUrlRequestInfo,
+    QWebEngineUrlRequestJob,
+    QWebEngineUrlScheme,
+    QWebEngineUrlSchemeHandler,
+)
+from PyQt5.QtNetwork import QNetworkAccessManager, QNetworkRequest, QNetworkReply
+
+from guacagui_config import ConfigSnapshot, cache_dir, config_snapshot, guacamole_base_url
+
+if TYPE_CHECKING:
+    from guacagui_clipboard import BrowserMainWindow
+
+
+# Custom scheme under which AssetCache serves the Guacamole web client's
+# static files.  The original host is kept and the original scheme and
+# port become the first path segment, so that relative references in
+# cached stylesheets resolve back into the cache:
+#
+#   https://guacweb:8443/guacamole/app.js?b=1
+#   guacagui-asset://guacweb/https:8443/guacamole/app.js?b=1
+ASSET_SCHEME = b"guacagui-asset"
+
+
+def register_asset_scheme() -> None:
+    """Register ASSET_SCHEME with QtWebEngine; must run before the QApplication exists."""
+    scheme = QWebEngineUrlScheme(ASSET_SCHEME)
+    scheme.setSyntax(QWebEngineUrlScheme.Syntax.Host)
+    # Secure, so that https pages may load from it without mixed-content errors
+    scheme.setFlags(QWebEngineUrlScheme.SecureScheme | QWebEngineUrlScheme.CorsEnabled)
+    QWebEngineUrlScheme.registerScheme(scheme)
+
+
+def asset_url(url: QUrl) -> QUrl:
+    """Return the ASSET_SCHEME URL under which the http(s) *url* is served."""
+    default_port = 443 if url.scheme() == "https" else 80
+    cached = QUrl(url)
+    cached.setScheme(ASSET_SCHEME.decode("ascii"))
+    cached.setPort(-1)
+    cached.setPath(f"/{url.scheme()}:{url.port(default_port)}{url.path()}")
+    return cached
+
+
+def original_url(url: QUrl) -> QUrl | None:
+    """Invert :func:`asset_url`; return None if *url* was not made by it."""
+    prefix, _, path = url.path()[1:].partition("/")
+    scheme, _, port = prefix.partition(":")
+    if scheme not in ("http", "https") or not port.isdigit():
+        return None
+    original = QUrl(url)
+    original.setScheme(scheme)
+    original.setPort(-1 if int(port) == (443 if scheme == "https" else 80) else int(port))
+    original.setPath("/" + path)
+    return original
+
+
+# Makes the JSON files kept by AssetCache available to GUAC_HOOK_JS on
+# pages of the Guacamole server they came from.
+ASSET_SEED_JS = """
+(function (assets) {
+    if (location.href.indexOf(assets.base) === 0) window.__guacaguiAssets = assets;
+})(%s);
+"""
+
+
+class AssetInterceptor(QWebEngineUrlRequestInterceptor):
+    """Profile request interceptor that hands requests to :meth:`AssetCache.intercept`."""
+
+    def __init__(self, cache: "AssetCache") -> None:
+        super().__init__(cache)
+        self.cache = cache
+
+    def interceptRequest(self, info: QWebEngineUrlRequestInfo) -> None:
+        self.cache.intercept(info)
+
+
+class AssetSchemeHandler(QWebEngineUrlSchemeHandler):
+    """Handler for ASSET_SCHEME that hands requests to :meth:`AssetCache.serve`."""
+
+    def __init__(self, cache: "AssetCache") -> None:
+        super().__init__(cache)
+        self.cache = cache
+
+    def requestCreated(self, job: QWebEngineUrlRequestJob) -> None:
+        self.cache.serve(job)
+
+
+class AssetCache(QObject):
+    """Serve the Guacamole web client's static files from disk instead of through the VPN.
+
+    The scripts, stylesheets, images and translations of the web client
+    only change when the server is upgraded, and the server build is part
+    of their versioned URLs (``app.js?b=...``).  A request interceptor
+    sends the scripts, stylesheets and images of the Guacamole server in
+    ``home_url`` to ASSET_SCHEME, whose handler answers from
+    ``<cache>/assets`` and fetches what is missing once, however many
+    tabs ask for it.  The JSON files the client loads with XMLHttpRequest
+    (translations, ``api/languages`` and ``api/patches``) are fetched
+    from the server when GUAC_HOOK_JS reports that a page missed them,
+    and handed back to new pages by a profile script, since a Qt 5
+    scheme handler cannot answer cross-origin requests.  The REST
+    API, the tunnel and everything else still go to the network.
+
+    A URL with another build than the cached one empties the cache.
+    Files without a version in their URL are revalidated once per start.
+    Only files under the Guacamole base URL are fetched, redirects are
+    followed within its origin only, and files larger than
+    ``MAX_FILE_BYTES`` or beyond ``MAX_CACHE_BYTES`` in total are not kept.
+    """
+
+    SEED_SCRIPT = "guacagui-assets"
+    # JSON files kept for the page hook, relative to the Guacamole base URL
+    JSON_ASSETS = re.compile(r"(translations/[\w-]+\.json|api/languages|api/patches)")
+    MAX_FILE_BYTES = 8 * 1024 * 1024
+    MAX_CACHE_BYTES = 64 * 1024 * 1024
+    RESOURCE_TYPES = (
+        QWebEngineUrlRequestInfo.ResourceTypeScript,
+        QWebEngineUrlRequestInfo.ResourceTypeStylesheet,
+        QWebEngineUrlRequestInfo.ResourceTypeImage,
+    )
+
+    def __init__(self, window: "BrowserMainWindow") -> None:
+        super().__init__(window)
+        self.main_window = window
+        # Set by start(), so that creating the cache does not create the profile
+        self.profile: QWebEngineProfile | None = None
+        self.network = QNetworkAccessManager(self)
+        self.root = os.path.join(cache_dir(), "assets")
+        self.index_file = os.path.join(self.root, "index.json")
+        self.index = {"base_url": "", "build": "", "entries": {}}
+        self.enabled = False
+        # Jobs waiting for a file that is being fetched, by cache key
+        self.pending: dict = {}
+        self.hits = 0
+        self.misses = 0
+        self.handler = AssetSchemeHandler(self)
+        self.interceptor = AssetInterceptor(self)
+
+    def start(self, profile: QWebEngineProfile) -> None:
+        """Load the cache index, install the scheme handler and interceptor on *profile*, and revalidate."""
+        self.profile = profile
+        try:
+            with open(self.index_file, "r", encoding="utf-8") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            index = None
+        if isinstance(index, dict) and isinstance(index.get("entries"), dict):
+            self.index = index
+        self.profile.installUrlSchemeHandler(ASSET_SCHEME, self.handler)
+        self.apply_config(config_snapshot())
+        QTimer.singleShot(0, self.revalidate)
+
+    def apply_config(self, config: ConfigSnapshot) -> None:
+        if self.profile is None:
+            return
+        self.enabled = config.section("assets")["enabled"]
+        if self.index.get("base_url") != guacamole_base_url(config):
+            self.reset(guacamole_base_url(config))
+        self.profile.setUrlRequestInterceptor(self.interceptor if self.enabled else None)
+        self.update_seed()
+
+    def reset(self, base_url: str, build: str = "") -> None:
+        """Drop every cached file and start over for *base_url* and *build*."""
+        for entry in self.index["entries"].values():
+            try:
+                os.remove(os.path.join(self.root, entry["file"]))
+            except (OSError, KeyError, TypeError):
+                pass
+        self.index = {"base_url": base_url, "build": build, "entries": {}}
+        self.save()
+        self.update_seed()
+
+    def save(self) -> None:
+        os.makedirs(self.root, exist_ok=True)
+        temporary = self.index_file + ".tmp"
+        try:
+            with open(temporary, "w", encoding="utf-8") as f:
+                json.dump(self.index, f)
+            os.replace(temporary, self.index_file)
+        except OSError:
+            pass
+
+    @staticmethod
+    def key(url: QUrl) -> str:
+        return url.toString(QUrl.RemoveQuery | QUrl.RemoveFragment | QUrl.NormalizePathSegments)
+
+    def in_scope(self, key: str, json_asset: bool = False) -> bool:
+        """Return True if *key* is a file of the web client that may be cached.
+
+        Static files are anything under the base URL but the REST API;
+        JSON files must match JSON_ASSETS.
+        """
+        base = self.index["base_url"]
+        if not base or not key.startswith(base):
+            return False
+        path = key[len(base):]
+        if json_asset:
+            return bool(self.JSON_ASSETS.fullmatch(path))
+        return not path.startswith("api/")
+
+    def read(self, entry: dict) -> bytes | None:
+        try:
+            with open(os.path.join(self.root, entry["file"]), "rb") as f:
+                return f.read()
+        except (OSError, KeyError, TypeError):
+            return None
+
+    def size(self) -> int:
+        """Return the number of bytes of all cached files."""
+        return sum(entry.get("size", 0) for entry in self.index["entries"].values())
+
+    def store(self, key: str, content_type: str, data: bytes, reply: QNetworkReply | None = None, **flags) -> None:
+        """Write *data* for *key* to disk and record it in the index, unless the cache is full."""
+        previous = self.index["entries"].get(key, {}).get("size", 0)
+        if self.size() - previous + len(data) > self.MAX_CACHE_BYTES:
+            return
+        entry = {
+            "file": hashlib.sha1(key.encode("utf-8")).hexdigest(), "type": content_type, "size": len(data), **flags,
+        }
+        if reply is not None:
+            entry["etag"] = bytes(reply.rawHeader(b"ETag")).decode("latin-1")
+            entry["last_modified"] = bytes(reply.rawHeader(b"Last-Modified")).decode("latin-1")
+        os.makedirs(self.root, exist_ok=True)
+        try:
+            with open(os.path.join(self.root, entry["file"]), "wb") as f:
+                f.write(data)
+        except OSError:
+            return
+        self.index["entries"][key] = entry
+        self.save()
+
+    def intercept(self, info: QWebEngineUrlRequestInfo) -> None:
+        """Send a request for a static file of the Guacamole server to ASSET_SCHEME."""
+        if not self.enabled or info.resourceType() not in self.RESOURCE_TYPES:
+            return
+        if bytes(info.requestMethod()) != b"GET":
+            return
+        url = info.requestUrl()
+        if not self.in_scope(self.key(url)):
+            return
+        build = QUrlQuery(url).queryItemValue("b")
+        if build and build != self.index["build"]:
+            self.reset(self.index["base_url"], build)
+        if self.index["build"]:
+            info.redirect(asset_url(url))
+
+    def serve(self, job: QWebEngineUrlRequestJob) -> None:
+        """Answer *job* from the cache, or fetch the file first."""
+        original = original_url(job.requestUrl())
+        if original is None:
+            job.fail(QWebEngineUrlRequestJob.UrlInvalid)
+            return
+        original = original.adjusted(QUrl.NormalizePathSegments)
+        key = self.key(original)
+        # Any page can ask for this scheme; never fetch from elsewhere
+        if not self.enabled or not self.in_scope(key):
+            job.fail(QWebEngineUrlRequestJob.RequestDenied)
+            return
+        entry = self.index["entries"].get(key)
+        data = self.read(entry) if entry is not None else None
+        if data is not None:
+            self.hits += 1
+            self.reply(job, entry["type"], data)
+            return
+        self.misses += 1
+        waiting = self.pending.setdefault(key, [])
+        waiting.append(job)
+        job.destroyed.connect(partial(self.forget, key, job))
+        if len(waiting) == 1:
+            self.fetch(original, key, QUrlQuery(original).hasQueryItem("b"))
+
+    def get(self, request: QNetworkRequest) -> QNetworkReply:
+        """Send *request*, following redirects within its origin and stopping at MAX_FILE_BYTES."""
+        request.setAttribute(QNetworkRequest.RedirectPolicyAttribute, QNetworkRequest.SameOriginRedirectPolicy)
+        reply = self.network.get(request)
+        reply.downloadProgress.connect(partial(self.on_progress, reply))
+        return reply
+
+    def on_progress(self, reply: QNetworkReply, received: int, total: int) -> None:
+        if max(received, total) > self.MAX_FILE_BYTES:
+            reply.abort()
+
+    def fetch(self, url: QUrl, key: str, versioned: bool, json_asset: bool = False) -> None:
+        reply = self.get(QNetworkRequest(url))
+        reply.finished.connect(partial(self.on_fetched, reply, key, versioned, json_asset))
+
+    def forget(self, key: str, job: QWebEngineUrlRequestJob) -> None:
+        waiting = self.pending.get(key, [])
+        if job in waiting:
+            waiting.remove(job)
+
+    @staticmethod
+    def reply(job: QWebEngineUrlRequestJob, content_type: str, data: bytes) -> None:
+        buffer = QBuffer(job)
+        buffer.setData(data)
+        buffer.open(QIODevice.ReadOnly)
+        job.reply(content_type.encode("latin-1") or b"application/octet-stream", buffer)
+
+    def on_fetched(self, reply: QNetworkReply, key: str, versioned: bool, json_asset: bool) -> None:
+        reply.deleteLater()
+        jobs = self.pending.pop(key, [])
+        status = reply.attribute(QNetworkRequest.HttpStatusCodeAttribute)
+        redirected = not self.in_scope(self.key(reply.url()), json_asset)
+        if reply.error() != QNetworkReply.NoError or status != 200 or redirected:
+            for job in jobs:
+                job.fail(QWebEngineUrlRequestJob.RequestFailed)
+            return
+        data = bytes(reply.readAll())
+        content_type = str(reply.header(QNetworkRequest.ContentTypeHeader) or "application/octet-stream")
+        self.store(key, content_type, data, reply, versioned=versioned, json=json_asset)
+        for job in jobs:
+            self.reply(job, content_type, data)
+        if json_asset:
+            self.update_seed()
+
+    @pyqtSlot(str)
+    def on_page_asset(self, url: str) -> None:
+        """Fetch a JSON file of the web client that a page missed (reported by GUAC_HOOK_JS)."""
+        key = self.key(QUrl(url))
+        if not self.enabled or not self.index["build"] or not self.in_scope(key, json_asset=True):
+            return
+        if key in self.index["entries"] or key in self.pending:
+            return
+        self.pending[key] = []
+        self.fetch(QUrl(key), key, False, json_asset=True)
+
+    def update_seed(self) -> None:
+        if self.profile is None:
+            return
+        scripts = self.profile.scripts()
+        for script in scripts.findScripts(self.SEED_SCRIPT):
+            scripts.remove(script)
+        if not self.enabled or not self.index["base_url"]:
+            return
+        files = {}
+        for key, entry in self.index["entries"].items():
+            data = self.read(entry) if entry.get("json") else None
+            if data is not None:
+                files[key] = [entry["type"], data.decode("utf-8", "replace")]
+        assets = {"base": self.index["base_url"], "build": self.index["build"], "files": files}
+        script = QWebEngineScript()
+        script.setName(self.SEED_SCRIPT)
+        script.setInjectionPoint(QWebEngineScript.DocumentCreation)
+        script.setWorldId(QWebEngineScript.MainWorld)
+        script.setRunsOnSubFrames(False)
+        script.setSourceCode(ASSET_SEED_JS % json.dumps(assets))
+        scripts.insert(script)
+
+    @pyqtSlot()
+    def revalidate(self) -> None:
+        """Check the cached files without a version in their URL against the server."""
+        for key, entry in list(self.index["entries"].items()):
+            if entry.get("versioned"):
+                continue
+            request = QNetworkRequest(QUrl(key))
+            if entry.get("etag"):
+                request.setRawHeader(b"If-None-Match", entry["etag"].encode("latin-1"))
+            if entry.get("last_modified"):
+                request.setRawHeader(b"If-Modified-Since", entry["last_modified"].encode("latin-1"))
+            reply = self.get(request)
+            reply.finished.connect(partial(self.on_revalidated, reply, key))
+
+    def on_revalidated(self, reply: QNetworkReply, key: str) -> None:
+        reply.deleteLater()
+        entry = self.index["entries"].get(key)
+        status = reply.attribute(QNetworkRequest.HttpStatusCodeAttribute)
+        if entry is None or reply.error() not in (QNetworkReply.NoError, QNetworkReply.ContentNotFoundError):
+            return
+        if not self.in_scope(self.key(reply.url()), entry.get("json", False)):
+            return
+        if status == 200:
+            content_type = str(reply.header(QNetworkRequest.ContentTypeHeader) or entry["type"])
+            self.store(key, content_type, bytes(reply.readAll()), reply, json=entry.get("json", False))
+            if entry.get("json"):
+                self.update_seed()
+        elif status == 404:
+            del self.index["entries"][key]
+            self.save()
+            self.update_seed()
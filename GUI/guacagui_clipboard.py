@@ -21,18 +21,46 @@ Usage:
 
 The configuration file `config.json` in the same directory controls
 the home URL and the macro definitions.  See the `read_config`
-function for details on its structure.
+function in `guacagui_config.py` for details on its structure.
 
 """
 
+import argparse
+import csv
+import difflib
+import hashlib
 import json
 import os
 import sys
-import subprocess
+import time
+from collections import deque
+from itertools import count
+from fnmatch import fnmatch
 from functools import partial
 
-from PyQt5.QtCore import QUrl, pyqtSlot, Qt, QEvent
-from PyQt5.QtGui import QIcon, QGuiApplication, QClipboard
+# Taken before the Qt imports so that --profile-startup can report them.
+IMPORT_STARTED = time.perf_counter()
+
+from PyQt5.QtCore import (
+    QUrl,
+    pyqtSlot,
+    pyqtSignal,
+    pyqtProperty,
+    Qt,
+    QEvent,
+    QObject,
+    QTimer,
+    QFileSystemWatcher,
+    QPoint,
+    QRect,
+    QSize,
+    QModelIndex,
+    QAbstractListModel,
+    QFile,
+    QIODevice,
+    QUrlQuery,
+)
+from PyQt5.QtGui import QIcon, QGuiApplication, QClipboard, QPixmap, QColor
 from PyQt5.QtWidgets import (
     QApplication,
     QMainWindow,
@@ -42,74 +70,1052 @@ from PyQt5.QtWidgets import (
     QAction,
     QLineEdit,
     QLabel,
+    QMenu,
+    QMessageBox,
+    QDockWidget,
+    QTableWidget,
+    QTableWidgetItem,
+    QListView,
+    QCheckBox,
+    QWidget,
+    QHBoxLayout,
+    QVBoxLayout,
+    QPushButton,
+    QFileDialog,
+    QTreeWidget,
+    QTreeWidgetItem,
+    QStyledItemDelegate,
+)
+from PyQt5.QtWebEngineWidgets import (
+    QWebEngineView,
+    QWebEngineSettings,
+    QWebEnginePage,
+    QWebEngineProfile,
+    QWebEngineScript,
+)
+from PyQt5.QtWebEngineCore import (
+    QWebEngineUrlRequestInterceptor,
+    QWebEngineUrlRequestInfo,
+)
+from PyQt5.QtWebChannel import QWebChannel
+from PyQt5.QtNetwork import (
+    QNetworkAccessManager,
+    QNetworkRequest,
+    QNetworkReply,
+)
+
+from guacagui_assets import AssetCache, register_asset_scheme
+from guacagui_config import (
+    ConfigSnapshot,
+    cache_dir,
+    config_path,
+    config_snapshot,
+    connection_url,
+    guacamole_base_url,
+    read_macros,
+    resolve_target,
 )
-from PyQt5.QtWebEngineWidgets import QWebEngineView, QWebEngineSettings, QWebEnginePage
+from guacagui_keys import KeyInjector
+from guacagui_launcher import GroupLauncher, saved_lists
+from guacagui_metrics import MetricsServer, metrics
+from guacagui_server import ControlServer, InstanceServer, control_socket_path, hand_off
+
+
+class StartupProfiler:
+    """Collect named timestamps during startup and print them as a timeline.
+
+    Marks are cheap and always recorded; :meth:`report` only prints when
+    the profiler was enabled with ``--profile-startup``.  Each line shows
+    the time since the previous mark and since the process started
+    importing this module.
+    """
+
+    __slots__ = ("enabled", "origin", "marks", "reported")
+
+    def __init__(self, origin: float) -> None:
+        self.enabled = False
+        self.origin = origin
+        self.marks: list = []
+        self.reported = False
+
+    def mark(self, name: str) -> None:
+        self.marks.append((name, time.perf_counter()))
+
+    def report(self, stream=None) -> None:
+        if not self.enabled or self.reported:
+            return
+        self.reported = True
+        stream = stream or sys.stderr
+        previous = self.origin
+        print("Startup profile (ms):", file=stream)
+        for name, stamp in self.marks:
+            step = (stamp - previous) * 1000.0
+            total = (stamp - self.origin) * 1000.0
+            print(f"  {step:9.1f} {total:9.1f}  {name}", file=stream)
+            previous = stamp
+        stream.flush()
+
+
+startup_profile = StartupProfiler(IMPORT_STARTED)
+
+# Upper bound for waiting on the first expose before finishing startup anyway.
+FIRST_PAINT_TIMEOUT_MS = 200
+
+
+def read_meminfo() -> dict:
+    """Return the fields of /proc/meminfo in bytes, or an empty dict if unavailable."""
+    info = {}
+    try:
+        with open("/proc/meminfo", "r", encoding="ascii") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                parts = value.split()
+                if parts and parts[0].isdigit():
+                    info[key] = int(parts[0]) * 1024
+    except OSError:
+        pass
+    return info
+
+
+# Size of a memory page, used to convert /proc/<pid>/statm values to bytes.
+try:
+    PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):
+    PAGE_SIZE = 4096
+
+
+def process_rss(pid: int) -> int:
+    """Return the resident set size of *pid* in bytes, or 0 if it cannot be read."""
+    if pid <= 0:
+        return 0
+    try:
+        with open(f"/proc/{pid}/statm", "r", encoding="ascii") as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return 0
+
+
+# Clock ticks per second, used to convert /proc/<pid>/stat CPU times.
+try:
+    CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+except (AttributeError, ValueError, OSError):
+    CLOCK_TICKS = 100
+
 
+def process_cpu_ticks(pid: int) -> int:
+    """Return the user plus system CPU time of *pid* in clock ticks, or -1."""
+    if pid <= 0:
+        return -1
+    try:
+        with open(f"/proc/{pid}/stat", "r", encoding="ascii", errors="replace") as f:
+            data = f.read()
+        # The command name may contain spaces, so split after its closing parenthesis
+        fields = data[data.rindex(")") + 2:].split()
+        return int(fields[11]) + int(fields[12])
+    except (OSError, IndexError, ValueError):
+        return -1
+
+
+def renderer_pid(view: QWebEngineView) -> int:
+    """Return the PID of the Chromium renderer behind *view* (QtWebEngine 5.15+)."""
+    page = view.page()
+    if page is None or not hasattr(page, "renderProcessPid"):
+        return 0
+    return int(page.renderProcessPid())
 
-# Name of the JSON configuration file expected to reside alongside this script.
-CONFIG_FILE = "config.json"
 
+# The profile shared by every tab; created on first use.
+_shared_profile: QWebEngineProfile | None = None
 
-def read_config() -> dict:
-    """Read and validate the configuration from CONFIG_FILE.
 
-    Returns a dictionary with two keys:
+def apply_profile_config(profile: QWebEngineProfile, config: ConfigSnapshot) -> None:
+    """Apply the ``cache`` configuration section to *profile*."""
+    options = config.section("cache")
+    profile.setHttpCacheMaximumSize(max(0, int(options["size_mb"])) * 1024 * 1024)
+    if options["persistent_cookies"]:
+        profile.setPersistentCookiesPolicy(QWebEngineProfile.ForcePersistentCookies)
+    else:
+        profile.setPersistentCookiesPolicy(QWebEngineProfile.AllowPersistentCookies)
 
-    - ``home_url``: The URL to load when the application starts.  A
-      default of ``https://www.google.com`` is used if this value is
-      missing or invalid.  If the URL string does not specify a
-      protocol, ``https://`` is prefixed automatically.
 
-    - ``macros``: A list of dictionaries defining the macro text
-      boxes.  Each entry must contain ``name`` and ``text``
-      strings.  The ``name`` is used as a label and the ``text`` is
-      placed into the associated QLineEdit.  Entries with missing or
-      invalid fields are skipped.
+def shared_profile() -> QWebEngineProfile:
+    """Return the persistent profile shared by all tabs.
+
+    Unlike the implicit default profile, this one keeps a disk HTTP
+    cache and cookies under :func:`cache_dir`, so the Guacamole web
+    client's scripts, styles and fonts survive restarts and do not have
+    to be fetched through the VPN again.  The profile is parented to the
+    QApplication so it outlives every page that uses it.
     """
-    cfg = {
-        "home_url": "https://www.google.com",
-        "macros": [],
+    global _shared_profile
+    if _shared_profile is None:
+        root = cache_dir()
+        profile = QWebEngineProfile("guacagui", QApplication.instance())
+        profile.setCachePath(os.path.join(root, "http"))
+        profile.setPersistentStoragePath(os.path.join(root, "storage"))
+        profile.setHttpCacheType(QWebEngineProfile.DiskHttpCache)
+        apply_profile_config(profile, config_snapshot())
+        install_guacamole_hook(profile)
+        _shared_profile = profile
+    return _shared_profile
+
+
+# Injected into every page at document creation, before the Guacamole
+# web client runs.  It wraps WebSocket so that Guacamole tunnels (the
+# "guacamole" subprotocol) can be observed without touching the client:
+#
+# - every "sync" from the server ends a display frame, so their rate is
+#   the frame rate;
+# - the client answers each frame with its own "sync" once it has been
+#   rendered, so server syncs not yet answered are the frame backlog;
+# - guacamole-common-js sends an internal "ping" with a timestamp that
+#   the server echoes back, which gives the tunnel round-trip time.
+#
+# The payload bytes sent and received on all tunnels of the page are
+# counted as well; text frames are counted in UTF-16 units, which equal
+# bytes for the ASCII (mostly base64) bulk of Guacamole traffic.
+#
+# ``__guacagui.typeKeys`` writes key press/release instructions for a list
+# of keysyms to the most recent connected tunnel, exactly as
+# Guacamole.Client.sendKeyEvent would, so that KeyTyper can type into a
+# session without going through the clipboard.  While the bridge's
+# ``mirror`` property is set, the key events the user sends are reported
+# back so that BroadcastGroup can replay them in other tabs.
+#
+# Writes of the web client's login to local storage (GUAC_AUTH, or
+# GUAC_AUTH_TOKEN in newer releases) are reported so that TokenManager
+# can share and renew the token.
+#
+# Statistics are reported to the tab's GuacBridge over QWebChannel.
+# Element lengths are compared in UTF-16 units, which matches the
+# protocol's code point lengths for everything but astral characters.
+GUAC_HOOK_JS = """
+(function () {
+    'use strict';
+    if (window.__guacagui || !window.WebSocket) return;
+    %(qwebchannel)s
+    var REPORT_MS = %(report_ms)d;
+    var NativeWebSocket = window.WebSocket;
+    var tunnels = [];
+    var queue = [];
+    var reporter = null;
+    var api = { bridge: null, tunnels: tunnels, rx: 0, tx: 0 };
+    Object.defineProperty(window, '__guacagui', { value: api });
+
+    function connectChannel() {
+        if (api.bridge || api.connecting || !window.qt || !window.qt.webChannelTransport) return;
+        api.connecting = true;
+        new QWebChannel(window.qt.webChannelTransport, function (channel) {
+            api.bridge = channel.objects.guacagui;
+            queue.splice(0).forEach(function (message) { api.bridge.report(message); });
+        });
+    }
+
+    function post(message) {
+        message = JSON.stringify(message);
+        connectChannel();
+        if (api.bridge) api.bridge.report(message);
+        else if (queue.length < 50) queue.push(message);
+    }
+    api.post = post;
+
+    // Call handler(elements) for each complete instruction in data and
+    // return the incomplete remainder.  Only the opcode is extracted
+    // unless wanted[opcode] asks for the arguments as well.
+    function scan(data, wanted, handler) {
+        var pos = 0, length = data.length;
+        while (pos < length) {
+            var start = pos, elements = [];
+            for (;;) {
+                var dot = data.indexOf('.', pos);
+                if (dot < 0) return data.substring(start);
+                var end = dot + 1 + parseInt(data.substring(pos, dot), 10);
+                if (!(end < length)) return data.substring(start);
+                if (elements.length === 0 || wanted[elements[0]]) elements.push(data.substring(dot + 1, end));
+                pos = end + 1;
+                if (data.charAt(end) === ';') break;
+            }
+            handler(elements);
+        }
+        return '';
+    }
+
+    function byteLength(data) {
+        if (typeof data === 'string') return data.length;
+        if (data && data.byteLength !== undefined) return data.byteLength;
+        if (data && data.size !== undefined) return data.size;
+        return 0;
+    }
+
+    var SERVER_ARGS = { '': true };
+    var CLIENT_ARGS = { key: true };
+
+    function Tunnel(socket) {
+        this.socket = socket;
+        this.rest = '';
+        this.frames = 0;
+        this.instructions = 0;
+        this.serverSyncs = 0;
+        this.clientSyncs = 0;
+        this.rtt = -1;
+        this.connected = false;
+    }
+
+    function report() {
+        var now = Date.now(), stats = { type: 'stats', tunnels: tunnels.length, connected: false,
+            rtt: -1, fps: 0, backlog: 0, ips: 0, rx: api.rx, tx: api.tx };
+        tunnels.forEach(function (t) {
+            var seconds = Math.max(0.001, (now - (t.lastReport || now - REPORT_MS)) / 1000);
+            stats.connected = stats.connected || t.connected;
+            if (t.rtt >= 0) stats.rtt = Math.max(stats.rtt, t.rtt);
+            stats.fps += t.frames / seconds;
+            stats.ips += t.instructions / seconds;
+            stats.backlog += Math.max(0, t.serverSyncs - t.clientSyncs);
+            t.frames = 0;
+            t.instructions = 0;
+            t.lastReport = now;
+        });
+        api.decorate && api.decorate(stats, tunnels);
+        post(stats);
+        if (!tunnels.length && reporter) {
+            clearInterval(reporter);
+            reporter = null;
+        }
+    }
+
+    function track(socket) {
+        var tunnel = new Tunnel(socket);
+        tunnels.push(tunnel);
+        socket.addEventListener('message', function (event) {
+            api.rx += byteLength(event.data);
+            if (typeof event.data !== 'string') return;
+            tunnel.rest = scan(tunnel.rest + event.data, SERVER_ARGS, function (e) {
+                tunnel.instructions++;
+                if (e[0] === 'sync') {
+                    tunnel.frames++;
+                    tunnel.serverSyncs++;
+                    if (!tunnel.connected) {
+                        tunnel.connected = true;
+                        report();
+                    }
+                } else if (e[0] === '' && e[1] === 'ping' && e.length > 2) {
+                    tunnel.rtt = Date.now() - parseInt(e[2], 10);
+                }
+            });
+            api.onmessage && api.onmessage(tunnel, event.data);
+        });
+        socket.addEventListener('close', function () {
+            var index = tunnels.indexOf(tunnel);
+            if (index >= 0) tunnels.splice(index, 1);
+            report();
+        });
+        var nativeSend = socket.send;
+        socket.send = function (data) {
+            api.tx += byteLength(data);
+            if (typeof data === 'string') {
+                var mirror = api.bridge && api.bridge.mirror && !api.injecting, keys = null;
+                scan(data, CLIENT_ARGS, function (e) {
+                    if (e[0] === 'sync') tunnel.clientSyncs++;
+                    else if (mirror && e[0] === 'key') (keys = keys || []).push([+e[1], e[2] === '1']);
+                });
+                if (keys) post({ type: 'keys', keys: keys });
+            }
+            api.onsend && api.onsend(tunnel, data);
+            return nativeSend.call(socket, data);
+        };
+        if (!reporter) reporter = setInterval(report, REPORT_MS);
     }
-    config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), CONFIG_FILE)
-    if not os.path.exists(config_path):
-        return cfg
+
+    function activeTunnel() {
+        for (var i = tunnels.length - 1; i >= 0; i--) {
+            var t = tunnels[i];
+            if (t.connected && t.socket.readyState === NativeWebSocket.OPEN) return t;
+        }
+        return null;
+    }
+
+    // Send a press and a release for each keysym in keys; [keysym, pressed]
+    // entries send a single event instead.  Returns the number of entries
+    // sent: 0 while more than maxBuffered bytes are still waiting to go
+    // out, -1 if there is no connected session.
+    api.typeKeys = function (keys, maxBuffered) {
+        var tunnel = activeTunnel();
+        if (!tunnel) return -1;
+        if (maxBuffered > 0 && tunnel.socket.bufferedAmount > maxBuffered) return 0;
+        var message = '';
+        keys.forEach(function (entry) {
+            var value = String(Array.isArray(entry) ? entry[0] : entry);
+            var key = '3.key,' + value.length + '.' + value + ',';
+            if (!Array.isArray(entry)) message += key + '1.1;' + key + '1.0;';
+            else message += key + (entry[1] ? '1.1;' : '1.0;');
+        });
+        api.injecting = true;
+        try {
+            tunnel.socket.send(message);
+        } finally {
+            api.injecting = false;
+        }
+        return keys.length;
+    };
+
+    function isGuacamole(url, protocols) {
+        var list = Array.isArray(protocols) ? protocols : [protocols];
+        return list.indexOf('guacamole') >= 0 || /websocket-tunnel/.test(String(url));
+    }
+
+    function GuacaguiWebSocket(url, protocols) {
+        var socket = arguments.length > 1
+            ? new NativeWebSocket(url, protocols) : new NativeWebSocket(url);
+        if (isGuacamole(url, protocols)) track(socket);
+        return socket;
+    }
+    GuacaguiWebSocket.prototype = NativeWebSocket.prototype;
+    ['CONNECTING', 'OPEN', 'CLOSING', 'CLOSED'].forEach(function (name) {
+        GuacaguiWebSocket[name] = NativeWebSocket[name];
+    });
+    window.WebSocket = GuacaguiWebSocket;
+    document.addEventListener('DOMContentLoaded', connectChannel);
+
+    var AUTH_KEYS = { GUAC_AUTH: true, GUAC_AUTH_TOKEN: true };
+    var nativeSetItem = Storage.prototype.setItem;
+    var nativeRemoveItem = Storage.prototype.removeItem;
+    Storage.prototype.setItem = function (key, value) {
+        nativeSetItem.apply(this, arguments);
+        if (AUTH_KEYS[key] && this === window.localStorage) post({ type: 'auth', key: key, value: String(value) });
+    };
+    Storage.prototype.removeItem = function (key) {
+        nativeRemoveItem.apply(this, arguments);
+        if (AUTH_KEYS[key] && this === window.localStorage) post({ type: 'auth', key: key, value: null });
+    };
+
+    // JSON files of the web client kept by AssetCache; it sets
+    // window.__guacaguiAssets from its own profile script.
+    var JSON_ASSET = /^(translations\\/[\\w-]+\\.json|api\\/languages|api\\/patches)$/;
+    function assetKey(method, url) {
+        var assets = window.__guacaguiAssets;
+        if (!assets || String(method).toUpperCase() !== 'GET') return null;
+        try {
+            url = new URL(url, document.baseURI);
+        } catch (e) {
+            return null;
+        }
+        if (url.search && !/^\\?b=[^&]*$/.test(url.search)) return null;
+        var key = url.origin + url.pathname;
+        if (key.indexOf(assets.base) !== 0 || !JSON_ASSET.test(key.substring(assets.base.length))) return null;
+        return key;
+    }
+    var nativeOpen = XMLHttpRequest.prototype.open;
+    XMLHttpRequest.prototype.open = function (method, url) {
+        var args = Array.prototype.slice.call(arguments);
+        var key = assetKey(method, url);
+        var cached = key && window.__guacaguiAssets.files[key];
+        if (cached) {
+            // A blob URL is same-origin, so the client cannot tell the difference
+            args[1] = URL.createObjectURL(new Blob([cached[1]], { type: cached[0] }));
+            this.addEventListener('loadend', function () { URL.revokeObjectURL(args[1]); });
+        } else if (key) {
+            // AssetCache fetches the file itself; pages never supply its content
+            post({ type: 'asset', url: key });
+        }
+        return nativeOpen.apply(this, args);
+    };
+})();
+"""
+
+
+def qwebchannel_source() -> str:
+    """Return the source of Qt's qwebchannel.js client library."""
+    resource = QFile(":/qtwebchannel/qwebchannel.js")
+    if not resource.open(QIODevice.ReadOnly):
+        return ""
     try:
-        with open(config_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        # Parse home_url
-        url = data.get("home_url", cfg["home_url"])
-        if isinstance(url, str):
-            url = url.strip()
-            if not url.startswith(("http://", "https://")):
-                # Default to https for unspecified schemes
-                url = "https://" + url
-            cfg["home_url"] = url
-        # Parse macros list
-        macros = data.get("macros", [])
-        if isinstance(macros, list):
-            cleaned = []
-            for entry in macros:
-                if not isinstance(entry, dict):
-                    continue
-                # Accept alternate key names for convenience
-                name = entry.get("name") or entry.get("label") or entry.get("button")
-                text = entry.get("text") or entry.get("macro")
-                if isinstance(name, str) and isinstance(text, str):
-                    cleaned.append({"name": name, "text": text})
-            cfg["macros"] = cleaned
-        return cfg
-    except Exception:
-        return cfg
+        return bytes(resource.readAll()).decode("utf-8")
+    finally:
+        resource.close()
+
+
+def install_guacamole_hook(profile: QWebEngineProfile) -> None:
+    """Add GUAC_HOOK_JS to *profile* so every page reports tunnel statistics."""
+    options = config_snapshot().section("hud")
+    script = QWebEngineScript()
+    script.setName("guacagui-hook")
+    script.setInjectionPoint(QWebEngineScript.DocumentCreation)
+    script.setWorldId(QWebEngineScript.MainWorld)
+    script.setRunsOnSubFrames(False)
+    script.setSourceCode(GUAC_HOOK_JS % {
+        "qwebchannel": qwebchannel_source(),
+        "report_ms": max(100, int(options["report_interval_ms"])),
+    })
+    profile.scripts().insert(script)
+
+
+# Classifies the page's Resource Timing entries recorded since the last
+# call: a zero transfer size with a body means the response came from
+# the HTTP cache, a transfer smaller than the body is a revalidated
+# (304) response.  Entries without timing details (cross-origin
+# resources without Timing-Allow-Origin) are ignored.
+CACHE_STATS_JS = """
+(function () {
+    var entries = performance.getEntriesByType('navigation')
+        .concat(performance.getEntriesByType('resource'));
+    var start = window.__guacaguiCacheSeen || 0;
+    if (!start) performance.setResourceTimingBufferSize(2000);
+    window.__guacaguiCacheSeen = entries.length;
+    var result = [0, 0, 0, 0, 0];
+    for (var i = start; i < entries.length; i++) {
+        var e = entries[i];
+        if (!e.decodedBodySize) continue;
+        if (e.transferSize === 0) {
+            result[0]++;
+            result[4] += e.decodedBodySize;
+        } else if (e.transferSize < e.encodedBodySize) {
+            result[1]++;
+            result[3] += e.transferSize;
+            result[4] += e.decodedBodySize;
+        } else {
+            result[2]++;
+            result[3] += e.transferSize;
+        }
+    }
+    return result;
+})();
+"""
+
+
+class HttpCacheStats:
+    """Process-wide HTTP cache hit/miss counters for the shared profile.
+
+    QtWebEngine does not report cache activity directly, so every tab
+    evaluates ``CACHE_STATS_JS`` in an isolated world when a page has
+    finished loading and the results are accumulated here.
+    """
+
+    __slots__ = ("hits", "revalidated", "misses", "network_bytes", "cached_bytes")
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.network_bytes = 0
+        self.cached_bytes = 0
+
+    def add(self, result) -> None:
+        """Accumulate one ``CACHE_STATS_JS`` result."""
+        if not isinstance(result, list) or len(result) != 5:
+            return
+        hits, revalidated, misses, network_bytes, cached_bytes = (int(v) for v in result)
+        self.hits += hits
+        self.revalidated += revalidated
+        self.misses += misses
+        self.network_bytes += network_bytes
+        self.cached_bytes += cached_bytes
+
+    def hit_ratio(self) -> float:
+        total = self.hits + self.revalidated + self.misses
+        return (self.hits + self.revalidated) / total if total else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"Cache hits: {self.hits}\n"
+            f"Revalidated (304): {self.revalidated}\n"
+            f"Misses: {self.misses}\n"
+            f"Hit ratio: {self.hit_ratio():.0%}\n"
+            f"Downloaded: {self.network_bytes / 1024:.0f} KiB\n"
+            f"Served from cache: {self.cached_bytes / 1024:.0f} KiB"
+        )
+
+
+# Counters shared by all tabs of the process.
+cache_stats = HttpCacheStats()
+
+
+class SessionStats:
+    """Latest Guacamole tunnel statistics reported by a tab's page."""
+
+    __slots__ = ("tunnels", "connected", "rtt_ms", "fps", "backlog", "instructions_per_s", "updated")
+
+    def __init__(self, data: dict | None = None) -> None:
+        data = data or {}
+        self.tunnels = int(data.get("tunnels", 0))
+        self.connected = bool(data.get("connected", False))
+        self.rtt_ms = float(data.get("rtt", -1))
+        self.fps = float(data.get("fps", 0.0))
+        self.backlog = int(data.get("backlog", 0))
+        self.instructions_per_s = float(data.get("ips", 0.0))
+        self.updated = time.monotonic()
+
+    def describe(self) -> str:
+        if not self.tunnels:
+            return ""
+        rtt = f"{self.rtt_ms:.0f} ms" if self.rtt_ms >= 0 else "–"
+        return f"RTT {rtt} · {self.fps:.0f} fps · backlog {self.backlog}"
+
+
+class TunnelTraffic:
+    """Bytes sent and received on a tab's Guacamole tunnels.
+
+    The page reports running totals that start over whenever it is
+    reloaded; ``update`` folds them into session totals for the tab and
+    derives the rates from the growth since the previous report.
+    """
+
+    __slots__ = ("received", "sent", "rx_rate", "tx_rate", "last_rx", "last_tx", "updated")
+
+    # Rates older than this are stale: the page stops reporting once its
+    # last tunnel is closed.
+    STALE_SECONDS = 5.0
+
+    def __init__(self) -> None:
+        self.received = 0
+        self.sent = 0
+        self.rx_rate = 0.0
+        self.tx_rate = 0.0
+        self.last_rx = 0
+        self.last_tx = 0
+        self.updated = 0.0
+
+    def update(self, rx: int, tx: int) -> None:
+        now = time.monotonic()
+        # A total smaller than the previous one means the page was reloaded
+        delta_rx = rx - self.last_rx if rx >= self.last_rx else rx
+        delta_tx = tx - self.last_tx if tx >= self.last_tx else tx
+        self.received += delta_rx
+        self.sent += delta_tx
+        elapsed = now - self.updated
+        if self.updated and elapsed > 0:
+            self.rx_rate = delta_rx / elapsed
+            self.tx_rate = delta_tx / elapsed
+        self.last_rx, self.last_tx = rx, tx
+        self.updated = now
+
+    def rates(self) -> tuple:
+        """Return the current (receive, send) rates in bytes per second."""
+        if time.monotonic() - self.updated > self.STALE_SECONDS:
+            return 0.0, 0.0
+        return self.rx_rate, self.tx_rate
+
+    def as_dict(self) -> dict:
+        rx_rate, tx_rate = self.rates()
+        return {
+            "received_bytes": self.received,
+            "sent_bytes": self.sent,
+            "receive_rate_bps": round(rx_rate, 1),
+            "send_rate_bps": round(tx_rate, 1),
+        }
+
+
+def format_rate(rate: float) -> str:
+    """Format a byte rate for display."""
+    if rate >= 1024 * 1024:
+        return f"{rate / (1024 * 1024):.1f} MB/s"
+    return f"{rate / 1024:.0f} KB/s"
+
+
+class GuacBridge(QObject):
+    """Receives messages from GUAC_HOOK_JS in one tab over QWebChannel.
+
+    Registered on the tab's page as ``guacagui``.  Messages are JSON
+    objects with a ``type``; ``stats`` messages update ``stats`` and emit
+    ``stats_changed``, ``keys`` messages carry the ``[keysym, pressed]``
+    events the user sent while ``mirror`` is set and emit ``keys_sent``,
+    ``auth`` messages report a login or logout of the web client
+    with ``auth_changed`` (``None`` on logout), and ``asset`` messages
+    name a JSON file the AssetCache does not have yet, emitted with
+    ``asset_missed``.  ``auth`` and ``asset`` messages are only taken
+    from the Guacamole web application.
+    """
+
+    stats_changed = pyqtSignal(object)
+    keys_sent = pyqtSignal(object, list)
+    mirror_changed = pyqtSignal(bool)
+    auth_changed = pyqtSignal(object)
+    asset_missed = pyqtSignal(str)
+
+    def __init__(self, tab: "BrowserTab") -> None:
+        super().__init__(tab)
+        self.tab = tab
+        self.stats = SessionStats()
+        self.traffic = TunnelTraffic()
+        self._mirror = False
+
+    def on_guacamole(self) -> bool:
+        """Return True if the tab shows the Guacamole web application of ``home_url``.
 
+        GUAC_HOOK_JS runs on every page, so messages that affect other
+        tabs are only taken from there.
+        """
+        return self.tab.url().toString().startswith(guacamole_base_url())
+
+    @pyqtProperty(bool, notify=mirror_changed)
+    def mirror(self) -> bool:
+        return self._mirror
+
+    def set_mirror(self, mirror: bool) -> None:
+        if mirror != self._mirror:
+            self._mirror = mirror
+            self.mirror_changed.emit(mirror)
 
-def read_home_url() -> str:
-    """Return the configured home URL with scheme, falling back to the default."""
-    return read_config().get("home_url", "https://www.google.com")
+    @pyqtSlot(str)
+    def report(self, message: str) -> None:
+        try:
+            data = json.loads(message)
+        except ValueError:
+            return
+        if not isinstance(data, dict):
+            return
+        if data.get("type") == "stats":
+            self.stats = SessionStats(data)
+            self.traffic.update(int(data.get("rx", 0)), int(data.get("tx", 0)))
+            self.stats_changed.emit(self.tab)
+        elif data.get("type") == "keys" and self._mirror and self.on_guacamole():
+            keys = [
+                (int(entry[0]), bool(entry[1]))
+                for entry in data.get("keys", ())
+                if isinstance(entry, list) and len(entry) == 2
+            ]
+            if keys:
+                self.keys_sent.emit(self.tab, keys)
+        elif data.get("type") == "auth" and self.on_guacamole():
+            value = data.get("value")
+            if value is None:
+                self.auth_changed.emit(None)
+                return
+            stored = {"GUAC_AUTH": value, "GUAC_AUTH_TOKEN": None}
+            if data.get("key") == "GUAC_AUTH_TOKEN":
+                stored = {"GUAC_AUTH": None, "GUAC_AUTH_TOKEN": value}
+            auth = parse_page_auth(json.dumps({"auth": stored["GUAC_AUTH"], "token": stored["GUAC_AUTH_TOKEN"]}))
+            if auth is not None:
+                self.auth_changed.emit(auth)
+        elif data.get("type") == "asset" and self.on_guacamole():
+            self.asset_missed.emit(str(data.get("url", "")))
+
+
+class SessionOverlay(QLabel):
+    """Small translucent label in the corner of a tab showing its session statistics."""
+
+    def __init__(self, parent: QWidget) -> None:
+        super().__init__(parent)
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.setStyleSheet(
+            "background: rgba(0, 0, 0, 160); color: white; padding: 2px 6px; font-size: 11px;"
+        )
+        self.hide()
+
+    def show_stats(self, stats: SessionStats) -> None:
+        text = stats.describe()
+        if not text:
+            self.hide()
+            return
+        self.setText(text)
+        self.adjustSize()
+        self.move(self.parentWidget().width() - self.width() - 8, 8)
+        self.raise_()
+        self.show()
 
 
-def read_macros() -> list:
-    """Return the list of macro definitions from the configuration file."""
-    return read_config().get("macros", [])
+# Keysyms for the control characters that macros may contain
+CONTROL_KEYSYMS = {
+    "\b": 0xFF08,  # BackSpace
+    "\t": 0xFF09,  # Tab
+    "\n": 0xFF0D,  # Return
+    "\x1b": 0xFF1B,  # Escape
+}
+
+
+def text_to_keysyms(text: str) -> list:
+    """Translate *text* into X11 keysyms as sent by Guacamole.Keyboard.
+
+    Latin-1 characters are their own keysym and other characters use
+    the Unicode keysym range; line breaks become Return.  Control
+    characters without a keysym are dropped.
+    """
+    keysyms = []
+    for char in text.replace("\r\n", "\n").replace("\r", "\n"):
+        code = ord(char)
+        if char in CONTROL_KEYSYMS:
+            keysyms.append(CONTROL_KEYSYMS[char])
+        elif 0x20 <= code <= 0x7E or 0xA0 <= code <= 0xFF:
+            keysyms.append(code)
+        elif code > 0xFF:
+            keysyms.append(0x01000000 | code)
+    return keysyms
+
+
+class KeyTyper(QObject):
+    """Type text into the Guacamole session of one tab as key events.
+
+    Text is translated with :func:`text_to_keysyms` and queued; batches
+    of ``typing.batch_size`` keys are handed to the page's
+    ``__guacagui.typeKeys`` and the next batch is scheduled so that the
+    overall rate stays at ``typing.keys_per_second``.  While the tunnel
+    still has more than ``typing.max_buffered_kb`` waiting to be sent
+    the batch is retried later instead.  ``finished`` reports the tab,
+    the number of keys typed and whether the whole queue went out.
+    """
+
+    finished = pyqtSignal(object, int, bool)
+
+    # Give up when the page neither answers nor accepts keys for this long
+    STALL_TIMEOUT_S = 10.0
+    RETRY_MS = 50
+
+    def __init__(self, tab: "BrowserTab") -> None:
+        super().__init__(tab)
+        self.tab = tab
+        self.queue: deque = deque()
+        self.typed = 0
+        self.in_flight = 0
+        # Numbers the batches, so that an answer arriving after its
+        # batch timed out cannot be taken for the next batch's
+        self.batch_id = 0
+        self.progress_at = 0.0
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.on_timeout)
+
+    @property
+    def busy(self) -> bool:
+        return bool(self.queue) or self.in_flight > 0
+
+    def type_text(self, text: str) -> int:
+        """Queue *text* for typing and return the number of keys queued."""
+        return self.send_keys(text_to_keysyms(text))
+
+    def send_keys(self, keys: list) -> int:
+        """Queue keysyms (typed) or ``(keysym, pressed)`` events and return their number."""
+        if not keys:
+            return 0
+        idle = not self.busy
+        self.queue.extend(keys)
+        if idle:
+            self.typed = 0
+            self.progress_at = time.monotonic()
+            self.send_batch()
+        return len(keys)
+
+    def cancel(self) -> None:
+        """Drop the keys that have not been sent yet."""
+        self.timer.stop()
+        dropped = bool(self.queue)
+        self.queue.clear()
+        if dropped and not self.in_flight:
+            self.finished.emit(self.tab, self.typed, False)
+
+    @pyqtSlot()
+    def on_timeout(self) -> None:
+        if self.in_flight:
+            # The page never answered, most likely it navigated away
+            self.in_flight = 0
+            self.queue.clear()
+            self.finished.emit(self.tab, self.typed, False)
+        else:
+            self.send_batch()
+
+    def send_batch(self) -> None:
+        if not self.queue or self.in_flight:
+            return
+        if time.monotonic() - self.progress_at > self.STALL_TIMEOUT_S:
+            self.queue.clear()
+            self.finished.emit(self.tab, self.typed, False)
+            return
+        options = config_snapshot().section("typing")
+        size = max(1, int(options["batch_size"]))
+        batch = [self.queue[i] for i in range(min(size, len(self.queue)))]
+        self.in_flight = len(batch)
+        self.batch_id += 1
+        max_buffered = int(options["max_buffered_kb"] * 1024)
+        self.tab.page().runJavaScript(
+            f"window.__guacagui ? window.__guacagui.typeKeys({json.dumps(batch)}, {max_buffered}) : -1",
+            partial(self.on_batch_sent, self.batch_id),
+        )
+        # The callback never comes if the page goes away meanwhile
+        self.timer.start(int(self.STALL_TIMEOUT_S * 1000))
+
+    def on_batch_sent(self, batch_id: int, result) -> None:
+        if batch_id != self.batch_id or not self.in_flight:
+            return
+        self.timer.stop()
+        self.in_flight = 0
+        sent = int(result) if isinstance(result, (int, float)) else -1
+        if sent < 0:
+            self.queue.clear()
+            self.finished.emit(self.tab, self.typed, False)
+            return
+        for _ in range(min(sent, len(self.queue))):
+            self.queue.popleft()
+        if sent:
+            self.typed += sent
+            self.progress_at = time.monotonic()
+        if not self.queue:
+            self.finished.emit(self.tab, self.typed, True)
+            return
+        rate = max(1.0, float(config_snapshot().section("typing")["keys_per_second"]))
+        self.timer.start(int(sent * 1000 / rate) if sent else self.RETRY_MS)
+
+
+# Stable identifiers for tabs, used by the control socket
+_tab_ids = count(1)
+
+
+# Short names of the QWebEngineUrlRequestInfo resource types ("script",
+# "stylesheet", "xhr", ...), as shown in the waterfall and HAR exports.
+RESOURCE_TYPE_NAMES = {
+    getattr(QWebEngineUrlRequestInfo, name): name[len("ResourceType"):].lower()
+    for name in dir(QWebEngineUrlRequestInfo)
+    if name.startswith("ResourceType") and name not in ("ResourceType", "ResourceTypeLast")
+}
+
+# Returns the page's navigation and Resource Timing entries as
+# [url, start (ms since the epoch), duration (ms), transfer size, body
+# size, initiator type].  Resources only appear once they have finished.
+REQUEST_TIMING_JS = """
+(function () {
+    performance.setResourceTimingBufferSize(2000);
+    var origin = performance.timeOrigin;
+    return JSON.stringify(performance.getEntriesByType('navigation')
+        .concat(performance.getEntriesByType('resource'))
+        .filter(function (e) { return e.duration > 0; })
+        .map(function (e) {
+            return [e.name, origin + e.startTime, e.duration, e.transferSize || 0,
+                    e.encodedBodySize || 0, e.initiatorType];
+        }));
+})();
+"""
+
+
+class RequestRecord:
+    """One request seen by a :class:`RequestRecorder`.
+
+    ``started`` is when the request was intercepted; ``timing_start`` and
+    the sizes and duration come from the page's Resource Timing once the
+    request has finished (they stay None for requests without an entry,
+    such as the WebSocket tunnel).
+    """
+
+    __slots__ = (
+        "url", "method", "resource_type", "started", "timing_start", "duration_ms", "transfer_size", "body_size",
+        "initiator",
+    )
+
+    def __init__(self, url: str, method: str, resource_type: str, started: float) -> None:
+        self.url = url
+        self.method = method
+        self.resource_type = resource_type
+        self.started = started
+        self.timing_start: float | None = None
+        self.duration_ms: float | None = None
+        self.transfer_size: int | None = None
+        self.body_size: int | None = None
+        self.initiator = ""
+
+    @property
+    def start(self) -> float:
+        return self.timing_start if self.timing_start is not None else self.started
+
+    def as_har(self, pageref: str) -> dict:
+        """Return this request as a HAR 1.2 entry (headers and status are not known)."""
+        start = self.start
+        started = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(start)) + f".{int(start * 1000) % 1000:03d}Z"
+        duration = round(self.duration_ms or 0.0, 1)
+        return {
+            "pageref": pageref,
+            "startedDateTime": started,
+            "time": duration,
+            "request": {
+                "method": self.method,
+                "url": self.url,
+                "httpVersion": "",
+                "cookies": [],
+                "headers": [],
+                "queryString": [],
+                "headersSize": -1,
+                "bodySize": -1,
+            },
+            "response": {
+                "status": 0,
+                "statusText": "",
+                "httpVersion": "",
+                "cookies": [],
+                "headers": [],
+                "content": {"size": self.body_size or 0, "mimeType": ""},
+                "redirectURL": "",
+                "headersSize": -1,
+                "bodySize": self.transfer_size if self.transfer_size is not None else -1,
+            },
+            "cache": {},
+            "timings": {"send": 0, "wait": duration, "receive": 0},
+            "_resourceType": self.resource_type,
+            "_initiator": self.initiator,
+            "_completed": self.duration_ms is not None,
+        }
+
+
+class RequestRecorder(QWebEngineUrlRequestInterceptor):
+    """Page request interceptor that logs the requests of one tab.
+
+    The last ``requests.max_entries`` requests are kept in a ring buffer.
+    The interceptor only sees requests start; :meth:`update_timing` fills
+    in durations and sizes from the page's Resource Timing entries, which
+    only exist for the current document.
+    """
+
+    def __init__(self, tab: "BrowserTab") -> None:
+        super().__init__(tab)
+        self.tab = tab
+        self.records: deque = deque(maxlen=max(1, int(config_snapshot().section("requests")["max_entries"])))
+
+    def interceptRequest(self, info: QWebEngineUrlRequestInfo) -> None:
+        options = config_snapshot().section("requests")
+        if not options["enabled"]:
+            return
+        limit = max(1, int(options["max_entries"]))
+        if self.records.maxlen != limit:
+            self.records = deque(self.records, maxlen=limit)
+        self.records.append(RequestRecord(
+            info.requestUrl().toString(),
+            bytes(info.requestMethod()).decode("latin-1"),
+            RESOURCE_TYPE_NAMES.get(info.resourceType(), "other"),
+            time.time(),
+        ))
+
+    def clear(self) -> None:
+        self.records.clear()
+
+    def update_timing(self, callback=None) -> None:
+        """Merge the page's Resource Timing into the records, then call *callback*."""
+        self.tab.page().runJavaScript(
+            REQUEST_TIMING_JS, QWebEngineScript.ApplicationWorld, partial(self.on_timing, callback)
+        )
+
+    def on_timing(self, callback, result) -> None:
+        try:
+            entries = json.loads(result) if isinstance(result, str) else []
+        except ValueError:
+            entries = []
+        # Each entry completes the pending request for the same URL that
+        # was intercepted closest before it
+        seen = {(r.url.partition("#")[0], round(r.timing_start, 3)) for r in self.records if r.timing_start}
+        pending: dict = {}
+        for record in self.records:
+            if record.duration_ms is None:
+                pending.setdefault(record.url.partition("#")[0], []).append(record)
+        for url, start_ms, duration, transfer, body, initiator in entries:
+            start = start_ms / 1000.0
+            url = url.partition("#")[0]
+            if (url, round(start, 3)) in seen or url not in pending:
+                continue
+            candidates = [r for r in pending[url] if r.started <= start + 1.0]
+            if not candidates:
+                continue
+            record = min(candidates, key=lambda r: abs(start - r.started))
+            pending[url].remove(record)
+            record.timing_start = start
+            record.duration_ms = duration
+            record.transfer_size = transfer
+            record.body_size = body
+            record.initiator = initiator
+        if callback is not None:
+            callback()
 
 
 class BrowserTab(QWebEngineView):
@@ -129,6 +1135,27 @@ class BrowserTab(QWebEngineView):
     def __init__(self, main_window: "BrowserMainWindow", url: str | None = None) -> None:
         super().__init__()
         self.main_window = main_window
+        self.tab_id = next(_tab_ids)
+
+        # Lifecycle bookkeeping used by TabLifecycleManager
+        self.last_active = time.monotonic()
+        self.hidden_since: float | None = None
+        self.keep_alive = False
+        self.broadcast = False
+
+        # Last screenshot of the page, shown while a discarded tab reloads
+        self.screenshot: QPixmap | None = None
+        self.placeholder: QLabel | None = None
+
+        # Tab-open latency bookkeeping used by SpareTabPool
+        self.open_started: float | None = None
+        self.from_spare = False
+        self.loaded = False
+        # Start of the current page load, for the load duration metric
+        self.load_started: float | None = None
+
+        # Use the shared persistent profile (disk cache, cookies)
+        self.setPage(QWebEnginePage(shared_profile(), self))
 
         # Enable JavaScript clipboard access for this page.  See Qt
         # documentation: enabling both of these attributes grants the
@@ -143,18 +1170,41 @@ class BrowserTab(QWebEngineView):
         # feature being requested.
         self.page().featurePermissionRequested.connect(self.on_feature_permission_requested)
 
+        # Channel for the injected Guacamole hook (see GUAC_HOOK_JS)
+        self.bridge = GuacBridge(self)
+        self.channel = QWebChannel(self)
+        self.channel.registerObject("guacagui", self.bridge)
+        self.page().setWebChannel(self.channel)
+        self.bridge.stats_changed.connect(self.main_window.on_session_stats)
+        self.overlay: SessionOverlay | None = None
+        self.typer = KeyTyper(self)
+        self.typer.finished.connect(self.main_window.on_typing_finished)
+        self.bridge.keys_sent.connect(self.main_window.broadcast.on_keys)
+        self.bridge.auth_changed.connect(self.main_window.auth.on_page_auth)
+        self.bridge.asset_missed.connect(self.main_window.assets.on_page_asset)
+
+        # Request log for the waterfall panel
+        self.requests = RequestRecorder(self)
+        self.page().setUrlRequestInterceptor(self.requests)
+
         # Set the initial URL
-        initial_url = url or read_home_url()
+        initial_url = url or config_snapshot().home_url
         self.setUrl(QUrl(initial_url))
 
         # Connect signals to update the UI
         self.urlChanged.connect(self.on_url_changed)
+        self.loadStarted.connect(self.on_load_started)
         self.loadFinished.connect(self.on_load_finished)
         self.titleChanged.connect(self.on_title_changed)
+        self.page().renderProcessTerminated.connect(self.on_render_process_terminated)
 
     def createWindow(self, _type):  # type: ignore[override]
-        """Override createWindow to open new tabs instead of windows."""
-        new_tab = BrowserTab(self.main_window)
+        """Override createWindow to open new tabs instead of windows.
+
+        The popup's contents are adopted into the returned view, so a
+        pre-warmed spare saves the view, page and settings setup.
+        """
+        new_tab = self.main_window.spares.take(popup=True)
         self.main_window.add_browser_tab(new_tab, "New Tab")
         return new_tab
 
@@ -163,29 +1213,78 @@ class BrowserTab(QWebEngineView):
         """Update the tab text when the URL changes."""
         if self is self.main_window.current_browser():
             self.main_window.update_urlbar(url)
-        idx = self.main_window.tabs.indexOf(self)
-        if idx != -1:
-            self.main_window.tabs.setTabText(idx, url.toString())
+        self.main_window.tab_updates.schedule(self, url.toString())
+
+    def capture_screenshot(self) -> None:
+        """Remember what the page looks like while it is still on screen."""
+        if self.isVisible() and self.width() > 0 and self.height() > 0:
+            self.screenshot = self.grab()
+
+    def show_placeholder(self) -> None:
+        """Cover the view with the cached screenshot until the page has reloaded."""
+        if self.screenshot is None:
+            return
+        if self.placeholder is None:
+            self.placeholder = QLabel(self)
+            self.placeholder.setAlignment(Qt.AlignLeft | Qt.AlignTop)
+        self.placeholder.setPixmap(self.screenshot)
+        self.placeholder.setGeometry(self.rect())
+        self.placeholder.raise_()
+        self.placeholder.show()
+
+    def hide_placeholder(self) -> None:
+        if self.placeholder is not None:
+            self.placeholder.hide()
+
+    def show_session_overlay(self, visible: bool) -> None:
+        """Show or hide the session statistics overlay of this tab."""
+        if visible and self.overlay is None:
+            self.overlay = SessionOverlay(self)
+        if self.overlay is None:
+            return
+        if visible:
+            self.overlay.show_stats(self.bridge.stats)
+        else:
+            self.overlay.hide()
+
+    def resizeEvent(self, event):  # type: ignore[override]
+        super().resizeEvent(event)
+        if self.placeholder is not None and self.placeholder.isVisible():
+            self.placeholder.setGeometry(self.rect())
+        if self.overlay is not None and self.overlay.isVisible():
+            self.overlay.show_stats(self.bridge.stats)
+
+    @pyqtSlot()
+    def on_load_started(self) -> None:
+        self.load_started = time.monotonic()
 
     @pyqtSlot(bool)
-    def on_load_finished(self, _success: bool) -> None:
+    def on_load_finished(self, success: bool) -> None:
         """Update tab and window titles when a page finishes loading."""
+        self.hide_placeholder()
+        self.loaded = True
+        if self.load_started is not None:
+            metrics.page_loads.observe(time.monotonic() - self.load_started)
+            if not success:
+                metrics.page_load_failures += 1
+            self.load_started = None
+        if self.open_started is not None:
+            self.main_window.spares.record_when_painted(self)
+        self.page().runJavaScript(CACHE_STATS_JS, QWebEngineScript.ApplicationWorld, cache_stats.add)
         title = self.page().title() or self.url().toString() or "Untitled"
-        idx = self.main_window.tabs.indexOf(self)
-        if idx != -1:
-            self.main_window.tabs.setTabText(idx, title)
-        if self is self.main_window.current_browser():
-            self.main_window.update_title(title)
+        self.main_window.tab_updates.schedule(self, title, title)
+
+    @pyqtSlot(QWebEnginePage.RenderProcessTerminationStatus, int)
+    def on_render_process_terminated(self, status, _exit_code: int) -> None:
+        if status != QWebEnginePage.NormalTerminationStatus:
+            metrics.renderer_crashes += 1
 
     @pyqtSlot(str)
     def on_title_changed(self, title: str) -> None:
         """Update tab and window titles when the page title changes."""
-        idx = self.main_window.tabs.indexOf(self)
-        if idx != -1:
-            tab_text = title.strip() if title.strip() else self.url().toString()
-            self.main_window.tabs.setTabText(idx, tab_text)
-        if self is self.main_window.current_browser():
-            self.main_window.update_title(title.strip() if title.strip() else "Untitled")
+        title = title.strip()
+        tab_text = title if title else self.url().toString()
+        self.main_window.tab_updates.schedule(self, tab_text, title or "Untitled")
 
     @pyqtSlot(QUrl, QWebEnginePage.Feature)
     def on_feature_permission_requested(self, security_origin: QUrl, feature: QWebEnginePage.Feature) -> None:
@@ -202,6 +1301,1653 @@ class BrowserTab(QWebEngineView):
             )
 
 
+# Lifecycle states supported by this Qt build (QtWebEngine 5.14+).
+HAS_LIFECYCLE = hasattr(QWebEnginePage, "LifecycleState")
+
+
+class BrowserTabWidget(QTabWidget):
+    """QTabWidget that keeps a :class:`TabRegistry` informed of tab changes."""
+
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent)
+        self.registry = TabRegistry(self)
+        self.tabBar().tabMoved.connect(self.registry.invalidate)
+
+    def tabInserted(self, index: int) -> None:  # type: ignore[override]
+        super().tabInserted(index)
+        self.registry.invalidate()
+
+    def tabRemoved(self, index: int) -> None:  # type: ignore[override]
+        super().tabRemoved(index)
+        self.registry.invalidate()
+
+
+class TabRegistry(QObject):
+    """Constant-time lookup from a tab's widget to its index.
+
+    ``QTabWidget.indexOf`` scans every tab, which adds up when pages fire
+    title and URL changes in bursts.  The registry keeps a widget to
+    index dictionary that is rebuilt lazily, once, after tabs have been
+    inserted, removed or moved.
+    """
+
+    changed = pyqtSignal()
+
+    def __init__(self, tabs: QTabWidget) -> None:
+        super().__init__(tabs)
+        self.tabs = tabs
+        self.index: dict = {}
+        self.dirty = True
+
+    @pyqtSlot()
+    @pyqtSlot(int, int)
+    def invalidate(self, *_args) -> None:
+        self.dirty = True
+        self.changed.emit()
+
+    def index_of(self, widget) -> int:
+        """Return the index of *widget* in the tab widget, or -1."""
+        if self.dirty:
+            tabs = self.tabs
+            self.index = {tabs.widget(i): i for i in range(tabs.count())}
+            self.dirty = False
+        return self.index.get(widget, -1)
+
+
+class TabUpdateBatcher(QObject):
+    """Coalesce tab text and window title updates into one pass per frame.
+
+    Pages may change their title or URL many times in quick succession.
+    Instead of updating the tab bar on every signal, :meth:`schedule`
+    remembers the latest text per tab and a single timer applies all
+    pending changes roughly once per frame.  The window title is only
+    touched if the tab is still the current one when the batch runs.
+    """
+
+    FRAME_MS = 16
+
+    flushed = pyqtSignal(list)
+
+    def __init__(self, window: "BrowserMainWindow") -> None:
+        super().__init__(window)
+        self.main_window = window
+        self.pending: dict = {}
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(self.FRAME_MS)
+        self.timer.timeout.connect(self.flush)
+
+    def schedule(self, tab: "BrowserTab", tab_text: str, window_title: str | None = None) -> None:
+        """Queue *tab_text* for *tab* and, if given, *window_title* for the window."""
+        previous = self.pending.get(tab)
+        if window_title is None and previous is not None:
+            window_title = previous[1]
+        self.pending[tab] = (tab_text, window_title)
+        if not self.timer.isActive():
+            self.timer.start()
+
+    @pyqtSlot()
+    def flush(self) -> None:
+        pending, self.pending = self.pending, {}
+        window = self.main_window
+        tabs = window.tabs
+        current = window.current_browser()
+        updated = []
+        for tab, (tab_text, window_title) in pending.items():
+            idx = tabs.registry.index_of(tab)
+            if idx == -1:
+                continue
+            if tabs.tabText(idx) != tab_text:
+                tabs.setTabText(idx, tab_text)
+                updated.append(tab)
+            if window_title is not None and tab is current:
+                window.update_title(window_title)
+        if updated:
+            self.flushed.emit(updated)
+
+
+class TabLifecycleManager(QObject):
+    """Freeze background tabs to save CPU and battery.
+
+    Every tab that is not the current one records when it was hidden.
+    A periodic check moves tabs that have been in the background for
+    ``lifecycle.freeze_after_seconds`` to the ``Frozen`` lifecycle
+    state, which stops their JavaScript timers and display decoding,
+    and optionally to ``Discarded`` after ``discard_after_seconds``.
+    A tab is thawed back to ``Active`` as soon as it becomes current.
+
+    Tabs are never frozen if they are marked "keep live" from the tab
+    context menu, if their URL matches one of the ``keep_alive``
+    glob patterns in the configuration, or if QtWebEngine recommends
+    keeping them active (audio playing, DevTools open and so on).  Note
+    that a frozen Guacamole client stops answering the server, so guacd
+    may drop the session; allow-list consoles that must stay connected.
+    A value of 0 disables the corresponding transition.
+    """
+
+    state_changed = pyqtSignal(object)
+
+    def __init__(self, tabs: QTabWidget, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self.tabs = tabs
+        self.current: BrowserTab | None = None
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.check)
+        self.apply_config(config_snapshot())
+
+    def apply_config(self, config: ConfigSnapshot) -> None:
+        """Restart the periodic check with the interval from *config*."""
+        options = config.section("lifecycle")
+        self.timer.stop()
+        enabled = options["freeze_after_seconds"] > 0 or options["discard_after_seconds"] > 0
+        if HAS_LIFECYCLE and enabled:
+            self.timer.start(int(max(1, options["check_interval_seconds"]) * 1000))
+
+    def browsers(self) -> list:
+        """Return every BrowserTab in the tab widget."""
+        widgets = (self.tabs.widget(i) for i in range(self.tabs.count()))
+        return [w for w in widgets if isinstance(w, BrowserTab)]
+
+    def is_kept_alive(self, tab: "BrowserTab") -> bool:
+        """Return True if *tab* is on the allow-list and must stay active."""
+        if tab.keep_alive or tab.broadcast:
+            return True
+        patterns = config_snapshot().section("lifecycle")["keep_alive"]
+        url = tab.url().toString()
+        return any(fnmatch(url, pattern) for pattern in patterns)
+
+    def state(self, tab: "BrowserTab"):
+        """Return the lifecycle state of *tab*, or None if unsupported."""
+        if not HAS_LIFECYCLE:
+            return None
+        return tab.page().lifecycleState()
+
+    def set_state(self, tab: "BrowserTab", state) -> bool:
+        """Move *tab* to *state* if QtWebEngine allows it; return True on change."""
+        if not HAS_LIFECYCLE or tab is self.current:
+            return False
+        page = tab.page()
+        if page.lifecycleState() == state:
+            return False
+        # The recommended state is the lowest one the page can safely
+        # reach; Active < Frozen < Discarded.
+        if state > page.recommendedState():
+            return False
+        page.setLifecycleState(state)
+        self.state_changed.emit(tab)
+        return True
+
+    def freeze(self, tab: "BrowserTab") -> bool:
+        return self.set_state(tab, QWebEnginePage.LifecycleState.Frozen)
+
+    def discard(self, tab: "BrowserTab") -> bool:
+        return self.set_state(tab, QWebEnginePage.LifecycleState.Discarded)
+
+    def thaw(self, tab: "BrowserTab") -> None:
+        """Return *tab* to the Active state (a discarded tab reloads)."""
+        if not HAS_LIFECYCLE:
+            return
+        page = tab.page()
+        state = page.lifecycleState()
+        if state == QWebEnginePage.LifecycleState.Discarded:
+            # The page reloads from its URL; show the last screenshot meanwhile
+            tab.show_placeholder()
+        if state != QWebEnginePage.LifecycleState.Active:
+            page.setLifecycleState(QWebEnginePage.LifecycleState.Active)
+            self.state_changed.emit(tab)
+
+    def activate(self, tab: "BrowserTab | None") -> None:
+        """Record that *tab* is now the visible tab and thaw it immediately."""
+        now = time.monotonic()
+        previous = self.current
+        if previous is not None and previous is not tab:
+            previous.hidden_since = now
+            previous.last_active = now
+        self.current = tab
+        if tab is None:
+            return
+        tab.hidden_since = None
+        tab.last_active = now
+        self.thaw(tab)
+
+    @pyqtSlot()
+    def check(self) -> None:
+        """Freeze or discard tabs that have been hidden for long enough."""
+        options = config_snapshot().section("lifecycle")
+        freeze_after = options["freeze_after_seconds"]
+        discard_after = options["discard_after_seconds"]
+        now = time.monotonic()
+        for tab in self.browsers():
+            if tab is self.current or tab.hidden_since is None:
+                continue
+            if self.is_kept_alive(tab):
+                continue
+            hidden_for = now - tab.hidden_since
+            if discard_after > 0 and hidden_for >= discard_after:
+                self.discard(tab)
+            elif freeze_after > 0 and hidden_for >= freeze_after:
+                self.freeze(tab)
+
+
+class MemoryPressureMonitor(QObject):
+    """Discard background tabs when the system runs low on memory.
+
+    Every ``memory.check_interval_seconds`` the monitor reads
+    ``MemAvailable`` from /proc/meminfo and the resident size of each
+    tab's renderer process.  Memory is considered low when the
+    available share drops below ``min_available_percent``, when less
+    than ``min_available_mb`` is available, or when the renderers
+    together use more than ``max_renderer_mb`` (0 disables a limit).
+
+    Under pressure up to ``discard_per_check`` hidden tabs are
+    discarded through the :class:`TabLifecycleManager`, so tabs on its
+    allow-list are never touched.  With the ``lru`` policy the tabs
+    that were used least recently go first; with ``largest`` the tabs
+    with the biggest renderers do.  A discarded tab keeps its URL and
+    last screenshot and reloads when it is activated again.
+    """
+
+    POLICIES = ("lru", "largest")
+
+    tabs_discarded = pyqtSignal(int)
+
+    def __init__(self, lifecycle: TabLifecycleManager, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self.lifecycle = lifecycle
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.check)
+        self.apply_config(config_snapshot())
+
+    def apply_config(self, config: ConfigSnapshot) -> None:
+        """Restart the periodic check with the interval from *config*."""
+        options = config.section("memory")
+        self.timer.stop()
+        if HAS_LIFECYCLE and os.path.exists("/proc/meminfo"):
+            self.timer.start(int(max(1, options["check_interval_seconds"]) * 1000))
+
+    def renderer_usage(self, tabs: list) -> dict:
+        """Return ``{tab: rss_bytes}``; tabs sharing a renderer report it once."""
+        usage = {}
+        seen = set()
+        for tab in tabs:
+            pid = renderer_pid(tab)
+            usage[tab] = 0 if pid in seen else process_rss(pid)
+            seen.add(pid)
+        return usage
+
+    def under_pressure(self, options, renderer_bytes: int) -> bool:
+        info = read_meminfo()
+        total = info.get("MemTotal", 0)
+        available = info.get("MemAvailable", info.get("MemFree", 0))
+        if total and available * 100 < total * options["min_available_percent"]:
+            return True
+        min_available = options["min_available_mb"] * 1024 * 1024
+        if total and min_available > 0 and available < min_available:
+            return True
+        max_renderers = options["max_renderer_mb"] * 1024 * 1024
+        return max_renderers > 0 and renderer_bytes > max_renderers
+
+    def candidates(self, tabs: list, usage: dict, policy: str) -> list:
+        """Return hidden, discardable tabs in the order they should be discarded."""
+        discarded = QWebEnginePage.LifecycleState.Discarded
+        hidden = [
+            tab for tab in tabs
+            if tab is not self.lifecycle.current
+            and not self.lifecycle.is_kept_alive(tab)
+            and tab.page().lifecycleState() != discarded
+        ]
+        if policy == "largest":
+            hidden.sort(key=lambda tab: usage.get(tab, 0), reverse=True)
+        else:
+            hidden.sort(key=lambda tab: tab.last_active)
+        return hidden
+
+    @pyqtSlot()
+    def check(self) -> None:
+        """Discard background tabs while memory is low."""
+        options = config_snapshot().section("memory")
+        tabs = self.lifecycle.browsers()
+        usage = self.renderer_usage(tabs)
+        if not self.under_pressure(options, sum(usage.values())):
+            return
+        policy = options["policy"] if options["policy"] in self.POLICIES else "lru"
+        budget = max(1, int(options["discard_per_check"]))
+        discarded = 0
+        for tab in self.candidates(tabs, usage, policy):
+            if discarded >= budget:
+                break
+            if self.lifecycle.discard(tab):
+                discarded += 1
+        if discarded:
+            self.tabs_discarded.emit(discarded)
+
+
+class ResourceSample:
+    """CPU and memory use of one tab's renderer at the last sampling."""
+
+    __slots__ = ("pid", "cpu_percent", "rss", "outlier")
+
+    def __init__(self, pid: int, cpu_percent: float, rss: int) -> None:
+        self.pid = pid
+        self.cpu_percent = cpu_percent
+        self.rss = rss
+        self.outlier = False
+
+    def describe(self) -> str:
+        return f"PID {self.pid} · CPU {self.cpu_percent:.0f}% · {self.rss / (1024 * 1024):.0f} MB"
+
+
+class ResourceMonitor(QObject):
+    """Sample each tab's renderer process on a low-frequency timer.
+
+    Every ``resources.interval_seconds`` the monitor reads
+    /proc/<pid>/stat and /proc/<pid>/statm for the renderer behind each
+    tab and stores a :class:`ResourceSample` in ``samples``.  CPU usage
+    is the share of one core used since the previous sample.  A sample
+    is flagged as an outlier when it crosses ``cpu_alert_percent`` or
+    ``rss_alert_mb``, or when its memory is more than ``outlier_factor``
+    times the median of all tabs.  Tabs that share a renderer report
+    the same process; discarded tabs have no renderer and no sample.
+    """
+
+    updated = pyqtSignal()
+
+    def __init__(self, lifecycle: TabLifecycleManager, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self.lifecycle = lifecycle
+        self.samples: dict = {}
+        self.previous: dict = {}
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.sample)
+        self.apply_config(config_snapshot())
+
+    def apply_config(self, config: ConfigSnapshot) -> None:
+        """Restart sampling with the interval from *config*."""
+        options = config.section("resources")
+        self.timer.stop()
+        if os.path.isdir("/proc/self"):
+            self.timer.start(int(max(1, options["interval_seconds"]) * 1000))
+
+    @pyqtSlot()
+    def sample(self) -> None:
+        options = config_snapshot().section("resources")
+        now = time.monotonic()
+        previous = self.previous
+        current = {}
+        samples = {}
+        for tab in self.lifecycle.browsers():
+            pid = renderer_pid(tab)
+            if pid <= 0:
+                continue
+            if pid not in current:
+                ticks = process_cpu_ticks(pid)
+                if ticks < 0:
+                    continue
+                cpu = 0.0
+                if pid in previous:
+                    last_ticks, last_time = previous[pid]
+                    elapsed = now - last_time
+                    if elapsed > 0:
+                        cpu = 100.0 * (ticks - last_ticks) / CLOCK_TICKS / elapsed
+                current[pid] = (ticks, now, ResourceSample(pid, max(0.0, cpu), process_rss(pid)))
+            samples[tab] = current[pid][2]
+        self.previous = {pid: (ticks, stamp) for pid, (ticks, stamp, _) in current.items()}
+        self.flag_outliers(samples, options)
+        self.samples = samples
+        self.updated.emit()
+
+    @staticmethod
+    def flag_outliers(samples: dict, options) -> None:
+        unique = {sample.pid: sample for sample in samples.values()}.values()
+        sizes = sorted(sample.rss for sample in unique)
+        median = sizes[len(sizes) // 2] if sizes else 0
+        rss_alert = options["rss_alert_mb"] * 1024 * 1024
+        for sample in unique:
+            sample.outlier = (
+                (options["cpu_alert_percent"] > 0 and sample.cpu_percent >= options["cpu_alert_percent"])
+                or (rss_alert > 0 and sample.rss >= rss_alert)
+                or (len(sizes) > 2 and median > 0 and sample.rss > options["outlier_factor"] * median)
+            )
+
+
+class ResourcePanel(QDockWidget):
+    """Dock listing CPU, memory and tunnel traffic per tab.
+
+    Double clicking a row switches to its tab; **Export** saves the
+    traffic of every tab as CSV or JSON.
+    """
+
+    COLUMNS = ("Tab", "PID", "CPU %", "Memory (MB)", "In", "Out", "Received (MB)", "Sent (MB)")
+
+    def __init__(self, window: "BrowserMainWindow") -> None:
+        super().__init__("Resources", window)
+        self.main_window = window
+        self.setObjectName("ResourcePanel")
+        self.table = QTableWidget(0, len(self.COLUMNS), self)
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.cellDoubleClicked.connect(self.activate_row)
+
+        export_button = QPushButton("Export…")
+        export_button.setToolTip("Save the tunnel traffic of every tab as CSV or JSON")
+        export_button.clicked.connect(self.export_traffic)
+        buttons = QHBoxLayout()
+        buttons.addStretch(1)
+        buttons.addWidget(export_button)
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.table)
+        layout.addLayout(buttons)
+        container = QWidget()
+        container.setLayout(layout)
+        self.setWidget(container)
+        self.rows: list = []
+
+    def refresh(self, samples: dict) -> None:
+        if not self.isVisible():
+            return
+        tabs = self.main_window.tabs
+        self.rows = [tabs.widget(i) for i in range(tabs.count())]
+        self.table.setRowCount(len(self.rows))
+        highlight = QColor(255, 200, 200)
+        for row, tab in enumerate(self.rows):
+            sample = samples.get(tab)
+            values = [tabs.tabText(row)] + [""] * (len(self.COLUMNS) - 1)
+            if sample is not None:
+                values[1:4] = [
+                    str(sample.pid),
+                    f"{sample.cpu_percent:.1f}",
+                    f"{sample.rss / (1024 * 1024):.0f}",
+                ]
+            traffic = tab.bridge.traffic if isinstance(tab, BrowserTab) else None
+            if traffic is not None and traffic.updated:
+                rx_rate, tx_rate = traffic.rates()
+                values[4:] = [
+                    format_rate(rx_rate),
+                    format_rate(tx_rate),
+                    f"{traffic.received / (1024 * 1024):.1f}",
+                    f"{traffic.sent / (1024 * 1024):.1f}",
+                ]
+            for column, value in enumerate(values):
+                item = self.table.item(row, column)
+                if item is None:
+                    item = QTableWidgetItem()
+                    self.table.setItem(row, column, item)
+                item.setText(value)
+                if sample is not None and sample.outlier:
+                    item.setBackground(highlight)
+                else:
+                    item.setData(Qt.BackgroundRole, None)
+
+    @pyqtSlot(int, int)
+    def activate_row(self, row: int, _column: int) -> None:
+        if 0 <= row < len(self.rows):
+            self.main_window.tabs.setCurrentWidget(self.rows[row])
+
+    def traffic_records(self) -> list:
+        """Return the tunnel traffic of every tab as a list of dicts."""
+        tabs = self.main_window.tabs
+        records = []
+        for index in range(tabs.count()):
+            tab = tabs.widget(index)
+            if not isinstance(tab, BrowserTab):
+                continue
+            record = {"tab": tabs.tabText(index), "url": tab.url().toString()}
+            record.update(tab.bridge.traffic.as_dict())
+            records.append(record)
+        return records
+
+    @pyqtSlot()
+    def export_traffic(self) -> None:
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Export Traffic", "guacagui-traffic.csv", "CSV (*.csv);;JSON (*.json)"
+        )
+        if not path:
+            return
+        records = self.traffic_records()
+        try:
+            with open(path, "w", newline="", encoding="utf-8") as f:
+                if path.lower().endswith(".json"):
+                    json.dump({"exported": time.time(), "tabs": records}, f, indent=2)
+                else:
+                    fields = ["tab", "url", "received_bytes", "sent_bytes", "receive_rate_bps", "send_rate_bps"]
+                    writer = csv.DictWriter(f, fieldnames=fields)
+                    writer.writeheader()
+                    writer.writerows(records)
+        except OSError as e:
+            QMessageBox.warning(self, "Export Traffic", f"Could not write {path}:\n{e}")
+            return
+        self.main_window.status.showMessage(f"Exported traffic of {len(records)} tab(s) to {path}", 5000)
+
+
+class WaterfallDelegate(QStyledItemDelegate):
+    """Paints a request's bar from the ``(start, end, slow)`` tuple in SPAN_ROLE.
+
+    ``start`` and ``end`` are fractions of the column width; a request
+    without an end is drawn as a thin marker.
+    """
+
+    SPAN_ROLE = Qt.UserRole
+
+    def paint(self, painter, option, index) -> None:
+        super().paint(painter, option, index)
+        span = index.data(self.SPAN_ROLE)
+        if not span:
+            return
+        start, end, slow = span
+        rect = option.rect.adjusted(2, 3, -2, -3)
+        left = rect.left() + int(rect.width() * start)
+        width = max(2, int(rect.width() * (end - start))) if end is not None else 2
+        color = QColor(220, 80, 60) if slow else QColor(70, 130, 200) if end is not None else QColor(150, 150, 150)
+        painter.fillRect(QRect(left, rect.top(), width, rect.height()), color)
+
+
+class RequestPanel(QDockWidget):
+    """Dock showing the requests of one tab as a waterfall.
+
+    The panel follows the current tab.  Rows are in start order, and the
+    bar of each request shows when it started and how long it took on a
+    time axis spanning all recorded requests; requests slower than
+    SLOW_MS are red and the slowest one is named below the list.
+    **Export** saves the requests as HAR-like JSON.
+    """
+
+    COLUMNS = ("Start (ms)", "Time (ms)", "Type", "Size (KB)", "URL", "Waterfall")
+    SLOW_MS = 1000
+
+    def __init__(self, window: "BrowserMainWindow") -> None:
+        super().__init__("Requests", window)
+        self.main_window = window
+        self.setObjectName("RequestPanel")
+        self.tab: BrowserTab | None = None
+
+        self.tree = QTreeWidget()
+        self.tree.setHeaderLabels(self.COLUMNS)
+        self.tree.setRootIsDecorated(False)
+        self.tree.setUniformRowHeights(True)
+        self.tree.setItemDelegateForColumn(5, WaterfallDelegate(self.tree))
+        self.tree.setColumnWidth(4, 320)
+        self.summary_label = QLabel()
+        self.summary_label.setWordWrap(True)
+
+        refresh_button = QPushButton("Refresh")
+        refresh_button.clicked.connect(self.refresh)
+        clear_button = QPushButton("Clear")
+        clear_button.clicked.connect(self.clear_records)
+        export_button = QPushButton("Export…")
+        export_button.setToolTip("Save the requests of this tab as HAR-like JSON")
+        export_button.clicked.connect(self.export_har)
+        buttons = QHBoxLayout()
+        buttons.addWidget(refresh_button)
+        buttons.addWidget(clear_button)
+        buttons.addStretch(1)
+        buttons.addWidget(export_button)
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.tree)
+        layout.addWidget(self.summary_label)
+        layout.addLayout(buttons)
+        container = QWidget()
+        container.setLayout(layout)
+        self.setWidget(container)
+
+        # Pick up new requests while the panel is open
+        self.timer = QTimer(self)
+        self.timer.setInterval(2000)
+        self.timer.timeout.connect(self.refresh)
+        self.visibilityChanged.connect(self.on_visibility_changed)
+
+    def show_tab(self, tab: "BrowserTab | None") -> None:
+        if tab is self.tab:
+            return
+        if self.tab is not None:
+            try:
+                self.tab.loadFinished.disconnect(self.refresh)
+            except (TypeError, RuntimeError):
+                pass
+        self.tab = tab
+        if tab is not None:
+            tab.loadFinished.connect(self.refresh)
+        self.refresh()
+
+    @pyqtSlot(bool)
+    def on_visibility_changed(self, visible: bool) -> None:
+        if visible:
+            self.timer.start()
+            self.refresh()
+        else:
+            self.timer.stop()
+
+    @pyqtSlot()
+    def refresh(self) -> None:
+        if not self.isVisible():
+            return
+        if self.tab is not None and self.main_window.tabs.registry.index_of(self.tab) < 0:
+            # The tab was closed; go back to following the current one
+            self.tab = None
+            self.show_tab(self.main_window.current_browser())
+            return
+        if self.tab is None:
+            self.populate()
+        else:
+            self.tab.requests.update_timing(self.populate)
+
+    def populate(self) -> None:
+        tab = self.tab
+        records = list(tab.requests.records) if tab is not None else []
+        self.tree.setUpdatesEnabled(False)
+        self.tree.clear()
+        if not records:
+            self.summary_label.setText("No requests recorded")
+            self.tree.setUpdatesEnabled(True)
+            return
+        records.sort(key=lambda r: r.start)
+        origin = records[0].start
+        end = max(r.start + (r.duration_ms or 0.0) / 1000.0 for r in records)
+        span = max(end - origin, 0.001)
+        highlight = QColor(255, 200, 200)
+        items = []
+        for record in records:
+            offset = record.start - origin
+            done = record.duration_ms is not None
+            slow = done and record.duration_ms >= self.SLOW_MS
+            item = QTreeWidgetItem([
+                f"{offset * 1000:.0f}",
+                f"{record.duration_ms:.0f}" if done else "",
+                record.resource_type,
+                f"{record.transfer_size / 1024:.1f}" if record.transfer_size is not None else "",
+                record.url,
+                "",
+            ])
+            item.setToolTip(4, record.url)
+            finish = (offset + record.duration_ms / 1000.0) / span if done else None
+            item.setData(5, WaterfallDelegate.SPAN_ROLE, (offset / span, finish, slow))
+            if slow:
+                for column in range(5):
+                    item.setBackground(column, highlight)
+            items.append(item)
+        self.tree.addTopLevelItems(items)
+        self.tree.setUpdatesEnabled(True)
+        timed = [r for r in records if r.duration_ms is not None]
+        summary = f"{len(records)} request(s) over {span:.1f} s"
+        if timed:
+            slowest = max(timed, key=lambda r: r.duration_ms)
+            summary += f"; slowest {slowest.duration_ms:.0f} ms: {slowest.url}"
+        self.summary_label.setText(summary)
+
+    @pyqtSlot()
+    def clear_records(self) -> None:
+        if self.tab is not None:
+            self.tab.requests.clear()
+        self.populate()
+
+    def har(self) -> dict:
+        """Return the requests of the shown tab as a HAR 1.2 log."""
+        tab = self.tab
+        records = sorted(tab.requests.records, key=lambda r: r.start) if tab is not None else []
+        pageref = f"tab{tab.tab_id}" if tab is not None else "tab"
+        started = records[0].as_har(pageref)["startedDateTime"] if records else ""
+        return {"log": {
+            "version": "1.2",
+            "creator": {"name": "GuacaGUI", "version": ""},
+            "pages": [{
+                "id": pageref,
+                "title": tab.page().title() if tab is not None else "",
+                "startedDateTime": started,
+                "pageTimings": {},
+            }],
+            "entries": [record.as_har(pageref) for record in records],
+        }}
+
+    @pyqtSlot()
+    def export_har(self) -> None:
+        path, _ = QFileDialog.getSaveFileName(self, "Export Requests", "guacagui-requests.har", "HAR (*.har *.json)")
+        if not path:
+            return
+        log = self.har()
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(log, f, indent=2)
+        except OSError as e:
+            QMessageBox.warning(self, "Export Requests", f"Could not write {path}:\n{e}")
+            return
+        count = len(log["log"]["entries"])
+        self.main_window.status.showMessage(f"Exported {count} request(s) to {path}", 5000)
+
+
+class TabListModel(QAbstractListModel):
+    """List model of the open tabs for the :class:`TabSwitcher`.
+
+    Rows follow the tab bar order and can be narrowed down with
+    :meth:`set_filter`, which matches every whitespace-separated term
+    against the tab title and URL.  Typing more characters only
+    re-checks the rows that matched before.  Thumbnails are scaled from
+    each tab's last screenshot when a view first asks for them (only
+    for rows that are actually on screen) and cached until the tab
+    takes a new screenshot.
+    """
+
+    THUMBNAIL_SIZE = QSize(200, 120)
+
+    def __init__(self, window: "BrowserMainWindow") -> None:
+        super().__init__(window)
+        self.main_window = window
+        self.rows: list = []
+        self.row_of: dict = {}
+        self.filter_text = ""
+        self.thumbnails: dict = {}
+        window.tabs.registry.changed.connect(self.rebuild)
+        window.tab_updates.flushed.connect(self.tabs_updated)
+        self.rebuild()
+
+    def rowCount(self, parent=QModelIndex()) -> int:  # type: ignore[override]
+        return 0 if parent.isValid() else len(self.rows)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):  # type: ignore[override]
+        if not index.isValid() or index.row() >= len(self.rows):
+            return None
+        tab = self.rows[index.row()]
+        if role == Qt.DisplayRole:
+            return self.title(tab)
+        if role == Qt.ToolTipRole:
+            return tab.url().toString()
+        if role == Qt.DecorationRole:
+            return self.thumbnail(tab)
+        return None
+
+    def title(self, tab: "BrowserTab") -> str:
+        tabs = self.main_window.tabs
+        return tabs.tabText(tabs.registry.index_of(tab))
+
+    def thumbnail(self, tab: "BrowserTab") -> QPixmap | None:
+        shot = tab.screenshot
+        if shot is None:
+            return None
+        cached = self.thumbnails.get(tab)
+        if cached is not None and cached[0] == shot.cacheKey():
+            return cached[1]
+        scaled = shot.scaled(self.THUMBNAIL_SIZE, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        self.thumbnails[tab] = (shot.cacheKey(), scaled)
+        return scaled
+
+    def tab_at(self, row: int) -> "BrowserTab | None":
+        return self.rows[row] if 0 <= row < len(self.rows) else None
+
+    def matches(self, tab: "BrowserTab", terms: list) -> bool:
+        haystack = (self.title(tab) + " " + tab.url().toString()).lower()
+        return all(term in haystack for term in terms)
+
+    def set_filter(self, text: str) -> None:
+        """Show only tabs whose title or URL contain every term of *text*."""
+        text = text.strip().lower()
+        previous = self.filter_text
+        self.filter_text = text
+        if previous and text.startswith(previous):
+            # Narrowing the filter: only rows that matched before can match now
+            self.apply_rows([tab for tab in self.rows if self.matches(tab, text.split())])
+        else:
+            self.rebuild()
+
+    @pyqtSlot()
+    def rebuild(self) -> None:
+        tabs = self.main_window.tabs
+        widgets = [tabs.widget(i) for i in range(tabs.count())]
+        terms = self.filter_text.split()
+        self.apply_rows([w for w in widgets if isinstance(w, BrowserTab) and self.matches(w, terms)])
+        live = set(widgets)
+        for tab in [tab for tab in self.thumbnails if tab not in live]:
+            del self.thumbnails[tab]
+
+    def apply_rows(self, rows: list) -> None:
+        self.beginResetModel()
+        self.rows = rows
+        self.row_of = {tab: row for row, tab in enumerate(rows)}
+        self.endResetModel()
+
+    @pyqtSlot(list)
+    def tabs_updated(self, updated: list) -> None:
+        """Refresh rows whose title changed, re-filtering if necessary."""
+        terms = self.filter_text.split()
+        for tab in updated:
+            row = self.row_of.get(tab)
+            if terms and (row is None) == self.matches(tab, terms):
+                self.rebuild()
+                return
+            if row is not None:
+                index = self.index(row)
+                self.dataChanged.emit(index, index)
+
+
+class TabSwitcher(QDockWidget):
+    """Searchable, virtualized list or grid of all tabs.
+
+    Sits alongside the tab bar for sessions with hundreds of tabs: the
+    list view only creates and paints the rows that are visible, and
+    the filter box narrows the tabs by title or URL as you type.
+    Pressing Enter or activating a row switches to that tab.
+    """
+
+    def __init__(self, window: "BrowserMainWindow") -> None:
+        super().__init__("Tabs", window)
+        self.main_window = window
+        self.setObjectName("TabSwitcher")
+        self.model = TabListModel(window)
+
+        self.filter_edit = QLineEdit()
+        self.filter_edit.setPlaceholderText("Filter by title or URL")
+        self.filter_edit.setClearButtonEnabled(True)
+        self.filter_edit.textChanged.connect(self.model.set_filter)
+        self.filter_edit.returnPressed.connect(self.activate_first)
+
+        self.grid_check = QCheckBox("Grid")
+        self.grid_check.toggled.connect(self.set_grid)
+
+        self.view = QListView()
+        self.view.setModel(self.model)
+        self.view.setUniformItemSizes(True)
+        self.view.setLayoutMode(QListView.Batched)
+        self.view.setBatchSize(100)
+        self.view.setEditTriggers(QListView.NoEditTriggers)
+        self.view.activated.connect(self.activate_index)
+        self.view.clicked.connect(self.activate_index)
+        self.set_grid(False)
+
+        top = QHBoxLayout()
+        top.addWidget(self.filter_edit)
+        top.addWidget(self.grid_check)
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addLayout(top)
+        layout.addWidget(self.view)
+        body = QWidget()
+        body.setLayout(layout)
+        self.setWidget(body)
+        self.visibilityChanged.connect(self.on_visibility_changed)
+
+    @pyqtSlot(bool)
+    def set_grid(self, grid: bool) -> None:
+        """Switch between a compact list and an overview grid of thumbnails."""
+        if grid:
+            self.view.setViewMode(QListView.IconMode)
+            self.view.setIconSize(TabListModel.THUMBNAIL_SIZE)
+            self.view.setGridSize(TabListModel.THUMBNAIL_SIZE + QSize(20, 40))
+            self.view.setResizeMode(QListView.Adjust)
+            self.view.setWordWrap(True)
+        else:
+            self.view.setViewMode(QListView.ListMode)
+            self.view.setIconSize(QSize(48, 29))
+            self.view.setGridSize(QSize())
+            self.view.setWordWrap(False)
+
+    @pyqtSlot(bool)
+    def on_visibility_changed(self, visible: bool) -> None:
+        if visible:
+            self.main_window.capture_current_tab()
+            self.filter_edit.setFocus()
+            self.filter_edit.selectAll()
+
+    @pyqtSlot(QModelIndex)
+    def activate_index(self, index: QModelIndex) -> None:
+        tab = self.model.tab_at(index.row())
+        if tab is not None:
+            self.main_window.tabs.setCurrentWidget(tab)
+
+    @pyqtSlot()
+    def activate_first(self) -> None:
+        current = self.view.currentIndex()
+        self.activate_index(current if current.isValid() else self.model.index(0))
+
+
+class SpareTabPool(QObject):
+    """Keep one pre-warmed BrowserTab ready for the next new tab or popup.
+
+    Creating a tab on demand pays for the view, page and settings setup
+    and for spawning a Chromium renderer while the user waits.  The pool
+    builds a hidden spare in idle time (``spare_tab.refill_delay_ms``
+    after the last hand-out) that already has its renderer running,
+    either on ``about:blank`` or, with ``preload_home``, with the home
+    page loaded.  :meth:`take` hands the spare out and schedules the
+    next one; if no spare is ready a tab is built on the spot.
+
+    The time from a new-tab request until the tab has painted a loaded
+    page is recorded in ``latencies`` as ``(milliseconds, from_spare)``
+    so the effect of the spare can be measured.
+    """
+
+    def __init__(self, window: "BrowserMainWindow") -> None:
+        super().__init__(window)
+        self.main_window = window
+        self.spare: BrowserTab | None = None
+        self.spare_url = ""
+        self.latencies: deque = deque(maxlen=100)
+        # Render widgets being watched for their first paint, to their tabs
+        self.painting: dict = {}
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.refill)
+
+    def schedule_refill(self) -> None:
+        """Build a new spare once the event loop has been idle for a moment."""
+        options = config_snapshot().section("spare_tab")
+        if options["enabled"] and self.spare is None:
+            self.timer.start(max(0, int(options["refill_delay_ms"])))
+
+    @pyqtSlot()
+    def refill(self) -> None:
+        options = config_snapshot().section("spare_tab")
+        if not options["enabled"] or self.spare is not None:
+            return
+        url = config_snapshot().home_url if options["preload_home"] else "about:blank"
+        tab = BrowserTab(self.main_window, url=url)
+        # Keep the spare hidden inside the window until it is handed out
+        tab.setParent(self.main_window)
+        tab.hide()
+        self.spare = tab
+        self.spare_url = url
+
+    def take(self, url: str | None = None, popup: bool = False) -> BrowserTab:
+        """Return a tab showing *url* (the home page by default).
+
+        For a *popup* the caller's page contents replace whatever the
+        tab has loaded, so the tab only counts as ready after its next
+        load finishes.
+        """
+        started = time.perf_counter()
+        target = url or config_snapshot().home_url
+        tab = self.spare
+        self.spare = None
+        if tab is None:
+            tab = BrowserTab(self.main_window, url=target)
+        else:
+            tab.from_spare = True
+            if not popup and target != self.spare_url:
+                tab.loaded = False
+                tab.setUrl(QUrl(target))
+        if popup:
+            tab.loaded = False
+        tab.open_started = started
+        if tab.loaded:
+            # Already showing the right page: ready once it has been painted
+            self.record_when_painted(tab)
+        self.schedule_refill()
+        return tab
+
+    def record_when_painted(self, tab: BrowserTab) -> None:
+        """Call :meth:`record_open` for *tab* once its page is painted on screen."""
+        if tab.open_started is None:
+            return
+        # The page is drawn by the view's render widget, its focus proxy
+        widget = tab.focusProxy() or tab
+        if widget not in self.painting:
+            self.painting[widget] = tab
+            widget.installEventFilter(self)
+
+    def eventFilter(self, obj: QObject, event: QEvent) -> bool:
+        if event.type() == QEvent.Paint and obj in self.painting:
+            obj.removeEventFilter(self)
+            self.record_open(self.painting.pop(obj))
+        return False
+
+    def record_open(self, tab: BrowserTab) -> None:
+        """Record how long *tab* took from request to a loaded page."""
+        if tab.open_started is None:
+            return
+        elapsed_ms = (time.perf_counter() - tab.open_started) * 1000.0
+        tab.open_started = None
+        self.latencies.append((elapsed_ms, tab.from_spare))
+        source = "spare" if tab.from_spare else "cold"
+        self.main_window.status.showMessage(f"New tab ready in {elapsed_ms:.0f} ms ({source})", 3000)
+
+
+# Reads the login of a Guacamole page: GUAC_AUTH holds the whole
+# authentication result, newer releases keep only the token in
+# GUAC_AUTH_TOKEN.
+READ_AUTH_JS = """
+(function () {
+    try {
+        return JSON.stringify({
+            auth: localStorage.getItem('GUAC_AUTH'),
+            token: localStorage.getItem('GUAC_AUTH_TOKEN')
+        });
+    } catch (e) {
+        return null;
+    }
+})()
+"""
+
+
+def parse_page_auth(result) -> dict | None:
+    """Return ``{"authToken", "dataSource"}`` from the result of READ_AUTH_JS, or None."""
+    try:
+        stored = json.loads(result)
+        auth = json.loads(stored["auth"]) if stored.get("auth") else {}
+        token = auth.get("authToken")
+        if not token and stored.get("token"):
+            # Stored JSON-encoded by the web client's local storage service
+            token = stored["token"]
+            token = json.loads(token) if token.startswith('"') else token
+    except (TypeError, ValueError, KeyError, AttributeError):
+        return None
+    if not isinstance(token, str) or not token:
+        return None
+    return {"authToken": token, "dataSource": auth.get("dataSource")}
+
+
+# Seeds a new Guacamole page with the shared login, unless it already has
+# one: GUAC_AUTH for older releases of the web client, GUAC_AUTH_TOKEN
+# (JSON-encoded by its local storage service) for newer ones.  The
+# @include header keeps QtWebEngine from injecting the token into any
+# page outside the web client, and the origin is checked again before
+# anything is written.
+AUTH_SEED_JS = """// ==UserScript==
+// @include %s*
+// ==/UserScript==
+(function (base, auth, token) {
+    try {
+        var home = new URL(base);
+        if (location.origin !== home.origin || location.pathname.indexOf(home.pathname) !== 0) return;
+        if (localStorage.getItem('GUAC_AUTH') || localStorage.getItem('GUAC_AUTH_TOKEN')) return;
+        localStorage.setItem('GUAC_AUTH', auth);
+        localStorage.setItem('GUAC_AUTH_TOKEN', token);
+    } catch (e) {
+    }
+})(%s, %s, %s);
+"""
+
+
+class TokenManager(QObject):
+    """One Guacamole auth token shared by all tabs and launches.
+
+    The token is picked up when the web client in any tab logs in (see
+    GUAC_HOOK_JS) or read from an open tab, and kept in
+    ``<cache>/auth.json``, readable only by the user, so that the next
+    launch starts logged in.  A profile script seeds new Guacamole pages
+    whose local storage has no login with it, and the session is renewed
+    every ``auth.renew_minutes`` by re-posting the token to
+    ``api/tokens``, well before Guacamole's inactivity timeout.  A token
+    the server rejects is forgotten.
+    """
+
+    changed = pyqtSignal(object)
+
+    SEED_SCRIPT = "guacagui-auth"
+
+    def __init__(self, window: "BrowserMainWindow") -> None:
+        super().__init__(window)
+        self.main_window = window
+        self.network = QNetworkAccessManager(self)
+        self.file = os.path.join(cache_dir(), "auth.json")
+        self.auth: dict | None = None
+        self.reply: QNetworkReply | None = None
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.renew)
+
+    def start(self) -> None:
+        """Load the remembered token, validate it in the background and start renewing."""
+        self.apply_config(config_snapshot())
+        if config_snapshot().section("auth")["remember"]:
+            try:
+                with open(self.file, "r", encoding="utf-8") as f:
+                    auth = json.load(f)
+            except (OSError, ValueError):
+                auth = None
+            if isinstance(auth, dict) and auth.get("base_url") == guacamole_base_url() and auth.get("authToken"):
+                self.auth = auth
+                self.update_seed()
+                self.renew()
+
+    def apply_config(self, config: ConfigSnapshot) -> None:
+        minutes = config.section("auth")["renew_minutes"]
+        self.timer.stop()
+        if minutes > 0:
+            self.timer.start(int(minutes * 60 * 1000))
+
+    def request(self, callback) -> None:
+        """Pass the shared login to *callback*, reading it from a tab if needed (None if there is none)."""
+        if self.auth is not None:
+            callback(self.auth)
+            return
+
+        def on_page_auth(auth: dict | None) -> None:
+            if auth is not None:
+                self.set_auth(auth)
+            callback(self.auth)
+
+        self.main_window.request_auth(on_page_auth)
+
+    @pyqtSlot(object)
+    def on_page_auth(self, auth: dict | None) -> None:
+        if auth is None:
+            # The web client logged out; its token is gone on the server too
+            self.clear()
+        else:
+            self.set_auth(auth)
+
+    def set_auth(self, auth: dict) -> None:
+        current = self.auth or {}
+        if auth["authToken"] == current.get("authToken") and auth.get("dataSource") in (None, current.get("dataSource")):
+            return
+        self.auth = {
+            "base_url": guacamole_base_url(),
+            "authToken": auth["authToken"],
+            "dataSource": auth.get("dataSource") or current.get("dataSource"),
+            "username": auth.get("username") or current.get("username"),
+        }
+        self.save()
+        self.update_seed()
+        self.changed.emit(self.auth)
+
+    def invalidate(self, token: str | None = None) -> None:
+        """Forget the token (only if it is still *token*) after the server rejected it."""
+        if self.auth is not None and token in (None, self.auth.get("authToken")):
+            self.clear()
+
+    def clear(self) -> None:
+        if self.auth is None:
+            return
+        self.auth = None
+        try:
+            os.remove(self.file)
+        except OSError:
+            pass
+        self.update_seed()
+        self.changed.emit(None)
+
+    def save(self) -> None:
+        if not config_snapshot().section("auth")["remember"] or self.auth is None:
+            return
+        os.makedirs(os.path.dirname(self.file), exist_ok=True)
+        temporary = self.file + ".tmp"
+        try:
+            fd = os.open(temporary, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self.auth, f)
+            os.replace(temporary, self.file)
+        except OSError:
+            pass
+
+    def update_seed(self) -> None:
+        scripts = shared_profile().scripts()
+        for script in scripts.findScripts(self.SEED_SCRIPT):
+            scripts.remove(script)
+        if self.auth is None:
+            return
+        stored = {key: self.auth.get(key) for key in ("authToken", "dataSource", "username")}
+        stored["availableDataSources"] = [stored["dataSource"]] if stored["dataSource"] else []
+        script = QWebEngineScript()
+        script.setName(self.SEED_SCRIPT)
+        script.setInjectionPoint(QWebEngineScript.DocumentCreation)
+        script.setWorldId(QWebEngineScript.ApplicationWorld)
+        script.setRunsOnSubFrames(False)
+        script.setSourceCode(AUTH_SEED_JS % (
+            self.auth["base_url"],
+            json.dumps(self.auth["base_url"]),
+            json.dumps(json.dumps(stored)),
+            json.dumps(json.dumps(stored["authToken"])),
+        ))
+        scripts.insert(script)
+
+    @pyqtSlot()
+    def renew(self) -> None:
+        """Extend the Guacamole session of the token before it times out."""
+        if self.auth is None or self.reply is not None:
+            return
+        token = self.auth["authToken"]
+        request = QNetworkRequest(QUrl(guacamole_base_url() + "api/tokens"))
+        request.setHeader(QNetworkRequest.ContentTypeHeader, "application/x-www-form-urlencoded")
+        body = QUrlQuery()
+        body.addQueryItem("token", token)
+        self.reply = self.network.post(request, body.toString(QUrl.FullyEncoded).encode("utf-8"))
+        self.reply.finished.connect(partial(self.on_renewed, self.reply, token))
+
+    def on_renewed(self, reply: QNetworkReply, token: str) -> None:
+        self.reply = None
+        reply.deleteLater()
+        status = reply.attribute(QNetworkRequest.HttpStatusCodeAttribute)
+        if status in (401, 403):
+            self.invalidate(token)
+            return
+        if reply.error() != QNetworkReply.NoError:
+            # Network trouble: keep the token and try again next time
+            return
+        try:
+            result = json.loads(bytes(reply.readAll()).decode("utf-8"))
+        except ValueError:
+            return
+        if isinstance(result, dict) and isinstance(result.get("authToken"), str):
+            self.set_auth(result)
+
+
+class ConnectionDirectory(QObject):
+    """Guacamole connection groups and connections from the REST API.
+
+    The tree of ``connectionGroups/ROOT/tree`` is kept in
+    ``<cache>/connections.json`` so that the sidebar can show it at once
+    on startup; it is then refreshed in the background every
+    ``directory.refresh_minutes``.  Refreshes send the validators of the
+    cached copy (``If-None-Match``/``If-Modified-Since``) and compare the
+    body's hash, so ``updated`` is only emitted when the directory
+    actually changed.  The REST API needs an auth token, which comes
+    from the window's :class:`TokenManager`.
+    """
+
+    updated = pyqtSignal(dict)
+    status_changed = pyqtSignal(str)
+
+    def __init__(self, window: "BrowserMainWindow") -> None:
+        super().__init__(window)
+        self.main_window = window
+        self.network = QNetworkAccessManager(self)
+        self.cache_file = os.path.join(cache_dir(), "connections.json")
+        self.cache: dict = {}
+        self.reply: QNetworkReply | None = None
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+        self.apply_config(config_snapshot())
+
+    def apply_config(self, config: ConfigSnapshot) -> None:
+        minutes = config.section("directory")["refresh_minutes"]
+        self.timer.stop()
+        if minutes > 0:
+            self.timer.start(int(minutes * 60 * 1000))
+
+    @property
+    def tree(self) -> dict:
+        return self.cache.get("tree") or {}
+
+    @property
+    def data_source(self) -> str:
+        return self.cache.get("data_source") or config_snapshot().section("guacamole")["data_source"]
+
+    def load(self) -> None:
+        """Show the cached directory for the configured server, if there is one."""
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return
+        if isinstance(cache, dict) and cache.get("base_url") == guacamole_base_url():
+            self.cache = cache
+            self.updated.emit(self.tree)
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+        temporary = self.cache_file + ".tmp"
+        try:
+            with open(temporary, "w", encoding="utf-8") as f:
+                json.dump(self.cache, f)
+            os.replace(temporary, self.cache_file)
+        except OSError:
+            pass
+
+    @pyqtSlot()
+    def refresh(self) -> None:
+        """Fetch the directory in the background unless a fetch is running."""
+        if self.reply is not None:
+            return
+        self.main_window.auth.request(self.fetch)
+
+    def fetch(self, auth: dict | None) -> None:
+        if auth is None:
+            self.status_changed.emit("Log in to Guacamole in a tab to load the connections")
+            return
+        base_url = guacamole_base_url()
+        data_source = auth.get("dataSource") or config_snapshot().section("guacamole")["data_source"]
+        url = QUrl(f"{base_url}api/session/data/{data_source}/connectionGroups/ROOT/tree")
+        token = auth["authToken"]
+        request = QNetworkRequest(url)
+        request.setRawHeader(b"Guacamole-Token", token.encode("utf-8"))
+        request.setRawHeader(b"Accept", b"application/json")
+        if self.cache.get("base_url") == base_url and self.cache.get("data_source") == data_source:
+            if self.cache.get("etag"):
+                request.setRawHeader(b"If-None-Match", self.cache["etag"].encode("latin-1"))
+            if self.cache.get("last_modified"):
+                request.setRawHeader(b"If-Modified-Since", self.cache["last_modified"].encode("latin-1"))
+        self.status_changed.emit("Refreshing…")
+        self.reply = self.network.get(request)
+        self.reply.finished.connect(partial(self.on_finished, self.reply, base_url, data_source, token))
+
+    def on_finished(self, reply: QNetworkReply, base_url: str, data_source: str, token: str) -> None:
+        self.reply = None
+        reply.deleteLater()
+        status = reply.attribute(QNetworkRequest.HttpStatusCodeAttribute)
+        if status == 304:
+            self.cache["fetched"] = time.time()
+            self.save()
+            self.status_changed.emit("Up to date")
+            return
+        if status in (401, 403):
+            self.main_window.auth.invalidate(token)
+            self.status_changed.emit("Not logged in to Guacamole")
+            return
+        if reply.error() != QNetworkReply.NoError:
+            self.status_changed.emit(f"Refresh failed: {reply.errorString()}")
+            return
+        body = bytes(reply.readAll())
+        try:
+            tree = json.loads(body.decode("utf-8"))
+        except ValueError:
+            self.status_changed.emit("Refresh failed: invalid response")
+            return
+        digest = hashlib.sha1(body).hexdigest()
+        changed = digest != self.cache.get("hash") or base_url != self.cache.get("base_url")
+        self.cache = {
+            "base_url": base_url,
+            "data_source": data_source,
+            "etag": bytes(reply.rawHeader(b"ETag")).decode("latin-1"),
+            "last_modified": bytes(reply.rawHeader(b"Last-Modified")).decode("latin-1"),
+            "hash": digest,
+            "fetched": time.time(),
+            "tree": tree,
+        }
+        self.save()
+        if changed:
+            self.updated.emit(tree)
+        self.status_changed.emit("Up to date")
+
+
+class ConnectionPanel(QDockWidget):
+    """Dock with the Guacamole connection tree; activating a connection opens it in a new tab.
+
+    The search box filters connections by name or protocol and shows the
+    groups that contain matches.  Refreshed trees keep the expanded
+    groups and the selection.
+    """
+
+    KIND_ROLE = Qt.UserRole
+    ID_ROLE = Qt.UserRole + 1
+
+    def __init__(self, window: "BrowserMainWindow", directory: ConnectionDirectory) -> None:
+        super().__init__("Connections", window)
+        self.main_window = window
+        self.directory = directory
+        self.setObjectName("ConnectionPanel")
+
+        self.filter_edit = QLineEdit()
+        self.filter_edit.setPlaceholderText("Search connections")
+        self.filter_edit.setClearButtonEnabled(True)
+        self.filter_edit.textChanged.connect(self.apply_filter)
+        self.filter_edit.returnPressed.connect(self.open_first_match)
+        refresh_button = QPushButton("Refresh")
+        refresh_button.clicked.connect(directory.refresh)
+        # Saved lists from the "launcher" config section
+        self.lists_menu = QMenu(self)
+        self.lists_menu.aboutToShow.connect(self.fill_lists_menu)
+        lists_button = QPushButton("Lists")
+        lists_button.setMenu(self.lists_menu)
+
+        self.tree = QTreeWidget()
+        self.tree.setHeaderLabels(["Name", "Protocol"])
+        self.tree.setUniformRowHeights(True)
+        self.tree.itemActivated.connect(self.open_item)
+        self.tree.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.tree.customContextMenuRequested.connect(self.show_item_menu)
+        self.status_label = QLabel()
+
+        top = QHBoxLayout()
+        top.addWidget(self.filter_edit)
+        top.addWidget(refresh_button)
+        top.addWidget(lists_button)
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addLayout(top)
+        layout.addWidget(self.tree)
+        layout.addWidget(self.status_label)
+        body = QWidget()
+        body.setLayout(layout)
+        self.setWidget(body)
+
+        directory.updated.connect(self.populate)
+        directory.status_changed.connect(self.status_label.setText)
+        self.visibilityChanged.connect(self.on_visibility_changed)
+
+    @staticmethod
+    def item_key(item: QTreeWidgetItem) -> tuple:
+        return (item.data(0, ConnectionPanel.KIND_ROLE), item.data(0, ConnectionPanel.ID_ROLE))
+
+    @pyqtSlot(dict)
+    def populate(self, tree: dict) -> None:
+        expanded = set()
+        iterator = [self.tree.topLevelItem(i) for i in range(self.tree.topLevelItemCount())]
+        while iterator:
+            item = iterator.pop()
+            if item.isExpanded():
+                expanded.add(self.item_key(item))
+            iterator.extend(item.child(i) for i in range(item.childCount()))
+        current = self.tree.currentItem()
+        selected = self.item_key(current) if current is not None else None
+
+        self.tree.setUpdatesEnabled(False)
+        self.tree.clear()
+        restore = None
+
+        def add(parent, group: dict) -> None:
+            nonlocal restore
+            for child in group.get("childConnectionGroups") or ():
+                kind = "g" if child.get("type") == "BALANCING" else "group"
+                item = QTreeWidgetItem(parent, [str(child.get("name", "")), "balancing" if kind == "g" else ""])
+                item.setData(0, self.KIND_ROLE, kind)
+                item.setData(0, self.ID_ROLE, str(child.get("identifier", "")))
+                item.setExpanded(self.item_key(item) in expanded)
+                if self.item_key(item) == selected:
+                    restore = item
+                add(item, child)
+            for connection in group.get("childConnections") or ():
+                item = QTreeWidgetItem(
+                    parent, [str(connection.get("name", "")), str(connection.get("protocol", ""))]
+                )
+                item.setData(0, self.KIND_ROLE, "c")
+                item.setData(0, self.ID_ROLE, str(connection.get("identifier", "")))
+                if self.item_key(item) == selected:
+                    restore = item
+
+        add(self.tree.invisibleRootItem(), tree)
+        if restore is not None:
+            self.tree.setCurrentItem(restore)
+        self.tree.setUpdatesEnabled(True)
+        self.apply_filter(self.filter_edit.text())
+
+    @pyqtSlot(str)
+    def apply_filter(self, text: str) -> None:
+        terms = text.lower().split()
+
+        def visit(item: QTreeWidgetItem) -> bool:
+            label = f"{item.text(0)} {item.text(1)}".lower()
+            own = all(term in label for term in terms)
+            children = [visit(item.child(i)) for i in range(item.childCount())]
+            visible = own or any(children)
+            item.setHidden(not visible)
+            if terms and any(children):
+                item.setExpanded(True)
+            return visible
+
+        root = self.tree.invisibleRootItem()
+        for i in range(root.childCount()):
+            visit(root.child(i))
+
+    @pyqtSlot()
+    def open_first_match(self) -> None:
+        items = [self.tree.topLevelItem(i) for i in range(self.tree.topLevelItemCount())]
+        while items:
+            item = items.pop(0)
+            if item.isHidden():
+                continue
+            if item.data(0, self.KIND_ROLE) in ("c", "g"):
+                self.open_item(item)
+                return
+            items[:0] = [item.child(i) for i in range(item.childCount())]
+
+    @pyqtSlot(QTreeWidgetItem, int)
+    def open_item(self, item: QTreeWidgetItem, _column: int = 0) -> None:
+        kind = item.data(0, self.KIND_ROLE)
+        if kind not in ("c", "g"):
+            return
+        url = connection_url(item.data(0, self.ID_ROLE), self.directory.data_source, kind)
+        window = self.main_window
+        window.add_browser_tab(window.spares.take(url), item.text(0))
+
+    def group_targets(self, item: QTreeWidgetItem) -> list:
+        """Return ``(name, url)`` for every connection below the group *item*."""
+        targets = []
+        items = [item.child(i) for i in range(item.childCount())]
+        while items:
+            child = items.pop(0)
+            kind = child.data(0, self.KIND_ROLE)
+            if kind in ("c", "g"):
+                url = connection_url(child.data(0, self.ID_ROLE), self.directory.data_source, kind)
+                targets.append((child.text(0), url))
+            else:
+                items[:0] = [child.child(i) for i in range(child.childCount())]
+        return targets
+
+    @pyqtSlot(QPoint)
+    def show_item_menu(self, pos: QPoint) -> None:
+        item = self.tree.itemAt(pos)
+        if item is None:
+            return
+        menu = QMenu(self)
+        if item.data(0, self.KIND_ROLE) == "group":
+            targets = self.group_targets(item)
+            open_all = menu.addAction(f"Open All ({len(targets)})")
+            open_all.setEnabled(bool(targets))
+            open_all.triggered.connect(lambda: self.main_window.launch_connections(targets))
+        else:
+            menu.addAction("Open").triggered.connect(lambda: self.open_item(item))
+        menu.exec_(self.tree.viewport().mapToGlobal(pos))
+
+    @pyqtSlot()
+    def fill_lists_menu(self) -> None:
+        self.lists_menu.clear()
+        lists = saved_lists()
+        for name, targets in sorted(lists.items()):
+            action = self.lists_menu.addAction(f"{name} ({len(targets)})")
+            action.triggered.connect(partial(self.main_window.launch_list, name))
+        if not lists:
+            self.lists_menu.addAction("No saved lists in the config").setEnabled(False)
+
+    @pyqtSlot(bool)
+    def on_visibility_changed(self, visible: bool) -> None:
+        if visible:
+            self.filter_edit.setFocus()
+            self.filter_edit.selectAll()
+            fetched = self.directory.cache.get("fetched", 0)
+            minutes = config_snapshot().section("directory")["refresh_minutes"]
+            if not self.directory.tree or time.time() - fetched > max(1, minutes) * 60:
+                self.directory.refresh()
+
+
+class BroadcastGroup(QObject):
+    """The set of tabs that receive broadcast input.
+
+    While the current tab is a member its page reports the key events
+    the user sends (``GuacBridge.keys_sent``) and they are replayed into
+    every other member through that member's own :class:`KeyTyper`, so
+    each tab is delivered to independently and at its own pace.  Text
+    passed to :meth:`type_text` goes to all members at once and
+    ``finished`` reports ``{tab: (keys, ok)}`` once every member has
+    acknowledged.  A member whose queue grows beyond
+    ``broadcast.max_queued_keys`` has fallen too far behind: it is
+    dropped from the group (``dropped``) instead of holding up the
+    others, after releasing any keys it still holds down.
+    """
+
+    changed = pyqtSignal()
+    dropped = pyqtSignal(object)
+    finished = pyqtSignal(dict)
+
+    def __init__(self, window: "BrowserMainWindow") -> None:
+        super().__init__(window)
+        self.main_window = window
+        self.members: list = []
+        self.held: dict = {}
+        self.pending: set = set()
+        self.results: dict = {}
+        window.tabs.registry.changed.connect(self.prune)
+
+    def set_member(self, tab: "BrowserTab", member: bool) -> None:
+        """Add *tab* to the group or remove it."""
+        if member == tab.broadcast:
+            return
+        tab.broadcast = member
+        if member:
+            self.members.append(tab)
+            self.held[tab] = set()
+            self.main_window.lifecycle.thaw(tab)
+        else:
+            self.members.remove(tab)
+            self.held.pop(tab, None)
+            self.acknowledge(tab, 0, False)
+        self.update_mirror()
+        self.changed.emit()
+
+    def clear(self) -> None:
+        for tab in list(self.members):
+            self.set_member(tab, False)
+
+    @pyqtSlot()
+    def prune(self) -> None:
+        """Forget members that are no longer in the tab widget."""
+        registry = self.main_window.tabs.registry
+        for tab in [tab for tab in self.members if registry.index_of(tab) < 0]:
+            self.set_member(tab, False)
+
+    def update_mirror(self) -> None:
+        """Report typed keys from the current tab only, and only if it is a member."""
+        current = self.main_window.current_browser()
+        for tab in self.members:
+            tab.bridge.set_mirror(tab is current)
+        if isinstance(current, BrowserTab) and not current.broadcast:
+            current.bridge.set_mirror(False)
+
+    @pyqtSlot(object, list)
+    def on_keys(self, source: "BrowserTab", keys: list) -> None:
+        if not source.broadcast or source is not self.main_window.current_browser():
+            return
+        for tab in list(self.members):
+            if tab is not source:
+                self.deliver(tab, keys)
+
+    def deliver(self, tab: "BrowserTab", keys: list) -> None:
+        limit = config_snapshot().section("broadcast")["max_queued_keys"]
+        if limit > 0 and len(tab.typer.queue) + len(keys) > limit:
+            held = self.held.get(tab, ())
+            tab.typer.cancel()
+            tab.typer.send_keys([(keysym, False) for keysym in held])
+            self.set_member(tab, False)
+            self.dropped.emit(tab)
+            return
+        held = self.held[tab]
+        for keysym, pressed in keys:
+            if pressed:
+                held.add(keysym)
+            else:
+                held.discard(keysym)
+        tab.typer.send_keys(keys)
+
+    def type_text(self, text: str) -> int:
+        """Type *text* into every member and return the number of tabs it was queued for."""
+        self.pending = set()
+        self.results = {}
+        for tab in self.members:
+            if tab.typer.type_text(text):
+                self.pending.add(tab)
+        return len(self.pending)
+
+    def acknowledge(self, tab: "BrowserTab", count: int, ok: bool) -> bool:
+        """Record a tab's typing result; return True if it belongs to the group's traffic."""
+        if tab in self.pending:
+            self.pending.discard(tab)
+            self.results[tab] = (count, ok)
+            if not self.pending:
+                self.finished.emit(self.results)
+            return True
+        # Mirrored keystrokes are acknowledged silently unless they failed
+        return tab.broadcast and ok
+
+
 class MacroLineEdit(QLineEdit):
     """A QLineEdit that automatically copies its contents to the clipboard on click.
 
@@ -210,26 +2956,138 @@ class MacroLineEdit(QLineEdit):
     available).  This supports fast copy/paste for frequently used
     commands.  The text remains editable but changes made by the user
     are not saved back to the configuration file.
+
+    With ``typing.macro_mode`` set to ``"type"`` the text is not copied;
+    ``type_requested`` is emitted instead so that the window types it
+    straight into the current Guacamole session.
     """
 
+    type_requested = pyqtSignal(str)
+
     def mousePressEvent(self, event):  # type: ignore[override]
         # Call base implementation to allow normal cursor movement
         super().mousePressEvent(event)
         text = self.text()
         if not text:
             return
+        metrics.macro_sends += 1
+        if config_snapshot().section("typing")["macro_mode"] == "type":
+            self.type_requested.emit(text)
+            return
         clipboard = QGuiApplication.clipboard()
         clipboard.setText(text, QClipboard.Clipboard)
         clipboard.setText(text, QClipboard.Selection)
 
 
+class MacroEntry:
+    """The label and :class:`MacroLineEdit` of one macro on the toolbar.
+
+    Entries are created, updated and removed individually by
+    :meth:`BrowserMainWindow.apply_macros` so that reloading the
+    configuration only touches widgets whose macro actually changed.
+    An empty ``name`` hides the label but keeps its slot.
+    """
+
+    __slots__ = ("name", "text", "label", "label_action", "box", "box_action")
+
+    def __init__(self, toolbar: QToolBar, name: str, text: str, before: QAction | None = None) -> None:
+        self.name = name
+        self.text = text
+        self.label = QLabel(name + ":")
+        self.box = MacroLineEdit()
+        self.box.setText(text)
+        self.box.setFixedWidth(200)
+        self.box.setReadOnly(False)
+        if before is None:
+            self.label_action = toolbar.addWidget(self.label)
+            self.box_action = toolbar.addWidget(self.box)
+        else:
+            self.label_action = toolbar.insertWidget(before, self.label)
+            self.box_action = toolbar.insertWidget(before, self.box)
+        self.label_action.setVisible(bool(name))
+
+    @property
+    def first_action(self) -> QAction:
+        return self.label_action
+
+    def update(self, name: str, text: str) -> None:
+        """Change the label and text in place if they differ."""
+        if name != self.name:
+            self.name = name
+            self.label.setText(name + ":")
+            self.label_action.setVisible(bool(name))
+        if text != self.text:
+            self.text = text
+            self.box.setText(text)
+
+    def remove(self, toolbar: QToolBar) -> None:
+        """Take the label and line edit off *toolbar* and schedule them for deletion."""
+        toolbar.removeAction(self.label_action)
+        toolbar.removeAction(self.box_action)
+        self.label.deleteLater()
+        self.box.deleteLater()
+
+
+class ConfigWatcher(QObject):
+    """Watch CONFIG_FILE and emit ``config_changed`` with each new snapshot.
+
+    Editors often save by writing a new file and renaming it over the
+    old one, which drops the path from a ``QFileSystemWatcher``.  The
+    containing directory is watched as well so the file is picked up
+    again, and bursts of change notifications are coalesced with a
+    short timer before the snapshot is revalidated.
+    """
+
+    config_changed = pyqtSignal(object)
+
+    def __init__(self, parent: QObject | None = None, delay_ms: int = 250) -> None:
+        super().__init__(parent)
+        self.path = config_path()
+        self.snapshot = config_snapshot()
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.fileChanged.connect(self.schedule_reload)
+        self.watcher.directoryChanged.connect(self.schedule_reload)
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(delay_ms)
+        self.timer.timeout.connect(self.reload)
+        directory = os.path.dirname(self.path)
+        if os.path.isdir(directory):
+            self.watcher.addPath(directory)
+        self.watch_file()
+
+    def watch_file(self) -> None:
+        if os.path.exists(self.path) and self.path not in self.watcher.files():
+            self.watcher.addPath(self.path)
+
+    @pyqtSlot(str)
+    def schedule_reload(self, _path: str) -> None:
+        self.timer.start()
+
+    @pyqtSlot()
+    def reload(self) -> None:
+        self.watch_file()
+        snapshot = config_snapshot()
+        if snapshot is self.snapshot:
+            return
+        self.snapshot = snapshot
+        self.config_changed.emit(snapshot)
+
+
 class BrowserMainWindow(QMainWindow):
     """Main window containing the tabbed browser and controls."""
 
-    def __init__(self) -> None:
+    def __init__(self, targets: list | None = None) -> None:
         super().__init__()
+        # URLs or connection identifiers to open instead of the home page
+        self.initial_targets = list(targets or [])
+        self.instance_server: InstanceServer | None = None
+        self.control_server: ControlServer | None = None
+        self.metrics_server: MetricsServer | None = None
+
         # Tab widget configuration
-        self.tabs = QTabWidget()
+        self.tabs = BrowserTabWidget()
+        self.tab_updates = TabUpdateBatcher(self)
         self.tabs.setDocumentMode(True)
         self.tabs.setTabsClosable(True)
         self.tabs.setMovable(True)
@@ -242,15 +3100,68 @@ class BrowserMainWindow(QMainWindow):
         self.status = QStatusBar()
         self.setStatusBar(self.status)
 
-        # Set window icon to the guacamole icon if available
-        try:
-            icon_path = "/usr/share/icons/hicolor/scalable/apps/guacagui.svg"
-            if os.path.exists(icon_path):
-                self.setWindowIcon(QIcon(icon_path))
-            else:
-                self.setWindowIcon(QIcon.fromTheme("guacagui"))
-        except Exception:
-            pass
+        # Background tab freezing; must exist before the first tab is added
+        self.lifecycle = TabLifecycleManager(self.tabs, self)
+        self.lifecycle.state_changed.connect(self.update_tab_state)
+        self.memory_monitor = MemoryPressureMonitor(self.lifecycle, self)
+        self.memory_monitor.tabs_discarded.connect(self.on_tabs_discarded)
+        self.tabs.tabBarClicked.connect(self.capture_current_tab)
+
+        # Tabs that receive broadcast input
+        self.broadcast = BroadcastGroup(self)
+        self.broadcast.changed.connect(self.update_broadcast)
+        self.broadcast.dropped.connect(self.on_broadcast_dropped)
+        self.broadcast.finished.connect(self.on_broadcast_finished)
+
+        # Key injection for the sidebar shortcut
+        self.key_injector = KeyInjector(self)
+
+        # Staggered opening of connection groups and saved lists
+        self.launcher = GroupLauncher(self)
+        self.launcher.progress.connect(self.on_launch_progress)
+        self.launcher.finished.connect(self.on_launch_finished)
+
+        # Renderer CPU/memory sampling for the status bar and the panel
+        self.resources = ResourceMonitor(self.lifecycle, self)
+        self.resources.updated.connect(self.update_resources)
+        self.resource_label = QLabel()
+        self.status.addPermanentWidget(self.resource_label)
+
+        # Guacamole session statistics of the current tab
+        self.session_label = QLabel()
+        self.session_label.setToolTip(
+            "RTT: tunnel round trip (network/VPN) · fps: display frames from guacd · "
+            "backlog: frames received but not yet rendered (local renderer)"
+        )
+        self.status.addPermanentWidget(self.session_label)
+        self.broadcast_label = QLabel()
+        self.broadcast_label.setStyleSheet("color: #c0392b; font-weight: bold;")
+        self.status.addPermanentWidget(self.broadcast_label)
+        self.resource_panel = ResourcePanel(self)
+        self.addDockWidget(Qt.RightDockWidgetArea, self.resource_panel)
+        self.resource_panel.hide()
+
+        # Request waterfall of the current tab
+        self.request_panel = RequestPanel(self)
+        self.addDockWidget(Qt.RightDockWidgetArea, self.request_panel)
+        self.request_panel.hide()
+
+        # Searchable tab switcher for sessions with many tabs
+        self.switcher = TabSwitcher(self)
+        self.addDockWidget(Qt.LeftDockWidgetArea, self.switcher)
+        self.switcher.hide()
+
+        # Shared Guacamole login, loaded after startup
+        self.auth = TokenManager(self)
+        self.assets = AssetCache(self)
+
+        # Guacamole connection tree, loaded from its cache after startup
+        self.directory = ConnectionDirectory(self)
+        self.connection_panel = ConnectionPanel(self, self.directory)
+        self.addDockWidget(Qt.LeftDockWidgetArea, self.connection_panel)
+        self.connection_panel.hide()
+        self.tabs.tabBar().setContextMenuPolicy(Qt.CustomContextMenu)
+        self.tabs.tabBar().customContextMenuRequested.connect(self.show_tab_menu)
 
         # Navigation toolbar
         navtb = QToolBar("Navigation")
@@ -293,45 +3204,400 @@ class BrowserMainWindow(QMainWindow):
         sidebar_btn.triggered.connect(self.toggle_sidebar)
         navtb.addAction(sidebar_btn)
 
-        # Macro text boxes from configuration
+        # Resource panel toggle
+        resources_btn = self.resource_panel.toggleViewAction()
+        resources_btn.setText("Resources")
+        resources_btn.setStatusTip("Show CPU and memory use per tab")
+        navtb.addAction(resources_btn)
+
+        # Tab switcher toggle
+        switcher_btn = self.switcher.toggleViewAction()
+        switcher_btn.setText("Tabs")
+        switcher_btn.setShortcut("Ctrl+Shift+A")
+        switcher_btn.setStatusTip("Search and switch between tabs (Ctrl+Shift+A)")
+        navtb.addAction(switcher_btn)
+
+        # Connection directory toggle
+        connections_btn = self.connection_panel.toggleViewAction()
+        connections_btn.setText("Connections")
+        connections_btn.setShortcut("Ctrl+Shift+O")
+        connections_btn.setStatusTip("Open a Guacamole connection directly (Ctrl+Shift+O)")
+        navtb.addAction(connections_btn)
+
+        # Session statistics overlay toggle
+        self.hud_btn = QAction("HUD", self)
+        self.hud_btn.setCheckable(True)
+        self.hud_btn.setChecked(config_snapshot().section("hud")["overlay"])
+        self.hud_btn.setStatusTip("Show Guacamole latency and frame rate over each tab")
+        self.hud_btn.toggled.connect(self.set_hud_visible)
+        navtb.addAction(self.hud_btn)
+
+        # Macro text boxes from configuration.  They live on their own
+        # toolbar so that a configuration reload can add, remove or
+        # update individual entries without touching the navigation.
+        # The toolbar is filled in by finish_startup.
+        config = config_snapshot()
+        self.config = config
         self.macros = read_macros()
-        if self.macros:
-            navtb.addSeparator()
-            for macro in self.macros:
-                name = macro.get("name", "")
-                text = macro.get("text", "")
-                if name:
-                    lbl = QLabel(name + ":")
-                    navtb.addWidget(lbl)
-                box = MacroLineEdit()
-                box.setText(text)
-                box.setFixedWidth(200)
-                box.setReadOnly(False)
-                navtb.addWidget(box)
-
-        # Create the initial tab
-        home_url = read_home_url()
-        first_tab = BrowserTab(self, url=home_url)
-        self.add_browser_tab(first_tab, "Home")
+        self.macro_toolbar = QToolBar("Macros")
+        self.macro_toolbar.setMovable(False)
+        self.addToolBar(self.macro_toolbar)
+        self.macro_toolbar.hide()
+        self.macro_entries: list[MacroEntry] = []
+
+        # Ctrl+Alt+1..9 type the first nine macros into the current session
+        for number in range(1, 10):
+            action = QAction(f"Type Macro {number}", self)
+            action.setShortcut(f"Ctrl+Alt+{number}")
+            action.triggered.connect(partial(self.type_macro, number - 1))
+            self.addAction(action)
+
+        self.spares = SpareTabPool(self)
+        self.config_watcher: ConfigWatcher | None = None
 
         self.setWindowTitle("Guacagui")
         self.show()
+        startup_profile.mark("window shown")
+
+        # Paint the window first; the first tab (which initialises the
+        # browser profile) and everything non-critical is set up by
+        # finish_startup once the window has been exposed.
+        self.startup_done = False
+        handle = self.windowHandle()
+        if handle is not None:
+            handle.installEventFilter(self)
+        QTimer.singleShot(FIRST_PAINT_TIMEOUT_MS, self.finish_startup)
+
+    # Notice the first expose of the window and continue the startup
+    def eventFilter(self, obj, event):  # type: ignore[override]
+        if event.type() == QEvent.Expose and not self.startup_done and obj.isExposed():
+            startup_profile.mark("first paint")
+            QTimer.singleShot(0, self.finish_startup)
+        return super().eventFilter(obj, event)
+
+    # Deferred part of the window initialisation
+    @pyqtSlot()
+    def finish_startup(self) -> None:
+        if self.startup_done:
+            return
+        self.startup_done = True
+        handle = self.windowHandle()
+        if handle is not None:
+            handle.removeEventFilter(self)
+        config = self.config
+
+        shared_profile()
+        # Seed the first page with the remembered login
+        self.auth.start()
+        # Serve the web client's files from disk from the first page on
+        self.assets.start(shared_profile())
+        startup_profile.mark("profile init")
+
+        # Create the initial tab, then warm up a spare for the next one
+        targets = self.initial_targets
+        first_url = resolve_target(targets[0]) if targets else config.home_url
+        first_tab = BrowserTab(self, url=first_url)
+        first_tab.loadFinished.connect(self.on_first_load)
+        self.add_browser_tab(first_tab, "Home" if not targets else "New Tab")
+        startup_profile.mark("first tab")
+        if len(targets) > 1:
+            self.open_targets(targets[1:])
+
+        self.apply_macros(config.macros)
+        startup_profile.mark("macro toolbar")
+
+        # Set window icon to the guacamole icon if available
+        try:
+            icon_path = "/usr/share/icons/hicolor/scalable/apps/guacagui.svg"
+            if os.path.exists(icon_path):
+                self.setWindowIcon(QIcon(icon_path))
+            else:
+                self.setWindowIcon(QIcon.fromTheme("guacagui"))
+        except Exception:
+            pass
+
+        # Reload the configuration in place whenever the file changes
+        self.config_watcher = ConfigWatcher(self)
+        self.config_watcher.config_changed.connect(self.apply_config)
+        self.update_control_server(config)
+        self.update_metrics_server(config)
+        self.directory.load()
+        self.spares.schedule_refill()
+        startup_profile.mark("deferred init")
+
+    # Pass the Guacamole login of an open tab (or None) to callback; see TokenManager.request
+    def request_auth(self, callback) -> None:
+        base_url = guacamole_base_url()
+        current = self.current_browser()
+        # Frozen and discarded pages would not answer
+        tabs = [
+            tab
+            for tab in self.lifecycle.browsers()
+            if tab.url().toString().startswith(base_url)
+            and (not HAS_LIFECYCLE or self.lifecycle.state(tab) == QWebEnginePage.LifecycleState.Active)
+        ]
+        tabs.sort(key=lambda tab: tab is not current)
+        self.read_page_auth(tabs, callback)
+
+    # Ask each tab in turn for its stored login until one has it
+    def read_page_auth(self, tabs: list, callback) -> None:
+        if not tabs:
+            callback(None)
+            return
+
+        def on_result(result) -> None:
+            auth = parse_page_auth(result)
+            if auth is None:
+                self.read_page_auth(tabs[1:], callback)
+            else:
+                callback(auth)
+
+        tabs[0].page().runJavaScript(READ_AUTH_JS, QWebEngineScript.ApplicationWorld, on_result)
+
+    # Start, move or stop the JSON-RPC control socket as configured
+    def update_control_server(self, config: ConfigSnapshot) -> None:
+        if not config.section("control")["enabled"]:
+            if self.control_server is not None:
+                self.control_server.close()
+            return
+        if self.control_server is None:
+            self.control_server = ControlServer(self)
+        path = control_socket_path(config)
+        if self.control_server.path == path:
+            return
+        try:
+            listening = self.control_server.listen(path)
+        except OSError:
+            listening = False
+        if not listening:
+            self.status.showMessage(f"Could not open the control socket {path}", 5000)
+
+    # Start, move or stop the metrics endpoint according to the "metrics" section
+    def update_metrics_server(self, config: ConfigSnapshot) -> None:
+        options = config.section("metrics")
+        if not options["enabled"]:
+            if self.metrics_server is not None:
+                self.metrics_server.close()
+            return
+        if self.metrics_server is None:
+            self.metrics_server = MetricsServer(self)
+        port = int(options["port"])
+        if self.metrics_server.port != port:
+            try:
+                self.metrics_server.listen(port)
+            except OSError as e:
+                self.status.showMessage(f"Could not serve metrics on port {port}: {e}", 5000)
+                return
+        self.metrics_server.apply_config(config)
+
+    # Accept URLs from later invocations instead of letting them start a new browser
+    def listen_for_instances(self) -> bool:
+        self.instance_server = InstanceServer(self)
+        self.instance_server.open_requested.connect(self.open_targets)
+        return self.instance_server.listen()
+
+    # Open URLs or connection identifiers in new tabs and bring the window forward
+    @pyqtSlot(list)
+    def open_targets(self, targets: list) -> None:
+        for target in targets:
+            self.add_browser_tab(self.spares.take(resolve_target(target)), "New Tab")
+        if self.isMinimized():
+            self.showNormal()
+        self.raise_()
+        self.activateWindow()
+
+    # Finish the startup profile when the first page has loaded
+    @pyqtSlot(bool)
+    def on_first_load(self, _success: bool) -> None:
+        browser = self.sender()
+        if isinstance(browser, BrowserTab):
+            browser.loadFinished.disconnect(self.on_first_load)
+        startup_profile.mark("first load")
+        startup_profile.report()
+
+    # Apply a reloaded configuration snapshot without touching open tabs
+    @pyqtSlot(object)
+    def apply_config(self, config: ConfigSnapshot) -> None:
+        previous = self.config
+        self.config = config
+        self.lifecycle.apply_config(config)
+        self.memory_monitor.apply_config(config)
+        self.resources.apply_config(config)
+        self.key_injector.apply_config(config)
+        self.directory.apply_config(config)
+        self.auth.apply_config(config)
+        self.assets.apply_config(config)
+        self.update_control_server(config)
+        self.update_metrics_server(config)
+        apply_profile_config(shared_profile(), config)
+        if config.macros != previous.macros:
+            self.apply_macros(config.macros)
+            self.macros = config.as_dict()["macros"]
+        # Open tabs keep their pages; only future Home clicks and new
+        # tabs pick up a changed home_url from the snapshot.
+        self.status.showMessage("Configuration reloaded", 3000)
+
+    # Bring the macro toolbar in line with *macros* using a minimal diff
+    def apply_macros(self, macros: tuple) -> None:
+        current = [(entry.name, entry.text) for entry in self.macro_entries]
+        matcher = difflib.SequenceMatcher(a=current, b=list(macros), autojunk=False)
+        entries: list[MacroEntry] = []
+        # Walk the opcodes backwards so that insertion anchors (the entry
+        # that follows) are still in place when they are needed.
+        for tag, i1, i2, j1, j2 in reversed(matcher.get_opcodes()):
+            old = self.macro_entries[i1:i2]
+            new = macros[j1:j2]
+            if tag == "equal":
+                entries[:0] = old
+                continue
+            # Reuse existing widgets for replaced entries, then add or
+            # drop whatever is left over.
+            kept = []
+            for entry, (name, text) in zip(old, new):
+                entry.update(name, text)
+                kept.append(entry)
+            for entry in old[len(new):]:
+                entry.remove(self.macro_toolbar)
+            if len(new) > len(old):
+                anchor = entries[0].first_action if entries else None
+                for name, text in new[len(old):]:
+                    entry = MacroEntry(self.macro_toolbar, name, text, anchor)
+                    entry.box.type_requested.connect(self.type_into_current)
+                    kept.append(entry)
+            entries[:0] = kept
+        self.macro_entries = entries
+        self.macro_toolbar.setVisible(bool(entries))
+
+    # Type the text of the macro at position index into the current tab
+    def type_macro(self, index: int, _checked: bool = False) -> None:
+        if 0 <= index < len(self.macro_entries):
+            metrics.macro_sends += 1
+            self.type_into_current(self.macro_entries[index].box.text())
+
+    # Type text into the Guacamole session of the current tab
+    @pyqtSlot(str)
+    def type_into_current(self, text: str) -> None:
+        browser = self.current_browser()
+        if not isinstance(browser, BrowserTab) or not text:
+            return
+        if browser.broadcast:
+            count = self.broadcast.type_text(text)
+            if count:
+                self.status.showMessage(f"Typing into {count} broadcast tab(s)…")
+            return
+        count = browser.typer.type_text(text)
+        if count:
+            self.status.showMessage(f"Typing {count} key(s)…")
+
+    # Report the outcome of typing into a tab
+    @pyqtSlot(object, int, bool)
+    def on_typing_finished(self, browser: BrowserTab, count: int, ok: bool) -> None:
+        if self.broadcast.acknowledge(browser, count, ok):
+            return
+        index = self.tabs.registry.index_of(browser)
+        title = self.tabs.tabText(index) if index >= 0 else "closed tab"
+        if ok:
+            self.status.showMessage(f"Typed {count} key(s) into {title}", 3000)
+        elif count:
+            self.status.showMessage(f"Typing into {title} stopped after {count} key(s)", 5000)
+        else:
+            self.status.showMessage(f"No connected Guacamole session in {title}", 5000)
+
+    # Open (name, url) pairs in background tabs through the launcher
+    def launch_connections(self, targets: list) -> int:
+        return self.launcher.launch(targets)
+
+    # Open the connections of a saved list from the config
+    def launch_list(self, name: str) -> int:
+        targets = saved_lists().get(name, [])
+        return self.launch_connections([(target, resolve_target(target)) for target in targets])
+
+    @pyqtSlot(int, int)
+    def on_launch_progress(self, done: int, total: int) -> None:
+        self.status.showMessage(f"Opening connections: {done}/{total} done")
+
+    # Report the time-to-connected of every launched tab
+    @pyqtSlot(list)
+    def on_launch_finished(self, results: list) -> None:
+        summary = self.launcher.summary()
+        message = f"Opened {summary['connected']}/{summary['total']} connection(s) in {summary['elapsed_s']:.1f} s"
+        if "median_ms" in summary:
+            message += (
+                f"; time to connect median {summary['median_ms'] / 1000:.1f} s,"
+                f" p95 {summary['p95_ms'] / 1000:.1f} s, max {summary['max_ms'] / 1000:.1f} s"
+            )
+        if summary["failed"]:
+            message += f"; {summary['failed']} failed"
+        self.status.showMessage(message, 15000)
+        box = QMessageBox(QMessageBox.Information, "Connections Opened", message, QMessageBox.Ok, self)
+        box.setDetailedText("\n".join(result.describe() for result in results))
+        box.setAttribute(Qt.WA_DeleteOnClose)
+        box.setModal(False)
+        box.show()
+
+    # Summarize the per-tab results of typing into the broadcast group
+    @pyqtSlot(dict)
+    def on_broadcast_finished(self, results: dict) -> None:
+        failed = [tab for tab, (_count, ok) in results.items() if not ok]
+        done = len(results) - len(failed)
+        message = f"Typed into {done}/{len(results)} broadcast tab(s)"
+        if failed:
+            names = []
+            for tab in failed:
+                index = self.tabs.registry.index_of(tab)
+                names.append(self.tabs.tabText(index) if index >= 0 else "closed tab")
+            message += "; failed: " + ", ".join(names)
+        self.status.showMessage(message, 10000)
+
+    # Warn about a tab that fell behind and left the broadcast group
+    @pyqtSlot(object)
+    def on_broadcast_dropped(self, browser: BrowserTab) -> None:
+        index = self.tabs.registry.index_of(browser)
+        title = self.tabs.tabText(index) if index >= 0 else "closed tab"
+        self.status.showMessage(f"{title} fell behind and was removed from the broadcast", 10000)
+
+    # Mark broadcast tabs in the tab bar and the status bar
+    @pyqtSlot()
+    def update_broadcast(self) -> None:
+        bar = self.tabs.tabBar()
+        members = self.broadcast.members
+        for index in range(self.tabs.count()):
+            browser = self.tabs.widget(index)
+            color = QColor("#c0392b") if getattr(browser, "broadcast", False) else QColor()
+            bar.setTabTextColor(index, color)
+        self.broadcast_label.setText(f"Broadcast: {len(members)} tab(s)" if members else "")
 
     # Helper to return the current BrowserTab
     def current_browser(self) -> BrowserTab:
         return self.tabs.currentWidget()  # type: ignore[return-value]
 
     # Add a BrowserTab to the tab widget
-    def add_browser_tab(self, browser: BrowserTab, label: str = "New Tab") -> int:
+    def add_browser_tab(self, browser: BrowserTab, label: str = "New Tab", background: bool = False) -> int:
+        if background:
+            return self.tabs.addTab(browser, label)
+        self.capture_current_tab()
         i = self.tabs.addTab(browser, label)
         self.tabs.setCurrentIndex(i)
         return i
 
+    # Screenshot the current tab before another one hides it
+    @pyqtSlot()
+    @pyqtSlot(int)
+    def capture_current_tab(self, _index: int = -1) -> None:
+        browser = self.current_browser()
+        if isinstance(browser, BrowserTab):
+            browser.capture_screenshot()
+
+    # Report tabs discarded by the memory monitor
+    @pyqtSlot(int)
+    def on_tabs_discarded(self, count: int) -> None:
+        self.status.showMessage(f"Memory low: discarded {count} background tab(s)", 5000)
+
     # Open a blank tab when the tab bar is double clicked in empty space
     @pyqtSlot(int)
     def tab_open_doubleclick(self, index: int) -> None:
         if index == -1:
-            new_tab = BrowserTab(self)
+            new_tab = self.spares.take()
             self.add_browser_tab(new_tab, "New Tab")
 
     # Update UI when the current tab changes
@@ -339,18 +3605,128 @@ class BrowserMainWindow(QMainWindow):
     def current_tab_changed(self, index: int) -> None:
         browser = self.current_browser()
         if not isinstance(browser, BrowserTab):
+            self.lifecycle.activate(None)
+            self.session_label.clear()
             return
+        self.lifecycle.activate(browser)
+        self.broadcast.update_mirror()
+        self.request_panel.show_tab(browser)
+        self.update_resources()
+        self.session_label.setText(self.session_text(browser))
         url = browser.url()
         self.update_urlbar(url)
         title = browser.page().title() or "Untitled"
         self.update_title(title)
 
+    # Show the current tab's renderer usage and refresh the resource panel
+    @pyqtSlot()
+    def update_resources(self) -> None:
+        sample = self.resources.samples.get(self.current_browser())
+        if sample is None:
+            self.resource_label.setText("")
+        else:
+            self.resource_label.setText(sample.describe() + (" ⚠" if sample.outlier else ""))
+        self.resource_panel.refresh(self.resources.samples)
+
+    # Show a tab's latest Guacamole session statistics
+    @pyqtSlot(object)
+    def on_session_stats(self, browser: BrowserTab) -> None:
+        if browser is self.current_browser():
+            self.session_label.setText(self.session_text(browser))
+        if self.hud_btn.isChecked():
+            browser.show_session_overlay(True)
+
+    # Status bar text for a tab's session: latency, frame rate and traffic
+    def session_text(self, browser: BrowserTab) -> str:
+        text = browser.bridge.stats.describe()
+        if text:
+            rx_rate, tx_rate = browser.bridge.traffic.rates()
+            text += f" · ↓ {format_rate(rx_rate)} ↑ {format_rate(tx_rate)}"
+        return text
+
+    # Toggle the session statistics overlay on every tab
+    @pyqtSlot(bool)
+    def set_hud_visible(self, visible: bool) -> None:
+        for browser in self.lifecycle.browsers():
+            browser.show_session_overlay(visible)
+
+    # Show the request waterfall of a tab
+    def show_requests(self, browser: BrowserTab) -> None:
+        self.request_panel.show()
+        self.request_panel.raise_()
+        self.request_panel.show_tab(browser)
+
+    # Context menu for a tab: keep-live allow-list and manual freezing
+    @pyqtSlot(QPoint)
+    def show_tab_menu(self, pos: QPoint) -> None:
+        index = self.tabs.tabBar().tabAt(pos)
+        browser = self.tabs.widget(index)
+        if not isinstance(browser, BrowserTab):
+            return
+        menu = QMenu(self)
+        keep_action = menu.addAction("Keep Live")
+        keep_action.setCheckable(True)
+        keep_action.setChecked(browser.keep_alive)
+        keep_action.toggled.connect(partial(self.set_keep_alive, browser))
+        if HAS_LIFECYCLE:
+            freeze_action = menu.addAction("Freeze Now")
+            freeze_action.setEnabled(browser is not self.current_browser())
+            freeze_action.triggered.connect(partial(self.lifecycle.freeze, browser))
+        menu.addSeparator()
+        broadcast_action = menu.addAction("Broadcast Input")
+        broadcast_action.setCheckable(True)
+        broadcast_action.setChecked(browser.broadcast)
+        broadcast_action.toggled.connect(partial(self.broadcast.set_member, browser))
+        menu.addAction("Broadcast to All Tabs").triggered.connect(self.broadcast_all)
+        stop_action = menu.addAction("Stop Broadcasting")
+        stop_action.setEnabled(bool(self.broadcast.members))
+        stop_action.triggered.connect(self.broadcast.clear)
+        menu.addSeparator()
+        menu.addAction("Cache Statistics").triggered.connect(self.show_cache_stats)
+        menu.addAction("Request Waterfall").triggered.connect(partial(self.show_requests, browser))
+        menu.exec_(self.tabs.tabBar().mapToGlobal(pos))
+
+    # Put every tab in the broadcast group
+    def broadcast_all(self) -> None:
+        for index in range(self.tabs.count()):
+            browser = self.tabs.widget(index)
+            if isinstance(browser, BrowserTab):
+                self.broadcast.set_member(browser, True)
+
+    # Show the shared HTTP cache counters
+    def show_cache_stats(self) -> None:
+        QMessageBox.information(self, "HTTP Cache", cache_stats.summary())
+
+    # Add or remove a tab from the lifecycle allow-list
+    def set_keep_alive(self, browser: BrowserTab, keep: bool) -> None:
+        browser.keep_alive = keep
+        if keep:
+            self.lifecycle.thaw(browser)
+
+    # Reflect a tab's lifecycle state in its tooltip
+    @pyqtSlot(object)
+    def update_tab_state(self, browser: BrowserTab) -> None:
+        idx = self.tabs.registry.index_of(browser)
+        if idx == -1:
+            return
+        state = self.lifecycle.state(browser)
+        if state == QWebEnginePage.LifecycleState.Frozen:
+            self.tabs.setTabToolTip(idx, "Frozen")
+        elif state == QWebEnginePage.LifecycleState.Discarded:
+            self.tabs.setTabToolTip(idx, "Discarded")
+        else:
+            self.tabs.setTabToolTip(idx, "")
+
     # Close the specified tab if more than one tab is open
     @pyqtSlot(int)
     def close_current_tab(self, index: int) -> None:
         if self.tabs.count() < 2:
             return
+        browser = self.tabs.widget(index)
         self.tabs.removeTab(index)
+        # Delete the view so its renderer process is released as well
+        if browser is not None:
+            browser.deleteLater()
 
     # Update the window title
     def update_title(self, title: str) -> None:
@@ -365,7 +3741,7 @@ class BrowserMainWindow(QMainWindow):
 
     # Navigate to the home URL in the current tab
     def navigate_home(self) -> None:
-        self.current_browser().setUrl(QUrl(read_home_url()))
+        self.current_browser().setUrl(QUrl(config_snapshot().home_url))
 
     # Navigate to the URL typed in the URL bar (if present)
     def navigate_to_url(self) -> None:
@@ -377,32 +3753,95 @@ class BrowserMainWindow(QMainWindow):
             url_text = "http://" + url_text
         self.current_browser().setUrl(QUrl(url_text))
 
-    # Toggle the Guacamole sidebar by sending Ctrl+Alt+Shift via xdotool
+    # Toggle the Guacamole sidebar by sending Ctrl+Alt+Shift
     def toggle_sidebar(self) -> None:
         view = self.current_browser()
         if not isinstance(view, QWebEngineView):
             return
         view.setFocus()
-        try:
-            subprocess.run(["xdotool", "key", "ctrl+alt+shift"], check=True)
-        except Exception:
-            # Fall back to synthesising key events via Qt.  This may not
-            # work with Guacamole, but is retained as a best effort.
-            from PyQt5.QtGui import QKeyEvent
-            from PyQt5.QtCore import QEvent
-            modifiers = [Qt.Key_Control, Qt.Key_Alt, Qt.Key_Shift]
-            for key in modifiers:
-                event_press = QKeyEvent(QEvent.KeyPress, key, Qt.NoModifier, "")
-                QApplication.postEvent(view, event_press)
-            for key in reversed(modifiers):
-                event_release = QKeyEvent(QEvent.KeyRelease, key, Qt.NoModifier, "")
-                QApplication.postEvent(view, event_release)
+        self.key_injector.send(view, ("ctrl", "alt", "shift"))
+
+
+# Qt's command line options that take a value, see QGuiApplication and QApplication
+QT_VALUE_OPTIONS = frozenset((
+    "-platform",
+    "-platformpluginpath",
+    "-platformtheme",
+    "-plugin",
+    "-qwindowgeometry",
+    "-geometry",
+    "-qwindowicon",
+    "-icon",
+    "-qwindowtitle",
+    "-title",
+    "-display",
+    "-name",
+    "-session",
+    "-style",
+    "-stylesheet",
+    "-visual",
+))
+
+
+def parse_args(argv: list) -> tuple:
+    """Parse Guacagui's own options and return ``(options, remaining_argv)``.
+
+    Arguments that are not recognised are left for QApplication.  Qt's
+    options that take a value are set aside first so that their values
+    are not taken for targets.
+    """
+    qt_options = []
+    own = []
+    args = iter(argv[1:])
+    for arg in args:
+        if arg == "--":
+            own.append(arg)
+            own.extend(args)
+        elif arg in QT_VALUE_OPTIONS or arg[1:] in QT_VALUE_OPTIONS:
+            qt_options.append(arg)
+            value = next(args, None)
+            if value is not None:
+                qt_options.append(value)
+        else:
+            own.append(arg)
+    parser = argparse.ArgumentParser(prog="guacagui", description="Tabbed browser for Apache Guacamole")
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="print a timeline of the startup phases to stderr",
+    )
+    parser.add_argument(
+        "--new-instance",
+        action="store_true",
+        help="start a separate browser even if one is already running",
+    )
+    parser.add_argument(
+        "targets",
+        nargs="*",
+        metavar="URL|CONNECTION",
+        help="URLs or Guacamole connection identifiers ([data source/]id) to open",
+    )
+    options, remaining = parser.parse_known_args(own)
+    return options, argv[:1] + qt_options + remaining
 
 
 def main() -> None:
-    app = QApplication(sys.argv)
-    window = BrowserMainWindow()
-    sys.exit(app.exec_())
+    startup_profile.mark("imports")
+    options, qt_argv = parse_args(sys.argv)
+    startup_profile.enabled = options.profile_startup
+    single = config_snapshot().section("instance")["single"] and not options.new_instance
+    if single and hand_off(options.targets):
+        sys.exit(0)
+    register_asset_scheme()
+    app = QApplication(qt_argv)
+    startup_profile.mark("QApplication")
+    window = BrowserMainWindow(options.targets)
+    if single:
+        window.listen_for_instances()
+    status = app.exec_()
+    # Delete the pages before the shared profile goes away with the app
+    del window
+    sys.exit(status)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,361 @@
+"""
+guacagui_config.py
+
+Configuration of the Guacagui browser: the validated, process-wide
+snapshot of `config.json` shared by every part of the browser, and the
+helpers deriving Guacamole URLs and the per-user cache directory from
+it.  Kept free of Qt so that the other Guacagui modules and the tests
+can import it on their own.
+
+"""
+
+import base64
+import json
+import os
+import re
+from types import MappingProxyType
+
+
+# Name of the JSON configuration file expected to reside alongside this script.
+CONFIG_FILE = "config.json"
+
+
+DEFAULT_HOME_URL = "https://www.google.com"
+
+# Optional configuration sections and their defaults.  A value from
+# CONFIG_FILE is only accepted if it has the same type as its default
+# (ints and floats are interchangeable, lists become tuples of strings).
+CONFIG_SECTIONS = {
+    # Background tab freezing, see TabLifecycleManager
+    "lifecycle": {
+        "freeze_after_seconds": 300,
+        "discard_after_seconds": 0,
+        "check_interval_seconds": 15,
+        "keep_alive": [],
+    },
+    # Memory-pressure tab discarding, see MemoryPressureMonitor
+    "memory": {
+        "policy": "lru",
+        "min_available_percent": 10,
+        "min_available_mb": 0,
+        "max_renderer_mb": 0,
+        "check_interval_seconds": 15,
+        "discard_per_check": 1,
+    },
+    # Shared QWebEngineProfile, see shared_profile
+    "cache": {
+        "size_mb": 256,
+        "persistent_cookies": True,
+    },
+    # Guacamole web client files served from disk, see AssetCache
+    "assets": {
+        "enabled": True,
+    },
+    # Per-tab request log for the waterfall, see RequestRecorder
+    "requests": {
+        "enabled": True,
+        "max_entries": 500,
+    },
+    # Pre-warmed spare tab, see SpareTabPool
+    "spare_tab": {
+        "enabled": True,
+        "preload_home": True,
+        "refill_delay_ms": 1000,
+    },
+    # Per-tab renderer sampling, see ResourceMonitor
+    "resources": {
+        "interval_seconds": 5,
+        "cpu_alert_percent": 80,
+        "rss_alert_mb": 1500,
+        "outlier_factor": 3.0,
+    },
+    # Guacamole session statistics, see GUAC_HOOK_JS and SessionOverlay
+    "hud": {
+        "overlay": False,
+        "report_interval_ms": 1000,
+    },
+    # Typing macros into Guacamole sessions, see KeyTyper
+    "typing": {
+        "macro_mode": "clipboard",
+        "keys_per_second": 100,
+        "batch_size": 10,
+        "max_buffered_kb": 64,
+    },
+    # Mirroring input to several tabs, see BroadcastGroup
+    "broadcast": {
+        "max_queued_keys": 2000,
+    },
+    # Key injection backends in order of preference, see KeyInjector
+    "input": {
+        "backends": ["js", "xtest", "process", "qt"],
+    },
+    # The Guacamole server behind home_url
+    "guacamole": {
+        "data_source": "mysql",
+    },
+    # Hand later invocations over to the running window, see InstanceServer
+    "instance": {
+        "single": True,
+    },
+    # Sharing and renewing the Guacamole login, see TokenManager
+    "auth": {
+        "remember": True,
+        "renew_minutes": 20,
+    },
+    # Connection directory sidebar, see ConnectionDirectory
+    "directory": {
+        "refresh_minutes": 5,
+    },
+    # Opening many connections at once, see GroupLauncher; "lists" maps a
+    # name to connection identifiers or URLs
+    "launcher": {
+        "max_concurrent": 4,
+        "ramp_up_ms": 500,
+        "connect_timeout_seconds": 60,
+        "lists": {},
+    },
+    # Prometheus text metrics on localhost, see MetricsServer
+    "metrics": {
+        "enabled": False,
+        "port": 9464,
+        "update_seconds": 5,
+    },
+    # Local JSON-RPC control socket, see ControlServer
+    "control": {
+        "enabled": False,
+        "socket_path": "",
+    },
+}
+
+
+class ConfigSnapshot:
+    """Immutable, parsed view of CONFIG_FILE at a given modification time.
+
+    Snapshots are shared process-wide through :func:`config_snapshot`
+    so that tabs, the Home button and the macro toolbar all read the
+    same parsed values instead of re-opening the file.  ``macros`` is a
+    tuple of ``(name, text)`` pairs and ``sections`` maps each name in
+    ``CONFIG_SECTIONS`` to a read-only mapping of validated values, in
+    which nested objects and arrays are frozen as well.  The
+    ``stamp`` records the file's ``(st_mtime_ns, st_size)`` (or ``None``
+    if the file was missing) and is used to decide whether the snapshot
+    is still current.
+    """
+
+    __slots__ = ("home_url", "macros", "sections", "stamp")
+
+    def __init__(
+        self, home_url: str, macros: tuple, sections: MappingProxyType, stamp: tuple | None
+    ) -> None:
+        object.__setattr__(self, "home_url", home_url)
+        object.__setattr__(self, "macros", macros)
+        object.__setattr__(self, "sections", sections)
+        object.__setattr__(self, "stamp", stamp)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ConfigSnapshot is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("ConfigSnapshot is immutable")
+
+    def section(self, name: str) -> MappingProxyType:
+        """Return the validated values of the configuration section *name*."""
+        return self.sections[name]
+
+    def as_dict(self) -> dict:
+        """Return the snapshot in the dictionary form used by :func:`read_config`."""
+        return {
+            "home_url": self.home_url,
+            "macros": [{"name": name, "text": text} for name, text in self.macros],
+        }
+
+
+# The current process-wide snapshot; replaced whenever the file changes.
+_config_cache: ConfigSnapshot | None = None
+
+
+def config_path() -> str:
+    """Return the absolute path of the configuration file.
+
+    This is CONFIG_FILE next to this script unless the ``GUACAGUI_CONFIG``
+    environment variable names another file (used by the benchmarks).
+    """
+    override = os.environ.get("GUACAGUI_CONFIG")
+    if override:
+        return os.path.abspath(override)
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), CONFIG_FILE)
+
+
+def _config_stamp(path: str) -> tuple | None:
+    """Return ``(st_mtime_ns, st_size)`` for *path*, or ``None`` if it is missing."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _freeze(value):
+    """Return *value* with nested dicts and lists made read-only."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _parse_section(raw, defaults: dict) -> MappingProxyType:
+    """Merge the user-supplied section *raw* over *defaults*, dropping bad values."""
+    values = {}
+    for key, default in defaults.items():
+        value = raw.get(key, default) if isinstance(raw, dict) else default
+        if isinstance(default, bool):
+            ok = isinstance(value, bool)
+        elif isinstance(default, (int, float)):
+            ok = isinstance(value, (int, float)) and not isinstance(value, bool)
+        elif isinstance(default, list):
+            ok = isinstance(value, list)
+            if ok:
+                value = tuple(item for item in value if isinstance(item, str))
+        else:
+            ok = isinstance(value, type(default))
+        if not ok:
+            value = default
+        values[key] = _freeze(value)
+    return MappingProxyType(values)
+
+
+def normalize_url(url: str) -> str:
+    """Strip *url* and prefix ``https://`` if it has no http(s) scheme."""
+    url = url.strip()
+    if not url.startswith(("http://", "https://")):
+        # Default to https for unspecified schemes
+        url = "https://" + url
+    return url
+
+
+def _parse_config(data, stamp: tuple | None) -> ConfigSnapshot:
+    """Validate the decoded JSON *data* and build a :class:`ConfigSnapshot`.
+
+    Invalid or missing values fall back to the defaults described in
+    :func:`read_config` and ``CONFIG_SECTIONS``.
+    """
+    home_url = DEFAULT_HOME_URL
+    macros = []
+    if not isinstance(data, dict):
+        data = {}
+    # Parse home_url
+    url = data.get("home_url", home_url)
+    if isinstance(url, str):
+        home_url = normalize_url(url)
+    # Parse macros list
+    entries = data.get("macros", [])
+    if isinstance(entries, list):
+        for entry in entries:
+            if not isinstance(entry, dict):
+                continue
+            # Accept alternate key names for convenience
+            name = entry.get("name") or entry.get("label") or entry.get("button")
+            text = entry.get("text") or entry.get("macro")
+            if isinstance(name, str) and isinstance(text, str):
+                macros.append((name, text))
+    # Parse the optional feature sections
+    sections = MappingProxyType(
+        {name: _parse_section(data.get(name), defaults) for name, defaults in CONFIG_SECTIONS.items()}
+    )
+    return ConfigSnapshot(home_url, tuple(macros), sections, stamp)
+
+
+def config_snapshot() -> ConfigSnapshot:
+    """Return the current configuration snapshot, reloading only if the file changed.
+
+    The file is parsed once and then revalidated with a single
+    ``os.stat`` call per invocation: if its modification time and size
+    are unchanged the cached snapshot is returned as is.  A file that
+    cannot be read or parsed yields the defaults.
+    """
+    global _config_cache
+    path = config_path()
+    stamp = _config_stamp(path)
+    cached = _config_cache
+    if cached is not None and cached.stamp == stamp:
+        return cached
+    data = None
+    if stamp is not None:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception:
+            data = None
+    _config_cache = _parse_config(data, stamp)
+    return _config_cache
+
+
+def read_config() -> dict:
+    """Read and validate the configuration from CONFIG_FILE.
+
+    Returns a dictionary with two keys:
+
+    - ``home_url``: The URL to load when the application starts.  A
+      default of ``https://www.google.com`` is used if this value is
+      missing or invalid.  If the URL string does not specify a
+      protocol, ``https://`` is prefixed automatically.
+
+    - ``macros``: A list of dictionaries defining the macro text
+      boxes.  Each entry must contain ``name`` and ``text``
+      strings.  The ``name`` is used as a label and the ``text`` is
+      placed into the associated QLineEdit.  Entries with missing or
+      invalid fields are skipped.
+
+    The values come from the shared :func:`config_snapshot`, so the
+    file is only re-parsed when it has changed on disk.
+    """
+    return config_snapshot().as_dict()
+
+
+def read_home_url() -> str:
+    """Return the configured home URL with scheme, falling back to the default."""
+    return config_snapshot().home_url
+
+
+def read_macros() -> list:
+    """Return the list of macro definitions from the configuration file."""
+    return config_snapshot().as_dict()["macros"]
+
+
+def guacamole_base_url(config: ConfigSnapshot | None = None) -> str:
+    """Return the Guacamole web application URL (``home_url`` without fragment), ending in ``/``."""
+    config = config or config_snapshot()
+    url = config.home_url.split("#", 1)[0]
+    return url if url.endswith("/") else url + "/"
+
+
+def connection_url(identifier: str, data_source: str | None = None, kind: str = "c") -> str:
+    """Return the URL that opens a Guacamole connection directly in the client.
+
+    Guacamole identifies the client of a connection (``kind`` ``"c"``) or
+    balancing group (``"g"``) by the base64 of
+    ``<identifier>\0<kind>\0<data source>``.
+    """
+    data_source = data_source or config_snapshot().section("guacamole")["data_source"]
+    raw = "\0".join((identifier, kind, data_source)).encode("utf-8")
+    return guacamole_base_url() + "#/client/" + base64.b64encode(raw).decode("ascii")
+
+
+# A connection given as "<identifier>" or "<data source>/<identifier>"
+CONNECTION_TARGET = re.compile(r"^(?:(?P<source>[A-Za-z][\w-]*)/)?(?P<id>\d+)$")
+
+
+def resolve_target(target: str) -> str:
+    """Turn a command line target, a URL or a connection identifier, into a URL."""
+    target = target.strip()
+    match = CONNECTION_TARGET.match(target)
+    if match:
+        return connection_url(match.group("id"), match.group("source"))
+    return normalize_url(target)
+
+
+def cache_dir() -> str:
+    """Return the per-user directory for the browser profile (``~/.cache/guacagui``)."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "guacagui")
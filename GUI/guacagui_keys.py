@@ -0,0 +1,291 @@
+"""
+guacagui_keys.py
+
+Key injection for the Guacagui browser: :class:`KeyInjector` delivers key
+chords such as Ctrl+Alt+Shift (which toggles the Guacamole sidebar) to a
+tab through a list of backends, from events dispatched inside the page
+to XTest, ``xdotool`` and plain QKeyEvents.
+
+"""
+
+import abc
+import json
+import os
+import shutil
+import time
+from collections import deque
+
+from PyQt5.QtCore import Qt, QEvent, QObject, QProcess, QTimer
+from PyQt5.QtGui import QKeyEvent
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtWebEngineWidgets import QWebEngineView
+
+from guacagui_config import ConfigSnapshot, config_snapshot
+
+# Optional: XTest key injection over a persistent X connection
+try:
+    from Xlib import X
+    from Xlib import display as xdisplay
+    from Xlib.ext import xtest
+    HAS_XLIB = True
+except ImportError:
+    HAS_XLIB = False
+
+
+# Keys that can be injected: X keysym, DOM key, DOM code, DOM keyCode and Qt key
+INJECT_KEYS = {
+    "ctrl": (0xFFE3, "Control", "ControlLeft", 17, Qt.Key_Control),
+    "alt": (0xFFE9, "Alt", "AltLeft", 18, Qt.Key_Alt),
+    "shift": (0xFFE1, "Shift", "ShiftLeft", 16, Qt.Key_Shift),
+}
+
+# Dispatches keydown events for the chord and keyup events in reverse to
+# the document, where Guacamole.Keyboard listens.  The modifier flags of
+# each event follow the keys held at that point, because Guacamole.Keyboard
+# releases modifiers that an event reports as up.
+INJECT_KEYS_JS = """
+(function (keys) {
+    if (!window.Guacamole) return false;
+    var held = {};
+    function fire(type, key) {
+        if (type === 'keydown') held[key.key] = true;
+        else delete held[key.key];
+        var event = new KeyboardEvent(type, {
+            key: key.key, code: key.code, location: 1, bubbles: true, cancelable: true,
+            ctrlKey: !!held.Control, altKey: !!held.Alt, shiftKey: !!held.Shift
+        });
+        Object.defineProperty(event, 'keyCode', { get: function () { return key.keyCode; } });
+        Object.defineProperty(event, 'which', { get: function () { return key.keyCode; } });
+        (document.activeElement || document.body || document).dispatchEvent(event);
+    }
+    keys.forEach(function (key) { fire('keydown', key); });
+    keys.slice().reverse().forEach(function (key) { fire('keyup', key); });
+    return true;
+})(%s)
+"""
+
+
+class KeyBackend(abc.ABC):
+    """One way of delivering a key chord to a tab, see :class:`KeyInjector`.
+
+    ``send`` presses the keys of *chord* (names from ``INJECT_KEYS``) in
+    order, releases them in reverse and calls ``done(ok)``, possibly
+    later from the event loop.
+    """
+
+    name = ""
+
+    def __init__(self, injector: "KeyInjector") -> None:
+        self.injector = injector
+
+    def available(self) -> bool:
+        return True
+
+    @abc.abstractmethod
+    def send(self, view: QWebEngineView, chord: tuple, done) -> None:
+        ...
+
+
+class JsKeyBackend(KeyBackend):
+    """Dispatch synthetic keyboard events inside a Guacamole page."""
+
+    name = "js"
+
+    def send(self, view: QWebEngineView, chord: tuple, done) -> None:
+        keys = [
+            {"key": INJECT_KEYS[name][1], "code": INJECT_KEYS[name][2], "keyCode": INJECT_KEYS[name][3]}
+            for name in chord
+        ]
+        view.page().runJavaScript(INJECT_KEYS_JS % json.dumps(keys), lambda result: done(bool(result)))
+
+
+class XTestKeyBackend(KeyBackend):
+    """Fake key presses with the XTest extension over one persistent X connection."""
+
+    name = "xtest"
+    # How long to wait for the window manager to activate the window
+    ACTIVATE_TIMEOUT_MS = 500
+
+    def __init__(self, injector: "KeyInjector") -> None:
+        super().__init__(injector)
+        self.display = None
+        self.failed = False
+
+    def available(self) -> bool:
+        if self.display is not None:
+            return True
+        if self.failed or not HAS_XLIB or not os.environ.get("DISPLAY"):
+            return False
+        try:
+            display = xdisplay.Display()
+            if not display.query_extension("XTEST"):
+                display.close()
+                raise RuntimeError("no XTEST extension")
+        except Exception:
+            self.failed = True
+            return False
+        self.display = display
+        return True
+
+    def send(self, view: QWebEngineView, chord: tuple, done) -> None:
+        # XTest events go to the focused window, so only send them once
+        # the window manager has actually activated ours
+        window = view.window()
+        if window.isActiveWindow():
+            self.fake_keys(chord, done)
+            return
+        handle = window.windowHandle()
+        if handle is None:
+            done(False)
+            return
+        timer = QTimer(self.injector)
+        timer.setSingleShot(True)
+        waiting = True
+
+        def finish(active: bool) -> None:
+            nonlocal waiting
+            if not waiting:
+                return
+            waiting = False
+            timer.stop()
+            timer.deleteLater()
+            handle.activeChanged.disconnect(on_active_changed)
+            if active:
+                self.fake_keys(chord, done)
+            else:
+                done(False)
+
+        def on_active_changed() -> None:
+            if window.isActiveWindow():
+                finish(True)
+
+        handle.activeChanged.connect(on_active_changed)
+        timer.timeout.connect(lambda: finish(window.isActiveWindow()))
+        timer.start(self.ACTIVATE_TIMEOUT_MS)
+        window.activateWindow()
+
+    def fake_keys(self, chord: tuple, done) -> None:
+        display = self.display
+        try:
+            keycodes = [display.keysym_to_keycode(INJECT_KEYS[name][0]) for name in chord]
+            if not all(keycodes):
+                done(False)
+                return
+            for keycode in keycodes:
+                xtest.fake_input(display, X.KeyPress, keycode)
+            for keycode in reversed(keycodes):
+                xtest.fake_input(display, X.KeyRelease, keycode)
+            display.flush()
+        except Exception:
+            # The connection is unusable; try to reopen it next time
+            self.display = None
+            done(False)
+            return
+        done(True)
+
+
+class ProcessKeyBackend(KeyBackend):
+    """Run ``xdotool key`` in a small pool of reusable, non-blocking QProcesses."""
+
+    name = "process"
+    POOL_SIZE = 2
+
+    def __init__(self, injector: "KeyInjector") -> None:
+        super().__init__(injector)
+        self.idle: list = []
+        self.running = 0
+        self.waiting: deque = deque()
+
+    def available(self) -> bool:
+        return bool(os.environ.get("DISPLAY")) and shutil.which("xdotool") is not None
+
+    def send(self, view: QWebEngineView, chord: tuple, done) -> None:
+        if not self.idle and self.running >= self.POOL_SIZE:
+            self.waiting.append((view, chord, done))
+            return
+        process = self.idle.pop() if self.idle else QProcess(self.injector)
+        self.running += 1
+
+        def finished(ok: bool) -> None:
+            process.finished.disconnect()
+            process.errorOccurred.disconnect()
+            self.running -= 1
+            self.idle.append(process)
+            done(ok)
+            if self.waiting:
+                self.send(*self.waiting.popleft())
+
+        process.finished.connect(lambda code, status: finished(status == QProcess.NormalExit and code == 0))
+        process.errorOccurred.connect(
+            lambda error: finished(False) if error == QProcess.FailedToStart else None
+        )
+        process.start("xdotool", ["key", "+".join(chord)])
+
+
+class QtKeyBackend(KeyBackend):
+    """Post QKeyEvents to the view; often ignored by Guacamole, the last resort."""
+
+    name = "qt"
+
+    def send(self, view: QWebEngineView, chord: tuple, done) -> None:
+        keys = [INJECT_KEYS[name][4] for name in chord]
+        for key in keys:
+            QApplication.postEvent(view, QKeyEvent(QEvent.KeyPress, key, Qt.NoModifier, ""))
+        for key in reversed(keys):
+            QApplication.postEvent(view, QKeyEvent(QEvent.KeyRelease, key, Qt.NoModifier, ""))
+        done(True)
+
+
+class KeyInjector(QObject):
+    """Deliver key chords such as Ctrl+Alt+Shift to a tab without blocking.
+
+    The backends named in ``input.backends`` are tried in order until one
+    reports success: ``js`` dispatches events inside a Guacamole page,
+    ``xtest`` fakes them through XTest (needs python-xlib), ``process``
+    runs ``xdotool`` in pooled QProcesses and ``qt`` posts QKeyEvents.
+    The latency of each successful injection is kept per backend in
+    ``latencies`` for the benchmarks.
+    """
+
+    BACKENDS = {
+        backend.name: backend
+        for backend in (JsKeyBackend, XTestKeyBackend, ProcessKeyBackend, QtKeyBackend)
+    }
+
+    def __init__(self, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self.backends = {name: cls(self) for name, cls in self.BACKENDS.items()}
+        self.latencies = {name: deque(maxlen=100) for name in self.BACKENDS}
+        self.last_backend: str | None = None
+        self.order: list = []
+        self.apply_config(config_snapshot())
+
+    def apply_config(self, config: ConfigSnapshot) -> None:
+        names = [name for name in config.section("input")["backends"] if name in self.BACKENDS]
+        self.order = names or list(self.BACKENDS)
+
+    def send(self, view: QWebEngineView, chord: tuple, done=None, order: list | None = None) -> None:
+        """Inject *chord* into *view*; ``done`` receives the backend used, or None."""
+        self.try_next(view, chord, list(self.order if order is None else order), done)
+
+    def try_next(self, view: QWebEngineView, chord: tuple, remaining: list, done) -> None:
+        while remaining:
+            backend = self.backends[remaining.pop(0)]
+            if backend.available():
+                break
+        else:
+            if done is not None:
+                done(None)
+            return
+        started = time.perf_counter()
+
+        def finished(ok: bool) -> None:
+            if not ok:
+                self.try_next(view, chord, remaining, done)
+                return
+            self.latencies[backend.name].append((time.perf_counter() - started) * 1000.0)
+            self.last_backend = backend.name
+            if done is not None:
+                done(backend.name)
+
+        backend.send(view, chord, finished)
@@ -0,0 +1,190 @@
+"""
+guacagui_launcher.py
+
+Opening many Guacamole connections at once: :class:`GroupLauncher`
+starts them in background tabs of the browser window at a limited rate
+and reports how long each took to connect.
+
+"""
+
+import time
+from collections import deque
+from typing import TYPE_CHECKING
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal, pyqtSlot
+
+from guacagui_config import config_snapshot
+
+if TYPE_CHECKING:
+    from guacagui_clipboard import BrowserMainWindow, BrowserTab
+
+
+def saved_lists() -> dict:
+    """Return the valid entries of ``launcher.lists`` as name -> list of targets."""
+    lists = {}
+    for name, targets in config_snapshot().section("launcher")["lists"].items():
+        if isinstance(targets, tuple):
+            targets = [t for t in targets if isinstance(t, str) and t.strip()]
+            if targets:
+                lists[str(name)] = targets
+    return lists
+
+
+class LaunchResult:
+    """Outcome of opening one connection with :class:`GroupLauncher`."""
+
+    __slots__ = ("name", "url", "tab", "started", "connected_ms", "error")
+
+    def __init__(self, name: str, url: str) -> None:
+        self.name = name
+        self.url = url
+        self.tab: "BrowserTab | None" = None
+        self.started = 0.0
+        self.connected_ms: float | None = None
+        self.error = ""
+
+    def describe(self) -> str:
+        if self.connected_ms is not None:
+            return f"{self.name}: connected in {self.connected_ms / 1000:.1f} s"
+        return f"{self.name}: {self.error or 'not started'}"
+
+
+def summarize_launch(results: list, elapsed: float) -> dict:
+    """Return counts and time-to-connected statistics (ms) for *results*."""
+    times = sorted(r.connected_ms for r in results if r.connected_ms is not None)
+    summary = {
+        "total": len(results),
+        "connected": len(times),
+        "failed": len(results) - len(times),
+        "elapsed_s": round(elapsed, 1),
+    }
+    if times:
+        summary.update({
+            "median_ms": round(times[len(times) // 2]),
+            "p95_ms": round(times[min(len(times) - 1, int(len(times) * 0.95))]),
+            "max_ms": round(times[-1]),
+        })
+    return summary
+
+
+class GroupLauncher(QObject):
+    """Open many connections in background tabs without overwhelming guacd.
+
+    At most ``launcher.max_concurrent`` tabs are connecting at a time and
+    consecutive tabs are started at least ``launcher.ramp_up_ms`` apart.
+    A tab counts as connected when its tunnel delivers the first frame
+    (see GUAC_HOOK_JS); one that has not connected after
+    ``launcher.connect_timeout_seconds`` counts as failed and frees its
+    slot.  ``progress`` reports ``(done, total)`` and ``finished`` the
+    :class:`LaunchResult` of every connection once the queue is empty.
+    """
+
+    progress = pyqtSignal(int, int)
+    finished = pyqtSignal(list)
+
+    def __init__(self, window: "BrowserMainWindow") -> None:
+        super().__init__(window)
+        self.main_window = window
+        self.queue: deque = deque()
+        self.connecting: dict = {}
+        self.results: list = []
+        self.last_start = 0.0
+        self.run_started = 0.0
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.start_next)
+        self.watchdog = QTimer(self)
+        self.watchdog.setInterval(1000)
+        self.watchdog.timeout.connect(self.check_timeouts)
+
+    @property
+    def running(self) -> bool:
+        return bool(self.queue or self.connecting)
+
+    def launch(self, targets: list) -> int:
+        """Queue ``(name, url)`` pairs for opening and return how many were queued."""
+        if not targets:
+            return 0
+        if not self.running:
+            self.results = []
+            self.run_started = time.monotonic()
+            self.watchdog.start()
+        for name, url in targets:
+            result = LaunchResult(name, url)
+            self.results.append(result)
+            self.queue.append(result)
+        self.progress.emit(self.done_count(), len(self.results))
+        self.start_next()
+        return len(targets)
+
+    def cancel(self) -> None:
+        """Drop the connections that have not been started yet."""
+        while self.queue:
+            self.queue.popleft().error = "cancelled"
+        self.finish_if_done()
+
+    def done_count(self) -> int:
+        return sum(1 for r in self.results if r.connected_ms is not None or r.error)
+
+    @pyqtSlot()
+    def start_next(self) -> None:
+        options = config_snapshot().section("launcher")
+        limit = max(1, int(options["max_concurrent"]))
+        while self.queue and len(self.connecting) < limit:
+            wait_s = self.last_start + options["ramp_up_ms"] / 1000.0 - time.monotonic()
+            if wait_s > 0:
+                self.timer.start(int(wait_s * 1000) + 1)
+                return
+            result = self.queue.popleft()
+            window = self.main_window
+            tab = window.spares.take(result.url)
+            # Measured as time to connected instead of new-tab latency
+            tab.open_started = None
+            result.tab = tab
+            result.started = self.last_start = time.monotonic()
+            self.connecting[tab] = result
+            tab.bridge.stats_changed.connect(self.on_stats)
+            window.add_browser_tab(tab, result.name, background=True)
+            if window.lifecycle.current is not tab:
+                # Never shown, so the lifecycle manager may freeze it like any hidden tab
+                tab.hidden_since = time.monotonic()
+
+    @pyqtSlot(object)
+    def on_stats(self, tab: "BrowserTab") -> None:
+        result = self.connecting.get(tab)
+        if result is not None and tab.bridge.stats.connected:
+            result.connected_ms = (time.monotonic() - result.started) * 1000.0
+            self.release(tab)
+
+    @pyqtSlot()
+    def check_timeouts(self) -> None:
+        timeout = config_snapshot().section("launcher")["connect_timeout_seconds"]
+        now = time.monotonic()
+        registry = self.main_window.tabs.registry
+        for tab, result in list(self.connecting.items()):
+            if registry.index_of(tab) < 0:
+                result.error = "tab closed"
+                self.release(tab)
+            elif timeout > 0 and now - result.started > timeout:
+                result.error = f"not connected after {timeout:.0f} s"
+                self.release(tab)
+
+    def release(self, tab: "BrowserTab") -> None:
+        self.connecting.pop(tab, None)
+        try:
+            tab.bridge.stats_changed.disconnect(self.on_stats)
+        except (TypeError, RuntimeError):
+            pass
+        self.progress.emit(self.done_count(), len(self.results))
+        self.start_next()
+        self.finish_if_done()
+
+    def finish_if_done(self) -> None:
+        if self.running or not self.results:
+            return
+        self.watchdog.stop()
+        self.timer.stop()
+        self.finished.emit(list(self.results))
+
+    def summary(self) -> dict:
+        return summarize_launch(self.results, time.monotonic() - self.run_started)
@@ -0,0 +1,213 @@
+"""
+guacagui_metrics.py
+
+Metrics of the Guacagui browser: the process-wide counters in
+:data:`metrics` and :class:`MetricsServer`, which serves them on
+localhost in the Prometheus text format.
+
+"""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import TYPE_CHECKING
+
+from PyQt5.QtCore import Qt, QObject, QTimer, pyqtSlot
+from PyQt5.QtGui import QGuiApplication
+
+from guacagui_config import ConfigSnapshot
+
+if TYPE_CHECKING:
+    from guacagui_clipboard import BrowserMainWindow
+
+
+class Histogram:
+    """Observation counts per upper bound, as a Prometheus histogram exposes them."""
+
+    __slots__ = ("bounds", "buckets", "total", "count")
+
+    def __init__(self, bounds: tuple) -> None:
+        self.bounds = bounds
+        self.buckets = [0] * len(bounds)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.total += value
+        self.count += 1
+        for i, bound in enumerate(self.bounds):
+            if value <= bound:
+                self.buckets[i] += 1
+
+    def exposition(self, name: str) -> list:
+        lines = [f'{name}_bucket{{le="{bound:g}"}} {count}' for bound, count in zip(self.bounds, self.buckets)]
+        lines.append(f'{name}_bucket{{le="+Inf"}} {self.count}')
+        lines.append(f"{name}_sum {self.total:.6f}")
+        lines.append(f"{name}_count {self.count}")
+        return lines
+
+
+class AppMetrics:
+    """Process-wide counters for the metrics endpoint.
+
+    Only the GUI thread touches them, from the slots that see the events
+    (page loads, renderer exits, macro clicks, clipboard changes).
+    :class:`MetricsServer` renders them to text on the GUI thread, and
+    its HTTP thread only ever reads that finished text, so none of this
+    needs a lock.
+    """
+
+    LOAD_BUCKETS = (0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 16.0, 32.0)
+    LAG_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+    def __init__(self) -> None:
+        self.page_loads = Histogram(self.LOAD_BUCKETS)
+        self.page_load_failures = 0
+        self.renderer_crashes = 0
+        self.macro_sends = 0
+        self.clipboard_events = 0
+        self.loop_lag = Histogram(self.LAG_BUCKETS)
+        # Largest lag since the last rendering
+        self.loop_lag_max = 0.0
+
+
+metrics = AppMetrics()
+
+
+class MetricsRequestHandler(BaseHTTPRequestHandler):
+    """Answers ``GET /metrics`` with the text last published by :class:`MetricsServer`."""
+
+    def do_GET(self) -> None:
+        if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = self.server.text.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args) -> None:  # noqa: A002
+        pass
+
+
+class MetricsServer(QObject):
+    """Serve :data:`metrics` and per-tab figures in the Prometheus text format.
+
+    With ``"metrics": {"enabled": true}`` an HTTP server on
+    ``127.0.0.1:<port>`` answers ``/metrics`` from its own thread.  It
+    never touches Qt objects or the counters: the GUI thread renders the
+    text every ``metrics.update_seconds`` and swaps it in as one string.
+    A precise timer on the GUI thread measures event-loop lag, how much
+    later than due it fires.
+    """
+
+    LAG_INTERVAL_MS = 250
+
+    def __init__(self, window: "BrowserMainWindow") -> None:
+        super().__init__(window)
+        self.main_window = window
+        self.httpd: ThreadingHTTPServer | None = None
+        self.publish_timer = QTimer(self)
+        self.publish_timer.timeout.connect(self.publish)
+        self.lag_timer = QTimer(self)
+        self.lag_timer.setTimerType(Qt.PreciseTimer)
+        self.lag_timer.setInterval(self.LAG_INTERVAL_MS)
+        self.lag_timer.timeout.connect(self.measure_lag)
+        self.lag_due = 0.0
+        QGuiApplication.clipboard().dataChanged.connect(self.on_clipboard_changed)
+
+    @property
+    def port(self) -> int:
+        return self.httpd.server_address[1] if self.httpd is not None else 0
+
+    def listen(self, port: int) -> None:
+        """Start serving on *port*; raises OSError if it cannot be bound."""
+        self.close()
+        httpd = ThreadingHTTPServer(("127.0.0.1", port), MetricsRequestHandler)
+        httpd.daemon_threads = True
+        httpd.text = ""
+        self.httpd = httpd
+        self.publish()
+        # A short poll interval keeps close() from holding up the GUI thread
+        threading.Thread(target=httpd.serve_forever, args=(0.1,), name="guacagui-metrics", daemon=True).start()
+        self.lag_due = time.monotonic() + self.LAG_INTERVAL_MS / 1000.0
+        self.lag_timer.start()
+
+    def close(self) -> None:
+        self.publish_timer.stop()
+        self.lag_timer.stop()
+        if self.httpd is not None:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
+
+    def apply_config(self, config: ConfigSnapshot) -> None:
+        if self.httpd is not None:
+            seconds = config.section("metrics")["update_seconds"]
+            self.publish_timer.start(max(1000, int(seconds * 1000)))
+
+    @pyqtSlot()
+    def measure_lag(self) -> None:
+        now = time.monotonic()
+        lag = max(0.0, now - self.lag_due)
+        metrics.loop_lag.observe(lag)
+        metrics.loop_lag_max = max(metrics.loop_lag_max, lag)
+        self.lag_due = now + self.LAG_INTERVAL_MS / 1000.0
+
+    @pyqtSlot()
+    def on_clipboard_changed(self) -> None:
+        metrics.clipboard_events += 1
+
+    @pyqtSlot()
+    def publish(self) -> None:
+        if self.httpd is not None:
+            self.httpd.text = self.render()
+
+    def render(self) -> str:
+        """Return the current metrics in the Prometheus text exposition format."""
+        window = self.main_window
+        lines = []
+
+        def family(name: str, kind: str, text: str, samples) -> None:
+            lines.append(f"# HELP {name} {text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(samples)
+
+        tabs = window.lifecycle.browsers()
+        samples = window.resources.samples
+        family("guacagui_tabs", "gauge", "Open browser tabs.", [f"guacagui_tabs {len(tabs)}"])
+        rss, cpu = [], []
+        for tab in tabs:
+            sample = samples.get(tab)
+            if sample is None:
+                continue
+            labels = f'{{tab="{tab.tab_id}",pid="{sample.pid}"}}'
+            rss.append(f"guacagui_renderer_resident_bytes{labels} {sample.rss}")
+            cpu.append(f"guacagui_renderer_cpu_percent{labels} {sample.cpu_percent:.1f}")
+        family("guacagui_renderer_resident_bytes", "gauge", "Resident memory of each tab's renderer process.", rss)
+        family("guacagui_renderer_cpu_percent", "gauge", "CPU use of each tab's renderer process.", cpu)
+        family(
+            "guacagui_page_load_duration_seconds", "histogram", "Time from load start to load finished.",
+            metrics.page_loads.exposition("guacagui_page_load_duration_seconds"),
+        )
+        counters = (
+            ("guacagui_page_load_failures_total", "Page loads that finished with an error.", metrics.page_load_failures),
+            ("guacagui_renderer_crashes_total", "Renderer processes that crashed or were killed.",
+             metrics.renderer_crashes),
+            ("guacagui_macro_sends_total", "Macros copied or typed.", metrics.macro_sends),
+            ("guacagui_clipboard_events_total", "Changes of the system clipboard.", metrics.clipboard_events),
+        )
+        for name, text, value in counters:
+            family(name, "counter", text, [f"{name} {value}"])
+        family(
+            "guacagui_event_loop_lag_seconds", "histogram", "How late GUI event loop timers fire.",
+            metrics.loop_lag.exposition("guacagui_event_loop_lag_seconds"),
+        )
+        family(
+            "guacagui_event_loop_lag_max_seconds", "gauge", "Largest event loop lag since the previous update.",
+            [f"guacagui_event_loop_lag_max_seconds {metrics.loop_lag_max:.6f}"],
+        )
+        metrics.loop_lag_max = 0.0
+        return "\n".join(lines) + "\n"
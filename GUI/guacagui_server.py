@@ -0,0 +1,410 @@
+"""
+guacagui_server.py
+
+Local socket servers of the Guacagui browser: :class:`InstanceServer`
+lets later ``guacagui`` invocations hand their targets to the running
+window instead of starting a second one, and :class:`ControlServer`
+answers JSON-RPC requests of scripts on the control socket.
+
+"""
+
+import base64
+import hashlib
+import json
+import os
+import weakref
+from functools import partial
+from typing import TYPE_CHECKING
+
+from PyQt5.QtCore import QBuffer, QByteArray, QIODevice, QObject, pyqtSignal, pyqtSlot
+from PyQt5.QtNetwork import QLocalServer, QLocalSocket
+from PyQt5.QtWebEngineWidgets import QWebEnginePage
+
+from guacagui_config import ConfigSnapshot, cache_dir, config_path, config_snapshot, resolve_target
+from guacagui_launcher import saved_lists
+from guacagui_metrics import metrics
+
+if TYPE_CHECKING:
+    from guacagui_clipboard import BrowserMainWindow, BrowserTab
+
+
+def instance_name() -> str:
+    """Return the local socket name of the instance for this user and config file."""
+    key = f"{os.getuid() if hasattr(os, 'getuid') else os.getlogin()}:{config_path()}"
+    return "guacagui-" + hashlib.sha1(key.encode("utf-8")).hexdigest()[:12]
+
+
+def local_socket_stale(name: str, timeout_ms: int = 1000) -> bool:
+    """Return True if the local socket *name* exists but nothing listens on it.
+
+    Only then may a server remove it: a socket whose owner is merely slow
+    to answer still belongs to a running instance.
+    """
+    socket = QLocalSocket()
+    socket.connectToServer(name)
+    if socket.waitForConnected(timeout_ms):
+        socket.abort()
+        return False
+    return socket.error() in (QLocalSocket.ServerNotFoundError, QLocalSocket.ConnectionRefusedError)
+
+
+def hand_off(targets: list, timeout_ms: int = 1000) -> bool:
+    """Pass *targets* to a running instance; return False if there is none.
+
+    Used before QApplication is created, so it only relies on the
+    blocking QLocalSocket calls.
+    """
+    socket = QLocalSocket()
+    socket.connectToServer(instance_name())
+    if not socket.waitForConnected(timeout_ms):
+        return False
+    socket.write((json.dumps({"open": targets}) + "\n").encode("utf-8"))
+    ok = (
+        socket.waitForBytesWritten(timeout_ms)
+        and socket.waitForReadyRead(timeout_ms)
+        and bytes(socket.readLine()).strip() == b"ok"
+    )
+    socket.disconnectFromServer()
+    return ok
+
+
+class InstanceServer(QObject):
+    """Accept URLs and connection identifiers from later ``guacagui`` invocations.
+
+    Listens on :func:`instance_name` with a QLocalServer that only the
+    current user can connect to.  Each request is one JSON line,
+    ``{"open": [target, ...]}``, answered with ``ok``; the targets are
+    emitted with ``open_requested``.  An empty list just raises the
+    window.
+    """
+
+    open_requested = pyqtSignal(list)
+
+    def __init__(self, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self.server = QLocalServer(self)
+        self.server.setSocketOptions(QLocalServer.UserAccessOption)
+        self.server.newConnection.connect(self.accept)
+
+    def listen(self) -> bool:
+        name = instance_name()
+        # Never take over the socket of a running instance (listen() with
+        # socket options renames over it), only one left behind by a crash
+        if not local_socket_stale(name):
+            return False
+        QLocalServer.removeServer(name)
+        return self.server.listen(name)
+
+    @pyqtSlot()
+    def accept(self) -> None:
+        while self.server.hasPendingConnections():
+            socket = self.server.nextPendingConnection()
+            socket.readyRead.connect(partial(self.read, socket))
+            socket.disconnected.connect(socket.deleteLater)
+
+    def read(self, socket: QLocalSocket) -> None:
+        while socket.canReadLine():
+            try:
+                message = json.loads(bytes(socket.readLine()).decode("utf-8"))
+                targets = message["open"]
+                if not isinstance(targets, list) or not all(isinstance(t, str) for t in targets):
+                    raise ValueError("open takes a list of strings")
+            except (ValueError, KeyError, TypeError):
+                socket.write(b"error\n")
+                continue
+            # Answer before opening the tabs so that the caller can exit
+            socket.write(b"ok\n")
+            socket.flush()
+            self.open_requested.emit(targets)
+
+
+class RpcError(Exception):
+    """A JSON-RPC error to be returned to the caller of a ControlServer method."""
+
+    INVALID_PARAMS = -32602
+    APPLICATION = -32000
+
+    def __init__(self, message: str, code: int = APPLICATION) -> None:
+        super().__init__(message)
+        self.code = code
+
+
+def control_socket_path(config: ConfigSnapshot | None = None) -> str:
+    """Return the path of the control socket: ``control.socket_path`` or a per-user default."""
+    config = config or config_snapshot()
+    path = config.section("control")["socket_path"]
+    if path:
+        return os.path.expanduser(path)
+    runtime = os.environ.get("XDG_RUNTIME_DIR") or cache_dir()
+    return os.path.join(runtime, "guacagui-control.sock")
+
+
+class ControlServer(QObject):
+    """JSON-RPC 2.0 over a local Unix socket for scripting the browser.
+
+    Each line a client writes is one request object; each response is
+    written back as one line.  Requests are handled on the event loop
+    without blocking it: most answer at once, ``send_text`` and
+    ``send_macro`` answer when the text has been typed.  Tabs are
+    addressed by the ``id`` that :meth:`list` reports, which stays the
+    same while tabs are opened, closed and moved.
+
+    Methods: ``open``, ``list``, ``activate``, ``close``, ``send_text``,
+    ``send_macro``, ``freeze``, ``thaw``, ``screenshot`` and ``launch``.
+    """
+
+    METHODS = (
+        "open", "list", "activate", "close", "send_text", "send_macro", "freeze", "thaw", "screenshot", "launch",
+    )
+
+    def __init__(self, window: "BrowserMainWindow") -> None:
+        super().__init__(window)
+        self.main_window = window
+        self.server = QLocalServer(self)
+        self.server.setSocketOptions(QLocalServer.UserAccessOption)
+        self.server.newConnection.connect(self.accept)
+        self.path = ""
+        # Replies waiting for a tab's KeyTyper to finish, by tab id
+        self.typing: dict = {}
+        # Replies waiting for the GroupLauncher to empty its queue
+        self.launching: list = []
+        window.launcher.finished.connect(self.on_launch_finished)
+        self.watched = weakref.WeakSet()
+
+    def listen(self, path: str) -> bool:
+        self.close()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Leave a socket that another instance still serves alone
+        if not local_socket_stale(path):
+            return False
+        QLocalServer.removeServer(path)
+        if not self.server.listen(path):
+            return False
+        self.path = path
+        return True
+
+    def close(self) -> None:
+        if self.server.isListening():
+            self.server.close()
+        self.path = ""
+
+    @pyqtSlot()
+    def accept(self) -> None:
+        while self.server.hasPendingConnections():
+            socket = self.server.nextPendingConnection()
+            socket.readyRead.connect(partial(self.read, socket))
+            socket.disconnected.connect(socket.deleteLater)
+
+    def read(self, socket: QLocalSocket) -> None:
+        while socket.canReadLine():
+            line = bytes(socket.readLine()).strip()
+            if line:
+                self.handle(socket, line)
+
+    def handle(self, socket: QLocalSocket, line: bytes) -> None:
+        try:
+            request = json.loads(line.decode("utf-8"))
+        except ValueError:
+            self.send(socket, None, error=(-32700, "Parse error"))
+            return
+        if not isinstance(request, dict) or not isinstance(request.get("method"), str):
+            self.send(socket, None, error=(-32600, "Invalid Request"))
+            return
+        request_id = request.get("id")
+        method = request["method"]
+        params = request.get("params", {})
+        if method not in self.METHODS:
+            self.send(socket, request_id, error=(-32601, f"Method not found: {method}"))
+            return
+        if not isinstance(params, dict):
+            self.send(socket, request_id, error=(RpcError.INVALID_PARAMS, "params must be an object"))
+            return
+
+        def reply(result=None, error: RpcError | None = None) -> None:
+            if error is not None:
+                self.send(socket, request_id, error=(error.code, str(error)))
+            else:
+                self.send(socket, request_id, result=result)
+
+        try:
+            getattr(self, "rpc_" + method)(params, reply)
+        except RpcError as e:
+            reply(error=e)
+        except (KeyError, TypeError, ValueError) as e:
+            reply(error=RpcError(f"Invalid params: {e}", RpcError.INVALID_PARAMS))
+
+    def send(self, socket: QLocalSocket, request_id, result=None, error: tuple | None = None) -> None:
+        # Notifications (requests without an id) get no response
+        if request_id is None and error is None:
+            return
+        response = {"jsonrpc": "2.0", "id": request_id}
+        if error is not None:
+            response["error"] = {"code": error[0], "message": error[1]}
+        else:
+            response["result"] = result
+        try:
+            if socket.state() == QLocalSocket.ConnectedState:
+                socket.write((json.dumps(response) + "\n").encode("utf-8"))
+        except RuntimeError:
+            # The client went away and the socket has been deleted
+            pass
+
+    # -- helpers ------------------------------------------------------
+
+    def tab(self, params: dict) -> "BrowserTab":
+        tab_id = params.get("id")
+        for tab in self.main_window.lifecycle.browsers():
+            if tab.tab_id == tab_id:
+                return tab
+        raise RpcError(f"No tab with id {tab_id!r}", RpcError.INVALID_PARAMS)
+
+    def describe(self, tab: "BrowserTab") -> dict:
+        window = self.main_window
+        index = window.tabs.registry.index_of(tab)
+        sample = window.resources.samples.get(tab)
+        state = window.lifecycle.state(tab)
+        if state is None or state == QWebEnginePage.LifecycleState.Active:
+            state_name = "active"
+        elif state == QWebEnginePage.LifecycleState.Frozen:
+            state_name = "frozen"
+        else:
+            state_name = "discarded"
+        info = {
+            "id": tab.tab_id,
+            "index": index,
+            "title": window.tabs.tabText(index),
+            "url": tab.url().toString(),
+            "current": tab is window.current_browser(),
+            "state": state_name,
+            "connected": tab.bridge.stats.connected,
+            "pid": sample.pid if sample else None,
+            "cpu_percent": round(sample.cpu_percent, 1) if sample else None,
+            "rss_mb": round(sample.rss / (1024 * 1024), 1) if sample else None,
+        }
+        info.update(tab.bridge.traffic.as_dict())
+        return info
+
+    def type_into(self, tab: "BrowserTab", text: str, reply) -> None:
+        if not isinstance(text, str):
+            raise RpcError("text must be a string", RpcError.INVALID_PARAMS)
+        self.main_window.lifecycle.thaw(tab)
+        if tab.typer not in self.watched:
+            tab.typer.finished.connect(self.on_typing_finished)
+            tab.destroyed.connect(partial(self.on_tab_destroyed, tab.tab_id))
+            self.watched.add(tab.typer)
+        if not tab.typer.type_text(text):
+            reply({"keys": 0})
+            return
+        self.typing.setdefault(tab.tab_id, []).append(reply)
+
+    @pyqtSlot(object, int, bool)
+    def on_typing_finished(self, tab: "BrowserTab", keys: int, ok: bool) -> None:
+        for reply in self.typing.pop(tab.tab_id, ()):
+            if ok:
+                reply({"keys": keys})
+            else:
+                reply(error=RpcError(f"Typing stopped after {keys} key(s); is the session connected?"))
+
+    def on_tab_destroyed(self, tab_id: int) -> None:
+        # A tab closed while typing never finishes; answer its callers now
+        for reply in self.typing.pop(tab_id, ()):
+            reply(error=RpcError(f"Tab {tab_id} was closed while typing"))
+
+    @pyqtSlot(list)
+    def on_launch_finished(self, results: list) -> None:
+        summary = self.main_window.launcher.summary()
+        summary["tabs"] = [
+            {"name": r.name, "url": r.url, "connected_ms": r.connected_ms and round(r.connected_ms), "error": r.error}
+            for r in results
+        ]
+        replies, self.launching = self.launching, []
+        for reply in replies:
+            reply(summary)
+
+    # -- methods ------------------------------------------------------
+
+    def rpc_open(self, params: dict, reply) -> None:
+        target = params.get("url") or params.get("connection")
+        if target is not None and not isinstance(target, str):
+            raise RpcError("url must be a string", RpcError.INVALID_PARAMS)
+        window = self.main_window
+        tab = window.spares.take(resolve_target(str(target)) if target else None)
+        window.add_browser_tab(tab, "New Tab", background=bool(params.get("background")))
+        reply(self.describe(tab))
+
+    def rpc_list(self, params: dict, reply) -> None:
+        reply([self.describe(tab) for tab in self.main_window.lifecycle.browsers()])
+
+    def rpc_activate(self, params: dict, reply) -> None:
+        tab = self.tab(params)
+        self.main_window.tabs.setCurrentWidget(tab)
+        reply(self.describe(tab))
+
+    def rpc_close(self, params: dict, reply) -> None:
+        window = self.main_window
+        index = window.tabs.registry.index_of(self.tab(params))
+        if window.tabs.count() < 2:
+            raise RpcError("The last tab cannot be closed")
+        window.close_current_tab(index)
+        reply(True)
+
+    def rpc_send_text(self, params: dict, reply) -> None:
+        self.type_into(self.tab(params), params["text"], reply)
+
+    def rpc_send_macro(self, params: dict, reply) -> None:
+        tab = self.tab(params)
+        macros = config_snapshot().macros
+        name = params.get("name")
+        if name is not None:
+            texts = [text for macro_name, text in macros if macro_name == name]
+            if not texts:
+                raise RpcError(f"No macro named {name!r}", RpcError.INVALID_PARAMS)
+            text = texts[0]
+        else:
+            index = int(params["index"])
+            if not 0 <= index < len(macros):
+                raise RpcError(f"No macro at index {index}", RpcError.INVALID_PARAMS)
+            text = macros[index][1]
+        metrics.macro_sends += 1
+        self.type_into(tab, text, reply)
+
+    def rpc_freeze(self, params: dict, reply) -> None:
+        tab = self.tab(params)
+        reply(self.main_window.lifecycle.freeze(tab))
+
+    def rpc_thaw(self, params: dict, reply) -> None:
+        tab = self.tab(params)
+        self.main_window.lifecycle.thaw(tab)
+        reply(True)
+
+    def rpc_screenshot(self, params: dict, reply) -> None:
+        tab = self.tab(params)
+        if tab.isVisible():
+            tab.capture_screenshot()
+        if tab.screenshot is None:
+            raise RpcError("The tab has not been on screen yet")
+        path = params.get("path")
+        if path:
+            if not tab.screenshot.save(os.path.expanduser(path), "PNG"):
+                raise RpcError(f"Could not write {path}")
+            reply({"path": path, "current": tab.isVisible()})
+            return
+        data = QByteArray()
+        buffer = QBuffer(data)
+        buffer.open(QIODevice.WriteOnly)
+        tab.screenshot.save(buffer, "PNG")
+        reply({"png": base64.b64encode(bytes(data)).decode("ascii"), "current": tab.isVisible()})
+
+    def rpc_launch(self, params: dict, reply) -> None:
+        if "list" in params:
+            lists = saved_lists()
+            if params["list"] not in lists:
+                raise RpcError(f"No saved list named {params['list']!r}", RpcError.INVALID_PARAMS)
+            targets = lists[params["list"]]
+        else:
+            targets = params["targets"]
+            if not isinstance(targets, list) or not all(isinstance(t, str) for t in targets):
+                raise RpcError("targets must be a list of strings", RpcError.INVALID_PARAMS)
+        if not self.main_window.launch_connections([(t, resolve_target(t)) for t in targets]):
+            raise RpcError("Nothing to open", RpcError.INVALID_PARAMS)
+        self.launching.append(reply)
@@ -0,0 +1,663 @@
+#!/usr/bin/env python3
+"""
+guacamole_standin.py
+
+A small asyncio stand-in for the Apache Guacamole web application, for
+testing Guacagui and other tooling without the `guacweb`/`guacd`/MySQL
+stack from `docker-compose.yml`.  It has no dependencies beyond the
+Python standard library and serves:
+
+- ``<prefix>/``: a minimal login page and client.  After logging in it
+  lists the connections and, for ``#/client/<id>``, opens the tunnel and
+  draws the received images on a canvas like the real client does.  The
+  client script is ``<prefix>/app.js?b=<build>``, versioned by the build
+  like the real web client's static files.
+- ``<prefix>/api/tokens``: token creation (any user name and password
+  are accepted unless ``--password`` is given), renewal and deletion.
+- ``<prefix>/api/session/data/<source>/connectionGroups/ROOT/tree`` and
+  ``.../connections``: a synthetic connection tree shaped like the
+  ``guacamole_connection_group``/``guacamole_connection`` tables.
+- ``<prefix>/api/patches`` and ``<prefix>/api/languages``.
+- ``<prefix>/websocket-tunnel``: a WebSocket tunnel (subprotocol
+  ``guacamole``) that streams synthetic Guacamole protocol instructions
+  (``png``, ``copy``, ``sync`` and periodic ``clipboard`` streams) at a
+  configurable frame rate and image payload size.  Client ``sync``
+  replies are used to measure per-tunnel frame acknowledgement latency
+  and the internal ``ping`` is echoed like guacamole-common does.
+
+Usage:
+
+    python3 guacamole_standin.py --port 8080 --rate 30 --payload 16384
+
+Then point `home_url` in `config.json` at ``http://localhost:8080/guacamole/``.
+
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import random
+import struct
+import sys
+import time
+import uuid
+import zlib
+from urllib.parse import parse_qs, unquote, urlsplit
+
+# Fixed GUID from RFC 6455 used to compute Sec-WebSocket-Accept.
+WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+REASONS = {
+    200: "OK",
+    204: "No Content",
+    304: "Not Modified",
+    400: "Bad Request",
+    403: "Forbidden",
+    404: "Not Found",
+    405: "Method Not Allowed",
+}
+
+
+# --------------------------------------------------------------------------
+# Guacamole protocol helpers
+# --------------------------------------------------------------------------
+
+
+def encode_instruction(opcode: str, *args) -> str:
+    """Encode one Guacamole instruction, e.g. ``4.sync,13.1700000000000;``."""
+    elements = [opcode] + [str(arg) for arg in args]
+    return ",".join(f"{len(element)}.{element}" for element in elements) + ";"
+
+
+def parse_instructions(buffer: str) -> tuple:
+    """Split *buffer* into complete instructions; return ``(instructions, rest)``.
+
+    Each instruction is a list of its elements, the opcode first.
+    """
+    instructions = []
+    position = 0
+    while True:
+        elements = []
+        cursor = position
+        complete = False
+        while True:
+            dot = buffer.find(".", cursor)
+            if dot == -1:
+                break
+            try:
+                length = int(buffer[cursor:dot])
+            except ValueError:
+                return instructions, ""
+            end = dot + 1 + length
+            if end >= len(buffer):
+                break
+            elements.append(buffer[dot + 1:end])
+            terminator = buffer[end]
+            cursor = end + 1
+            if terminator == ";":
+                complete = True
+                break
+        if not complete:
+            return instructions, buffer[position:]
+        instructions.append(elements)
+        position = cursor
+
+
+def make_png(payload: int) -> str:
+    """Return a base64 PNG of random pixels whose size is roughly *payload* bytes."""
+    width = 64
+    height = max(1, payload // (width * 3))
+    raw = bytearray()
+    for _ in range(height):
+        raw.append(0)
+        raw.extend(random.getrandbits(8) for _ in range(width * 3))
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        body = kind + data
+        return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body) & 0xFFFFFFFF)
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    png = (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", header)
+        + chunk(b"IDAT", zlib.compress(bytes(raw), 0))
+        + chunk(b"IEND", b"")
+    )
+    return base64.b64encode(png).decode("ascii")
+
+
+# --------------------------------------------------------------------------
+# Synthetic directory
+# --------------------------------------------------------------------------
+
+
+def build_directory(connections: int, group_size: int, protocols: list) -> dict:
+    """Return ``{"tree": ..., "connections": ...}`` for the REST endpoints."""
+    groups = []
+    flat = {}
+    root_children = []
+    for index in range(connections):
+        identifier = str(index + 1)
+        group_index = index // group_size if group_size > 0 else None
+        parent = "ROOT" if group_index is None else str(group_index + 1)
+        protocol = protocols[index % len(protocols)]
+        connection = {
+            "name": f"server-{index + 1:03d} ({protocol})",
+            "identifier": identifier,
+            "parentIdentifier": parent,
+            "protocol": protocol,
+            "activeConnections": 0,
+            "attributes": {"max-connections": None, "max-connections-per-user": None},
+        }
+        flat[identifier] = connection
+        if group_index is None:
+            root_children.append(connection)
+            continue
+        while len(groups) <= group_index:
+            groups.append({
+                "name": f"cluster-{len(groups) + 1:02d}",
+                "identifier": str(len(groups) + 1),
+                "parentIdentifier": "ROOT",
+                "type": "ORGANIZATIONAL",
+                "activeConnections": 0,
+                "childConnections": [],
+                "attributes": {},
+            })
+        groups[group_index]["childConnections"].append(connection)
+    tree = {
+        "name": "ROOT",
+        "identifier": "ROOT",
+        "type": "ORGANIZATIONAL",
+        "activeConnections": 0,
+        "childConnectionGroups": groups,
+        "childConnections": root_children,
+        "attributes": {},
+    }
+    return {"tree": tree, "connections": flat}
+
+
+# --------------------------------------------------------------------------
+# Login page and minimal client
+# --------------------------------------------------------------------------
+
+PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Guacamole</title>
+<style>
+body { font-family: sans-serif; margin: 0; }
+#login, #list { padding: 2em; }
+#display { display: block; background: #000; }
+#status { position: fixed; bottom: 0; right: 0; background: #eee; padding: 2px 6px; font-size: 12px; }
+</style></head>
+<body>
+<form id="login"><input name="username" placeholder="Username">
+<input name="password" type="password" placeholder="Password"><button>Login</button></form>
+<div id="list" hidden></div>
+<canvas id="display" width="1024" height="768" hidden></canvas>
+<div id="status"></div>
+<script src="app.js?b=%(build)s"></script></body></html>
+"""
+
+# The client script, served like the real web client's app.js with the
+# build in its query string.
+APP_JS = """(function () {
+    var AUTH_KEY = 'GUAC_AUTH';
+    var auth = JSON.parse(localStorage.getItem(AUTH_KEY) || 'null');
+    var tunnel = null;
+    var statusBox = document.getElementById('status');
+
+    function api(method, path, body) {
+        var headers = {};
+        if (auth) headers['Guacamole-Token'] = auth.authToken;
+        if (body) headers['Content-Type'] = 'application/x-www-form-urlencoded';
+        return fetch('api/' + path, { method: method, headers: headers, body: body })
+            .then(function (r) { if (!r.ok) throw r; return r.json(); });
+    }
+
+    function showList() {
+        document.getElementById('login').hidden = true;
+        api('GET', 'session/data/' + auth.dataSource + '/connectionGroups/ROOT/tree').then(function (tree) {
+            var list = document.getElementById('list');
+            list.innerHTML = '';
+            (function walk(group, depth) {
+                (group.childConnections || []).forEach(function (c) {
+                    var id = btoa(c.identifier + '\\0c\\0' + auth.dataSource);
+                    var a = document.createElement('a');
+                    a.href = '#/client/' + id;
+                    a.textContent = c.name;
+                    a.style.display = 'block';
+                    a.style.marginLeft = depth + 'em';
+                    list.appendChild(a);
+                });
+                (group.childConnectionGroups || []).forEach(function (g) {
+                    var h = document.createElement('div');
+                    h.textContent = g.name;
+                    h.style.marginLeft = depth + 'em';
+                    list.appendChild(h);
+                    walk(g, depth + 1);
+                });
+            })(tree, 0);
+            list.hidden = false;
+        }).catch(function () { localStorage.removeItem(AUTH_KEY); auth = null; location.reload(); });
+    }
+
+    function parse(buffer, handler) {
+        var pos = 0;
+        for (;;) {
+            var elements = [], cursor = pos, done = false;
+            for (;;) {
+                var dot = buffer.indexOf('.', cursor);
+                if (dot === -1) break;
+                var length = parseInt(buffer.substring(cursor, dot), 10);
+                var end = dot + 1 + length;
+                if (end >= buffer.length) break;
+                elements.push(buffer.substring(dot + 1, end));
+                cursor = end + 1;
+                if (buffer.charAt(end) === ';') { done = true; break; }
+            }
+            if (!done) return buffer.substring(pos);
+            handler(elements);
+            pos = cursor;
+        }
+    }
+
+    function encode(elements) {
+        return elements.map(function (e) { e = String(e); return e.length + '.' + e; }).join(',') + ';';
+    }
+
+    function connect(id) {
+        var parts = atob(id).split('\\0');
+        document.getElementById('list').hidden = true;
+        var canvas = document.getElementById('display');
+        canvas.hidden = false;
+        var ctx = canvas.getContext('2d');
+        var query = 'token=' + encodeURIComponent(auth.authToken) + '&GUAC_DATA_SOURCE=' + parts[2]
+            + '&GUAC_ID=' + parts[0] + '&GUAC_TYPE=' + parts[1]
+            + '&GUAC_WIDTH=' + canvas.width + '&GUAC_HEIGHT=' + canvas.height;
+        var url = location.href.replace(/^http/, 'ws').replace(/[#?].*$/, '').replace(/[^\\/]*$/, '')
+            + 'websocket-tunnel?' + query;
+        var socket = new WebSocket(url, 'guacamole');
+        var rest = '', frames = 0, lastFrames = 0;
+        tunnel = socket;
+        socket.onmessage = function (event) {
+            rest = parse(rest + event.data, function (ins) {
+                if (ins[0] === 'png') {
+                    var img = new Image();
+                    img.onload = function () { ctx.drawImage(img, +ins[3], +ins[4]); };
+                    img.src = 'data:image/png;base64,' + ins[5];
+                } else if (ins[0] === 'copy') {
+                    ctx.drawImage(canvas, +ins[2], +ins[3], +ins[4], +ins[5], +ins[8], +ins[9], +ins[4], +ins[5]);
+                } else if (ins[0] === 'sync') {
+                    frames++;
+                    socket.send(encode(['sync', ins[1]]));
+                }
+            });
+        };
+        var ping = setInterval(function () {
+            if (socket.readyState === 1) socket.send(encode(['', 'ping', Date.now()]));
+        }, 500);
+        var stats = setInterval(function () {
+            statusBox.textContent = (frames - lastFrames) + ' fps';
+            lastFrames = frames;
+        }, 1000);
+        socket.onclose = function () { clearInterval(ping); clearInterval(stats); statusBox.textContent = 'disconnected'; };
+    }
+
+    function route() {
+        if (tunnel) { tunnel.close(); tunnel = null; }
+        if (!auth) return;
+        var match = /^#\\/client\\/(.+)$/.exec(location.hash);
+        if (match) connect(match[1]); else showList();
+    }
+
+    document.getElementById('login').onsubmit = function (event) {
+        event.preventDefault();
+        var body = new URLSearchParams(new FormData(event.target)).toString();
+        api('POST', 'tokens', body).then(function (data) {
+            auth = data;
+            localStorage.setItem(AUTH_KEY, JSON.stringify(data));
+            route();
+        }).catch(function () { statusBox.textContent = 'login failed'; });
+    };
+    window.addEventListener('hashchange', route);
+    if (auth) route();
+})();
+"""
+
+
+# --------------------------------------------------------------------------
+# Server
+# --------------------------------------------------------------------------
+
+
+class TunnelStats:
+    """Counters for one WebSocket tunnel."""
+
+    __slots__ = ("frames", "bytes_sent", "acks", "ack_latency_total", "pending", "last_sync")
+
+    def __init__(self) -> None:
+        self.frames = 0
+        self.bytes_sent = 0
+        self.acks = 0
+        self.ack_latency_total = 0.0
+        self.pending: dict = {}
+        # Sync timestamps are unique so replies match their frame
+        self.last_sync = 0
+
+
+class StandInServer:
+    """HTTP, REST and WebSocket tunnel handling for the stand-in."""
+
+    def __init__(self, options: argparse.Namespace) -> None:
+        self.options = options
+        self.prefix = "/" + options.prefix.strip("/")
+        self.data_source = options.data_source
+        self.tokens: dict = {}
+        directory = build_directory(options.connections, options.group_size, options.protocols.split(","))
+        self.tree = directory["tree"]
+        self.tree_etag = '"' + hashlib.sha1(json.dumps(self.tree).encode("utf-8")).hexdigest() + '"'
+        self.connections = directory["connections"]
+        self.png = make_png(options.payload)
+        self.build = options.build or hashlib.sha1(APP_JS.encode("utf-8")).hexdigest()[:12]
+        self.tunnels: list = []
+
+    # -- HTTP ---------------------------------------------------------------
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve HTTP requests on one connection until it is closed."""
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    return
+                lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, target, _version = lines[0].split(" ", 2)
+                except ValueError:
+                    return
+                headers = {}
+                for line in lines[1:]:
+                    name, _, value = line.partition(":")
+                    if name:
+                        headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", "0") or 0)
+                body = await reader.readexactly(length) if length else b""
+                if headers.get("upgrade", "").lower() == "websocket":
+                    await self.websocket(reader, writer, target, headers)
+                    return
+                await self.route(writer, method, target, headers, body)
+                if headers.get("connection", "").lower() == "close":
+                    return
+        finally:
+            writer.close()
+
+    async def respond(
+        self, writer, status: int, body, content_type: str = "application/json", etag: str = ""
+    ) -> None:
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body)
+        data = body.encode("utf-8") if isinstance(body, str) else body
+        head = (
+            f"HTTP/1.1 {status} {REASONS.get(status, 'OK')}\r\n"
+            f"Content-Type: {content_type}; charset=utf-8\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            "Cache-Control: no-cache\r\n"
+            + (f"ETag: {etag}\r\n" if etag else "")
+            + "\r\n"
+        )
+        writer.write(head.encode("latin-1") + data)
+        await writer.drain()
+
+    def authenticated(self, query: dict, headers: dict) -> bool:
+        token = headers.get("guacamole-token") or query.get("token", [""])[0]
+        expires = self.tokens.get(token)
+        if expires is None or expires < time.monotonic():
+            return False
+        self.tokens[token] = time.monotonic() + self.options.session_timeout
+        return True
+
+    async def route(self, writer, method: str, target: str, headers: dict, body: bytes) -> None:
+        parts = urlsplit(target)
+        path = unquote(parts.path)
+        query = parse_qs(parts.query)
+        if path == self.prefix:
+            path += "/"
+        if not path.startswith(self.prefix + "/"):
+            await self.respond(writer, 404, {"message": "Not found"})
+            return
+        path = path[len(self.prefix):]
+        denied = {"message": "Permission Denied.", "type": "PERMISSION_DENIED"}
+
+        if path in ("/", "/index.html"):
+            await self.respond(writer, 200, PAGE % {"build": self.build}, "text/html")
+        elif path == "/app.js":
+            await self.respond(writer, 200, APP_JS, "application/javascript")
+        elif path == "/api/tokens" and method == "POST":
+            form = parse_qs(body.decode("utf-8"))
+            token = form.get("token", [""])[0]
+            username = form.get("username", ["guacadmin"])[0]
+            if token and token in self.tokens:
+                pass
+            elif self.options.password and form.get("password", [""])[0] != self.options.password:
+                await self.respond(writer, 403, {"message": "Invalid login.", "type": "INVALID_CREDENTIALS"})
+                return
+            else:
+                token = hashlib.sha256(os.urandom(32)).hexdigest().upper()
+            self.tokens[token] = time.monotonic() + self.options.session_timeout
+            await self.respond(writer, 200, {
+                "authToken": token,
+                "username": username,
+                "dataSource": self.data_source,
+                "availableDataSources": [self.data_source],
+            })
+        elif path.startswith("/api/tokens/") and method == "DELETE":
+            self.tokens.pop(path.rsplit("/", 1)[1], None)
+            await self.respond(writer, 204, b"")
+        elif path == "/api/patches":
+            await self.respond(writer, 200, [])
+        elif path == "/api/languages":
+            await self.respond(writer, 200, {"en": "English"})
+        elif path.startswith("/api/session/data/"):
+            if not self.authenticated(query, headers):
+                await self.respond(writer, 403, denied)
+            elif path.endswith("/connectionGroups/ROOT/tree"):
+                # The real API sends no validators; this lets clients test conditional refreshes
+                if headers.get("if-none-match") == self.tree_etag:
+                    await self.respond(writer, 304, b"", etag=self.tree_etag)
+                else:
+                    await self.respond(writer, 200, self.tree, etag=self.tree_etag)
+            elif path.endswith("/connections"):
+                await self.respond(writer, 200, self.connections)
+            else:
+                await self.respond(writer, 404, {"message": "Not found"})
+        else:
+            await self.respond(writer, 404, {"message": "Not found"})
+
+    # -- WebSocket tunnel -----------------------------------------------------
+
+    async def websocket(self, reader, writer, target: str, headers: dict) -> None:
+        parts = urlsplit(target)
+        query = parse_qs(parts.query)
+        if not parts.path.endswith("/websocket-tunnel") or not self.authenticated(query, headers):
+            await self.respond(writer, 403, {"message": "Permission Denied.", "type": "PERMISSION_DENIED"})
+            return
+        key = headers.get("sec-websocket-key", "")
+        accept = base64.b64encode(hashlib.sha1((key + WEBSOCKET_GUID).encode("ascii")).digest()).decode()
+        response = (
+            "HTTP/1.1 101 Switching Protocols\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {accept}\r\n"
+        )
+        if "guacamole" in headers.get("sec-websocket-protocol", ""):
+            response += "Sec-WebSocket-Protocol: guacamole\r\n"
+        writer.write((response + "\r\n").encode("latin-1"))
+        await writer.drain()
+
+        stats = TunnelStats()
+        self.tunnels.append(stats)
+        send_lock = asyncio.Lock()
+
+        async def send(text: str) -> None:
+            async with send_lock:
+                writer.write(ws_frame(1, text.encode("utf-8")))
+                stats.bytes_sent += len(text)
+                await writer.drain()
+
+        width = int(query.get("GUAC_WIDTH", ["1024"])[0] or 1024)
+        height = int(query.get("GUAC_HEIGHT", ["768"])[0] or 768)
+        await send(encode_instruction("", str(uuid.uuid4())))
+        await send(encode_instruction("size", 0, width, height))
+        streamer = asyncio.ensure_future(self.stream(send, stats, width, height))
+        try:
+            await self.receive(reader, writer, send, stats)
+        finally:
+            streamer.cancel()
+            self.tunnels.remove(stats)
+            if stats.acks:
+                print(
+                    f"tunnel closed: {stats.frames} frames, {stats.bytes_sent / 1024:.0f} KiB, "
+                    f"mean ack {stats.ack_latency_total / stats.acks * 1000:.1f} ms",
+                    file=sys.stderr,
+                )
+
+    async def stream(self, send, stats: TunnelStats, width: int, height: int) -> None:
+        """Send synthetic display updates at ``--rate`` frames per second."""
+        interval = 1.0 / max(0.1, self.options.rate)
+        next_clipboard = time.monotonic() + self.options.clipboard_interval
+        stream_index = 0
+        while True:
+            started = time.monotonic()
+            x = random.randrange(0, max(1, width - 64))
+            y = random.randrange(0, max(1, height - 64))
+            frame = [
+                encode_instruction("png", 14, 0, x, y, self.png),
+                encode_instruction("copy", 0, x, y, 64, 64, 14, 0, (x + 64) % width, y),
+            ]
+            if self.options.clipboard_interval > 0 and started >= next_clipboard:
+                stream_index += 1
+                text = base64.b64encode(f"clipboard {time.time():.0f}".encode()).decode()
+                frame += [
+                    encode_instruction("clipboard", stream_index, "text/plain"),
+                    encode_instruction("blob", stream_index, text),
+                    encode_instruction("end", stream_index),
+                ]
+                next_clipboard = started + self.options.clipboard_interval
+            timestamp = max(int(time.time() * 1000), stats.last_sync + 1)
+            stats.last_sync = timestamp
+            stats.pending[str(timestamp)] = started
+            frame.append(encode_instruction("sync", timestamp))
+            await send("".join(frame))
+            stats.frames += 1
+            await asyncio.sleep(max(0.0, interval - (time.monotonic() - started)))
+
+    async def receive(self, reader, writer, send, stats: TunnelStats) -> None:
+        """Read client frames, answering pings and recording sync replies."""
+        rest = ""
+        message = b""
+        while True:
+            try:
+                fin, opcode, payload = await ws_read(reader)
+            except (asyncio.IncompleteReadError, ConnectionError):
+                return
+            if opcode == 8:
+                writer.write(ws_frame(8, payload[:2]))
+                await writer.drain()
+                return
+            if opcode == 9:
+                writer.write(ws_frame(10, payload))
+                await writer.drain()
+                continue
+            if opcode not in (0, 1, 2):
+                continue
+            # Fragmented messages are only decoded once complete
+            message += payload
+            if not fin:
+                continue
+            instructions, rest = parse_instructions(rest + message.decode("utf-8", "replace"))
+            message = b""
+            for elements in instructions:
+                if elements[0] == "sync" and len(elements) > 1:
+                    sent = stats.pending.pop(elements[1], None)
+                    if sent is not None:
+                        stats.acks += 1
+                        stats.ack_latency_total += time.monotonic() - sent
+                elif elements[0] == "" and len(elements) > 1 and elements[1] == "ping":
+                    await send(encode_instruction(*elements))
+                elif elements[0] == "disconnect":
+                    return
+            # Forget frames the client never acknowledged
+            if len(stats.pending) > 1000:
+                stats.pending.clear()
+
+
+def ws_frame(opcode: int, payload: bytes) -> bytes:
+    """Encode an unmasked server-to-client WebSocket frame."""
+    head = bytes([0x80 | opcode])
+    length = len(payload)
+    if length < 126:
+        head += bytes([length])
+    elif length < 65536:
+        head += bytes([126]) + struct.pack(">H", length)
+    else:
+        head += bytes([127]) + struct.pack(">Q", length)
+    return head + payload
+
+
+async def ws_read(reader: asyncio.StreamReader) -> tuple:
+    """Read one client WebSocket frame and return ``(fin, opcode, payload)``."""
+    first, second = await reader.readexactly(2)
+    fin = bool(first & 0x80)
+    opcode = first & 0x0F
+    length = second & 0x7F
+    if length == 126:
+        (length,) = struct.unpack(">H", await reader.readexactly(2))
+    elif length == 127:
+        (length,) = struct.unpack(">Q", await reader.readexactly(8))
+    mask = await reader.readexactly(4) if second & 0x80 else b""
+    payload = await reader.readexactly(length)
+    if mask:
+        payload = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+    return fin, opcode, payload
+
+
+def parse_args(argv: list | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Offline stand-in for the Guacamole web application")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--prefix", default="/guacamole", help="path of the web application")
+    parser.add_argument("--data-source", default="mysql")
+    parser.add_argument("--build", default="", help="build identifier in static file URLs (default: script hash)")
+    parser.add_argument("--connections", type=int, default=50, help="number of synthetic connections")
+    parser.add_argument("--group-size", type=int, default=10, help="connections per group (0: all in ROOT)")
+    parser.add_argument("--protocols", default="ssh,rdp,vnc", help="comma-separated protocols to cycle")
+    parser.add_argument("--password", default="", help="require this password (default: accept any)")
+    parser.add_argument("--session-timeout", type=float, default=3600.0, help="token idle timeout in seconds")
+    parser.add_argument("--rate", type=float, default=30.0, help="display frames per second per tunnel")
+    parser.add_argument("--payload", type=int, default=8192, help="approximate bytes of PNG data per frame")
+    parser.add_argument(
+        "--clipboard-interval", type=float, default=10.0, help="seconds between clipboard updates (0: off)"
+    )
+    return parser.parse_args(argv)
+
+
+async def serve(options: argparse.Namespace) -> None:
+    standin = StandInServer(options)
+    server = await asyncio.start_server(standin.handle, options.host, options.port)
+    print(f"Guacamole stand-in on http://{options.host}:{options.port}{standin.prefix}/", file=sys.stderr)
+    async with server:
+        await server.serve_forever()
+
+
+def main() -> None:
+    try:
+        asyncio.run(serve(parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
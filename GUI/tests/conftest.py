@@ -0,0 +1,20 @@
+"""Shared fixtures for the Guacagui unit tests.
+
+The tests import the modules next to this directory directly, the same
+way `bench_guacagui.py` does, and run Qt without a display.
+"""
+
+import os
+import sys
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    from PyQt5.QtWidgets import QApplication
+
+    return QApplication.instance() or QApplication([])
@@ -0,0 +1,61 @@
+"""Tests for the URLs under which AssetCache serves cached files."""
+
+import pytest
+from PyQt5.QtCore import QUrl
+
+from guacagui_assets import AssetCache, asset_url, original_url
+
+
+@pytest.mark.parametrize("url,cached", [
+    ("https://guac.example.com/guacamole/app.js?b=1a2b",
+     "guacagui-asset://guac.example.com/https:443/guacamole/app.js?b=1a2b"),
+    ("http://guac.example.com/guacamole/app.css",
+     "guacagui-asset://guac.example.com/http:80/guacamole/app.css"),
+    ("https://10.0.0.5:8443/guacamole/images/logo.png",
+     "guacagui-asset://10.0.0.5/https:8443/guacamole/images/logo.png"),
+    ("http://localhost:8080/fonts/carlito.woff#x",
+     "guacagui-asset://localhost/http:8080/fonts/carlito.woff#x"),
+])
+def test_asset_url_round_trip(url, cached):
+    assert asset_url(QUrl(url)).toString() == cached
+    assert original_url(QUrl(cached)).toString() == url
+
+
+@pytest.mark.parametrize("url", [
+    "guacagui-asset://guac/guacamole/app.js",
+    "guacagui-asset://guac/ftp:21/app.js",
+    "guacagui-asset://guac/https:port/app.js",
+    "guacagui-asset://guac/",
+])
+def test_original_url_rejects_foreign_paths(url):
+    assert original_url(QUrl(url)) is None
+
+
+@pytest.mark.parametrize("path,kept", [
+    ("translations/en.json", True),
+    ("translations/pt-BR.json", True),
+    ("api/languages", True),
+    ("api/patches", True),
+    ("api/session/data/mysql/connections", False),
+    ("translations/../api/tokens.json", False),
+    ("app.js", False),
+])
+def test_json_assets(path, kept):
+    assert bool(AssetCache.JSON_ASSETS.fullmatch(path)) is kept
+
+
+@pytest.mark.parametrize("url,json_asset,kept", [
+    ("https://guac/guacamole/app.js", False, True),
+    ("https://guac/guacamole/images/logo.png", False, True),
+    ("https://guac/guacamole/api/session/data/mysql/users", False, False),
+    ("https://guac/guacamole/images/../api/tokens", False, False),
+    ("https://guac/other/app.js", False, False),
+    ("https://guac:8443/guacamole/app.js", False, False),
+    ("https://evil.example.com/guacamole/app.js", False, False),
+    ("https://guac/guacamole/translations/en.json", True, True),
+    ("https://guac/guacamole/app.js", True, False),
+])
+def test_only_files_of_the_web_client_are_cached(qapp, url, json_asset, kept):
+    cache = AssetCache(None)
+    cache.index["base_url"] = "https://guac/guacamole/"
+    assert cache.in_scope(AssetCache.key(QUrl(url)), json_asset) is kept
@@ -0,0 +1,68 @@
+"""Tests for reading the web client's login and the bridge's origin check."""
+
+import json
+
+import pytest
+from PyQt5.QtCore import QObject, QUrl
+
+from guacagui_clipboard import GuacBridge, guacamole_base_url, parse_page_auth
+
+
+def page_auth(auth=None, token=None) -> str:
+    """Return what READ_AUTH_JS returns for the given local storage values."""
+    return json.dumps({"auth": auth, "token": token})
+
+
+def test_guac_auth_holds_the_whole_auth_result():
+    auth = json.dumps({"authToken": "ABC", "dataSource": "mysql", "username": "u"})
+    assert parse_page_auth(page_auth(auth=auth)) == {"authToken": "ABC", "dataSource": "mysql"}
+
+
+def test_guac_auth_token_is_json_encoded_or_plain():
+    assert parse_page_auth(page_auth(token='"ABC"')) == {"authToken": "ABC", "dataSource": None}
+    assert parse_page_auth(page_auth(token="ABC")) == {"authToken": "ABC", "dataSource": None}
+
+
+def test_guac_auth_wins_over_guac_auth_token():
+    auth = json.dumps({"authToken": "ABC", "dataSource": "postgresql"})
+    assert parse_page_auth(page_auth(auth=auth, token='"XYZ"'))["authToken"] == "ABC"
+
+
+@pytest.mark.parametrize("result", [
+    None,
+    "",
+    "not json",
+    page_auth(),
+    page_auth(auth="{broken"),
+    page_auth(auth=json.dumps({"authToken": ""})),
+    page_auth(auth=json.dumps({"authToken": 5})),
+    page_auth(token='""'),
+])
+def test_no_login(result):
+    assert parse_page_auth(result) is None
+
+
+class Tab(QObject):
+    def __init__(self, url: str) -> None:
+        super().__init__()
+        self.address = url
+
+    def url(self) -> QUrl:
+        return QUrl(self.address)
+
+
+def reported_logins(url: str) -> list:
+    bridge = GuacBridge(Tab(url))
+    logins = []
+    bridge.auth_changed.connect(logins.append)
+    bridge.report(json.dumps({"type": "auth", "key": "GUAC_AUTH_TOKEN", "value": '"ABC"'}))
+    bridge.report(json.dumps({"type": "auth", "key": "GUAC_AUTH_TOKEN", "value": None}))
+    return logins
+
+
+def test_bridge_takes_logins_from_guacamole(qapp):
+    assert reported_logins(guacamole_base_url() + "#/") == [{"authToken": "ABC", "dataSource": None}, None]
+
+
+def test_bridge_ignores_logins_from_other_pages(qapp):
+    assert reported_logins("https://example.com/") == []
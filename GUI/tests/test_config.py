@@ -0,0 +1,59 @@
+"""Tests for parsing config.json into a configuration snapshot."""
+
+import pytest
+
+from guacagui_config import CONFIG_SECTIONS, _parse_config, _parse_section
+
+DEFAULTS = {"enabled": False, "limit": 5, "ratio": 0.5, "name": "x", "items": ["a"]}
+
+
+def test_parse_section_defaults_for_missing_or_invalid_section():
+    for raw in (None, [], "enabled", {}):
+        assert dict(_parse_section(raw, DEFAULTS)) == {
+            "enabled": False, "limit": 5, "ratio": 0.5, "name": "x", "items": ("a",),
+        }
+
+
+def test_parse_section_keeps_values_of_the_default_type():
+    raw = {"enabled": True, "limit": 2.5, "ratio": 3, "name": "y", "items": ["b", 1, "c"], "extra": 1}
+    assert dict(_parse_section(raw, DEFAULTS)) == {
+        "enabled": True, "limit": 2.5, "ratio": 3, "name": "y", "items": ("b", "c"),
+    }
+
+
+@pytest.mark.parametrize("key,value", [
+    ("enabled", 1),
+    ("limit", True),
+    ("limit", "5"),
+    ("name", 3),
+    ("items", "a"),
+])
+def test_parse_section_drops_values_of_another_type(key, value):
+    section = _parse_section({key: value}, DEFAULTS)
+    default = DEFAULTS[key]
+    assert section[key] == (tuple(default) if isinstance(default, list) else default)
+
+
+def test_parse_section_is_read_only():
+    section = _parse_section({}, DEFAULTS)
+    with pytest.raises(TypeError):
+        section["limit"] = 1
+
+
+def test_parse_section_freezes_nested_values():
+    section = _parse_section({"lists": {"db": ["db1", {"host": "db2"}]}}, {"lists": {}})
+    assert section["lists"]["db"] == ("db1", {"host": "db2"})
+    with pytest.raises(TypeError):
+        section["lists"]["web"] = ["web1"]
+    with pytest.raises(TypeError):
+        section["lists"]["db"][1]["host"] = "db3"
+
+
+def test_parse_config_normalizes_home_url_and_macros():
+    config = _parse_config({
+        "home_url": "guac.example.com/guacamole/",
+        "macros": [{"name": "ls", "text": "ls -l"}, {"label": "top", "macro": "top"}, {"name": "bad"}, 3],
+    }, None)
+    assert config.home_url == "https://guac.example.com/guacamole/"
+    assert config.macros == (("ls", "ls -l"), ("top", "top"))
+    assert set(config.sections) == set(CONFIG_SECTIONS)
@@ -0,0 +1,179 @@
+"""Tests for JSON-RPC request handling of the control socket."""
+
+import json
+
+import pytest
+from PyQt5.QtCore import QCoreApplication, QEvent, QObject, QUrl, pyqtSignal
+from PyQt5.QtNetwork import QLocalSocket
+
+from guacagui_server import ControlServer, RpcError
+
+
+class Launcher(QObject):
+    finished = pyqtSignal(list)
+
+
+class Stats:
+    connected = True
+
+
+class Traffic:
+    def as_dict(self) -> dict:
+        return {"received_bytes": 10, "sent_bytes": 5}
+
+
+class Bridge:
+    stats = Stats()
+    traffic = Traffic()
+
+
+class Tab:
+    def __init__(self, tab_id: int) -> None:
+        self.tab_id = tab_id
+        self.bridge = Bridge()
+
+    def url(self) -> QUrl:
+        return QUrl(f"http://guac/#/client/{self.tab_id}")
+
+
+class Typer(QObject):
+    finished = pyqtSignal(object, int, bool)
+
+    def type_text(self, text: str) -> bool:
+        return True
+
+
+class TypingTab(QObject):
+    def __init__(self, tab_id: int) -> None:
+        super().__init__()
+        self.tab_id = tab_id
+        self.typer = Typer(self)
+
+
+class Registry:
+    def __init__(self, tabs: list) -> None:
+        self.tabs = tabs
+
+    def index_of(self, tab) -> int:
+        return self.tabs.index(tab)
+
+
+class Tabs:
+    def __init__(self, tabs: list) -> None:
+        self.registry = Registry(tabs)
+
+    def tabText(self, index: int) -> str:
+        return f"Tab {index}"
+
+
+class Lifecycle:
+    def __init__(self, tabs: list) -> None:
+        self.tabs = tabs
+
+    def browsers(self) -> list:
+        return list(self.tabs)
+
+    def state(self, tab):
+        return None
+
+    def thaw(self, tab) -> None:
+        pass
+
+
+class Resources:
+    samples: dict = {}
+
+
+class Window(QObject):
+    def __init__(self, tabs: list) -> None:
+        super().__init__()
+        self.launcher = Launcher()
+        self.lifecycle = Lifecycle(tabs)
+        self.tabs = Tabs(tabs)
+        self.resources = Resources()
+        self.current = tabs[0]
+
+    def current_browser(self):
+        return self.current
+
+
+class Socket:
+    """Collects what the server writes instead of sending it."""
+
+    def __init__(self) -> None:
+        self.written = b""
+
+    def state(self):
+        return QLocalSocket.ConnectedState
+
+    def write(self, data: bytes) -> None:
+        self.written += data
+
+    def responses(self) -> list:
+        return [json.loads(line) for line in self.written.splitlines()]
+
+
+@pytest.fixture
+def server(qapp):
+    window = Window([Tab(1), Tab(2)])
+    server = ControlServer(window)
+    yield server
+    window.deleteLater()
+
+
+def call(server: ControlServer, request) -> list:
+    socket = Socket()
+    line = request if isinstance(request, bytes) else json.dumps(request).encode("utf-8")
+    server.handle(socket, line)
+    return socket.responses()
+
+
+def test_list_reports_every_tab(server):
+    [response] = call(server, {"jsonrpc": "2.0", "id": 1, "method": "list"})
+    assert response["id"] == 1
+    tabs = response["result"]
+    assert [t["id"] for t in tabs] == [1, 2]
+    assert tabs[0]["current"] is True and tabs[1]["current"] is False
+    assert tabs[1]["url"] == "http://guac/#/client/2"
+    assert tabs[0]["state"] == "active"
+    assert tabs[0]["received_bytes"] == 10
+
+
+def test_protocol_errors(server):
+    assert call(server, b"{not json")[0]["error"]["code"] == -32700
+    assert call(server, [1, 2])[0]["error"]["code"] == -32600
+    assert call(server, {"id": 2, "params": {}})[0]["error"]["code"] == -32600
+    [response] = call(server, {"id": 3, "method": "reboot"})
+    assert response["id"] == 3
+    assert response["error"]["code"] == -32601
+    [response] = call(server, {"id": 4, "method": "list", "params": [1]})
+    assert response["error"]["code"] == RpcError.INVALID_PARAMS
+
+
+def test_unknown_tab_is_invalid_params(server):
+    [response] = call(server, {"id": 5, "method": "activate", "params": {"id": 99}})
+    assert response["error"] == {"code": RpcError.INVALID_PARAMS, "message": "No tab with id 99"}
+
+
+def test_notifications_get_no_response(server):
+    assert call(server, {"jsonrpc": "2.0", "method": "list"}) == []
+
+
+def test_notification_errors_are_still_reported(server):
+    [response] = call(server, {"method": "reboot"})
+    assert response["id"] is None
+    assert response["error"]["code"] == -32601
+
+
+def test_closing_a_tab_answers_its_typing_calls(server):
+    tab = TypingTab(7)
+    socket = Socket()
+    server.main_window.lifecycle.tabs.append(tab)
+    server.handle(socket, json.dumps({"id": 6, "method": "send_text", "params": {"id": 7, "text": "ls"}}).encode())
+    assert socket.responses() == []
+    server.main_window.lifecycle.tabs.remove(tab)
+    tab.deleteLater()
+    QCoreApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+    [response] = socket.responses()
+    assert response["error"]["message"] == "Tab 7 was closed while typing"
+    assert server.typing == {}
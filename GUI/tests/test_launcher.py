@@ -0,0 +1,43 @@
+"""Tests for the group launcher's result summary."""
+
+from guacagui_launcher import LaunchResult, summarize_launch
+
+
+def result(name: str, connected_ms: float | None = None, error: str = "") -> LaunchResult:
+    launch = LaunchResult(name, f"http://guac/#/client/{name}")
+    launch.connected_ms = connected_ms
+    launch.error = error
+    return launch
+
+
+def test_summary_of_connected_and_failed_tabs():
+    results = [result(str(i), connected_ms=float(ms)) for i, ms in enumerate((300, 100, 200, 400))]
+    results.append(result("bad", error="not connected after 30 s"))
+    assert summarize_launch(results, 2.345) == {
+        "total": 5,
+        "connected": 4,
+        "failed": 1,
+        "elapsed_s": 2.3,
+        "median_ms": 300,
+        "p95_ms": 400,
+        "max_ms": 400,
+    }
+
+
+def test_p95_of_many_tabs():
+    results = [result(str(ms), connected_ms=float(ms)) for ms in range(1, 101)]
+    summary = summarize_launch(results, 10.0)
+    assert (summary["median_ms"], summary["p95_ms"], summary["max_ms"]) == (51, 96, 100)
+
+
+def test_summary_without_connections_has_no_times():
+    assert summarize_launch([result("a", error="tab closed")], 0.04) == {
+        "total": 1, "connected": 0, "failed": 1, "elapsed_s": 0.0,
+    }
+    assert summarize_launch([], 0.0)["total"] == 0
+
+
+def test_describe():
+    assert result("db1", connected_ms=1250.0).describe() == "db1: connected in 1.2 s"
+    assert result("db2", error="tab closed").describe() == "db2: tab closed"
+    assert result("db3").describe() == "db3: not started"
@@ -0,0 +1,65 @@
+"""Tests for updating the macro toolbar in place."""
+
+import pytest
+from PyQt5.QtWidgets import QToolBar
+
+from guacagui_clipboard import BrowserMainWindow
+
+
+class ToolbarHost:
+    """The parts of BrowserMainWindow that apply_macros works on."""
+
+    def __init__(self) -> None:
+        self.macro_toolbar = QToolBar()
+        self.macro_entries = []
+        self.typed = []
+
+    def type_into_current(self, text: str) -> None:
+        self.typed.append(text)
+
+    def apply(self, macros: tuple) -> None:
+        BrowserMainWindow.apply_macros(self, macros)
+
+    def toolbar_macros(self) -> list:
+        """Return ``(name, text)`` for the toolbar's widgets in display order."""
+        widgets = [self.macro_toolbar.widgetForAction(action) for action in self.macro_toolbar.actions()]
+        return [(label.text()[:-1], box.text()) for label, box in zip(widgets[::2], widgets[1::2])]
+
+
+@pytest.fixture
+def host(qapp):
+    return ToolbarHost()
+
+
+def test_apply_macros_builds_toolbar_in_order(host):
+    macros = (("a", "1"), ("b", "2"), ("c", "3"))
+    host.apply(macros)
+    assert host.toolbar_macros() == list(macros)
+    assert [(e.name, e.text) for e in host.macro_entries] == list(macros)
+
+
+def test_apply_macros_keeps_unchanged_widgets(host):
+    host.apply((("a", "1"), ("b", "2"), ("c", "3")))
+    boxes = {entry.name: entry.box for entry in host.macro_entries}
+    host.apply((("a", "1"), ("x", "9"), ("b", "2"), ("c", "3")))
+    assert host.toolbar_macros() == [("a", "1"), ("x", "9"), ("b", "2"), ("c", "3")]
+    for entry in host.macro_entries:
+        if entry.name in boxes:
+            assert entry.box is boxes[entry.name]
+
+
+def test_apply_macros_updates_replaced_entries_in_place(host):
+    host.apply((("a", "1"), ("b", "2")))
+    second = host.macro_entries[1].box
+    host.apply((("a", "1"), ("b", "changed")))
+    assert host.macro_entries[1].box is second
+    assert second.text() == "changed"
+
+
+def test_apply_macros_removes_entries(host):
+    host.apply((("a", "1"), ("b", "2"), ("c", "3")))
+    host.apply((("c", "3"),))
+    assert host.toolbar_macros() == [("c", "3")]
+    host.apply(())
+    assert host.macro_entries == []
+    assert host.macro_toolbar.actions() == []
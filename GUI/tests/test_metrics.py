@@ -0,0 +1,35 @@
+"""Tests for the Prometheus exposition of histograms."""
+
+from guacagui_metrics import AppMetrics, Histogram
+
+
+def test_empty_histogram():
+    assert Histogram((0.5, 1.0)).exposition("load_seconds") == [
+        'load_seconds_bucket{le="0.5"} 0',
+        'load_seconds_bucket{le="1"} 0',
+        'load_seconds_bucket{le="+Inf"} 0',
+        "load_seconds_sum 0.000000",
+        "load_seconds_count 0",
+    ]
+
+
+def test_buckets_are_cumulative():
+    histogram = Histogram((0.25, 1.0, 4.0))
+    for value in (0.1, 0.25, 0.9, 3.0, 10.0):
+        histogram.observe(value)
+    assert histogram.exposition("load_seconds") == [
+        'load_seconds_bucket{le="0.25"} 2',
+        'load_seconds_bucket{le="1"} 3',
+        'load_seconds_bucket{le="4"} 4',
+        'load_seconds_bucket{le="+Inf"} 5',
+        "load_seconds_sum 14.250000",
+        "load_seconds_count 5",
+    ]
+
+
+def test_app_metrics_histograms_use_their_buckets():
+    metrics = AppMetrics()
+    metrics.loop_lag.observe(0.007)
+    lines = metrics.loop_lag.exposition("lag")
+    assert lines[:3] == ['lag_bucket{le="0.005"} 0', 'lag_bucket{le="0.01"} 1', 'lag_bucket{le="0.025"} 1']
+    assert len(metrics.page_loads.exposition("load")) == len(AppMetrics.LOAD_BUCKETS) + 3
@@ -0,0 +1,22 @@
+"""Tests for translating macro text into keysyms."""
+
+from guacagui_clipboard import text_to_keysyms
+
+
+def test_ascii_and_latin1_are_their_own_keysym():
+    assert text_to_keysyms("aZ ~") == [0x61, 0x5A, 0x20, 0x7E]
+    assert text_to_keysyms("é\xa0") == [0xE9, 0xA0]
+
+
+def test_other_characters_use_the_unicode_keysym_range():
+    assert text_to_keysyms("€") == [0x010020AC]
+    assert text_to_keysyms("😀") == [0x0101F600]
+
+
+def test_line_breaks_become_return():
+    assert text_to_keysyms("a\r\nb\rc\n") == [0x61, 0xFF0D, 0x62, 0xFF0D, 0x63, 0xFF0D]
+
+
+def test_control_characters():
+    assert text_to_keysyms("\t\b\x1b") == [0xFF09, 0xFF08, 0xFF1B]
+    assert text_to_keysyms("\x00\x07\x7f\x85") == []